@@ -0,0 +1,161 @@
+"""
+Analysis Cache
+Bounded LRU of commit headers and analyses keyed by commit object ID, so a
+commit reached again (a new branch at existing commits, a merge, the same
+commit in a watched fork) costs no git invocations. Commit objects are
+immutable, so entries never go stale; they are also keyed by a digest of
+the payload policy and path filter, which change what an analysis holds.
+
+One cache can be shared by every watcher in a process. An optional disk
+layer keeps analyses across restarts, one small JSON file per entry.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from event_detection.commit_analysis import PayloadPolicy
+
+
+class AnalysisCache:
+    """Commit ID -> {"header", "analysis"}, bounded by entry count and bytes"""
+    
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 32 * 1024 * 1024,
+                 disk_dir: Optional[str] = None, max_disk_entries: int = 50000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.bytes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        
+        self._disk_entries = 0
+        if self.disk_dir and self.disk_dir.is_dir():
+            self._disk_entries = sum(1 for _ in self.disk_dir.glob("*/*.json"))
+    
+    @staticmethod
+    def variant(policy: PayloadPolicy, pathspec: Optional[List[str]] = None, header_format: str = "") -> str:
+        """Digest of the settings that shape an analysis and its cached header"""
+        settings = json.dumps({"policy": asdict(policy), "pathspec": pathspec or [], "header": header_format},
+                              sort_keys=True)
+        return hashlib.sha1(settings.encode()).hexdigest()[:12]
+    
+    @staticmethod
+    def _key(commit_hash: str, variant: str) -> str:
+        return f"{commit_hash}:{variant}"
+    
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key.replace(':', '-')}.json"
+    
+    def get(self, commit_hash: str, variant: str) -> Optional[Dict[str, Any]]:
+        """Cached header and analysis for a commit, from memory or disk"""
+        key = self._key(commit_hash, variant)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+        
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r") as f:
+                    serialized = f.read()
+                entry = json.loads(serialized)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, entry, len(serialized))
+                return entry
+        
+        self.stats["misses"] += 1
+        return None
+    
+    def put(self, commit_hash: str, variant: str, header: str, analysis: Dict[str, Any]):
+        """Store a freshly computed header and analysis"""
+        key = self._key(commit_hash, variant)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        
+        entry = {"header": header, "analysis": analysis}
+        serialized = json.dumps(entry)
+        self._remember(key, entry, len(serialized))
+        if self.disk_dir:
+            self._write_disk(key, serialized)
+    
+    def _remember(self, key: str, entry: Dict[str, Any], size: int):
+        """Insert into the memory layer, evicting least recently used entries over budget"""
+        if size > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.sizes[key] = size
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            evicted, _ = self.entries.popitem(last=False)
+            self.bytes -= self.sizes.pop(evicted)
+            self.stats["evictions"] += 1
+    
+    def _write_disk(self, key: str, serialized: str):
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                f.write(serialized)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write analysis cache entry {path}: {e}")
+            return
+        
+        self._disk_entries += 1
+        if self._disk_entries > self.max_disk_entries:
+            self._prune_disk()
+    
+    def _prune_disk(self):
+        """Drop the oldest tenth of the disk layer in one pass"""
+        files = sorted(self.disk_dir.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        excess = len(files) - self.max_disk_entries + self.max_disk_entries // 10
+        for path in files[:max(excess, 0)]:
+            try:
+                path.unlink()
+                self.stats["disk_evictions"] += 1
+            except OSError:
+                pass
+        self._disk_entries = len(files) - max(excess, 0)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size"""
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round((self.stats["hits"] + self.stats["disk_hits"]) / lookups, 3) if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "disk_entries": self._disk_entries
+        }
+
+
+def add_analysis_cache_arguments(parser):
+    """Register commit analysis cache command-line flags"""
+    parser.add_argument("--analysis-cache-entries", type=int, default=5000,
+                        help="Commit analyses kept in memory, 0 to disable (default: 5000)")
+    parser.add_argument("--analysis-cache-mb", type=float, default=32.0,
+                        help="Memory limit of the analysis cache in MB (default: 32)")
+    parser.add_argument("--analysis-cache-dir", default=None,
+                        help="Also keep analyses on disk here, across restarts (default: memory only)")
+
+
+def analysis_cache_from_args(args) -> Optional[AnalysisCache]:
+    """Build the process-wide AnalysisCache, or None when disabled"""
+    if args.analysis_cache_entries <= 0:
+        return None
+    return AnalysisCache(args.analysis_cache_entries, int(args.analysis_cache_mb * 1024 * 1024),
+                         args.analysis_cache_dir)
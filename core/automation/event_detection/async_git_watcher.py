@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Async Git Event Watcher
+asyncio implementation of GitWatcher that overlaps git invocations and can
+share an event loop with the TaskOrchestrator
+"""
+
+import os
+import sys
+import time
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Callable, Awaitable, Any
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_detection.git_watcher import GitWatcher
+from event_detection.commit_analysis import (
+    PayloadPolicy, DiffStatAggregator, analyze_commit, numstat_command, changes_command, score_commit,
+    add_payload_arguments, payload_policy_from_args
+)
+from event_detection.path_filter import PathFilter, add_path_filter_arguments, path_filter_for
+from event_detection.poll_schedule import PollSchedule, add_poll_schedule_arguments, poll_schedule_from_args
+from event_detection.analysis_cache import AnalysisCache, add_analysis_cache_arguments, analysis_cache_from_args
+from event_detection.churn_index import ChurnIndex, add_churn_index_arguments, churn_index_for
+from event_detection.watcher_checkpoint import WatcherCheckpoint, add_checkpoint_arguments, checkpoint_for
+from monitoring.profiler import timed, add_profiling_arguments, profiler_from_args
+
+
+class AsyncGitWatcher(GitWatcher):
+    """GitWatcher whose git calls run as concurrent asyncio subprocesses"""
+    
+    # Longest sleep between heartbeats while idling
+    HEARTBEAT_INTERVAL = 10.0
+    
+    def __init__(self, repo_path: str = ".", poll_interval: int = 10,
+                 max_concurrency: int = 8,
+                 event_sink: Optional[Callable[[Dict], Awaitable[None]]] = None,
+                 analysis_pool: Optional[Executor] = None,
+                 payload_policy: Optional[PayloadPolicy] = None,
+                 churn_index: Optional[ChurnIndex] = None,
+                 checkpoint: Optional[WatcherCheckpoint] = None, catchup_batch: int = 200,
+                 path_filter: Optional[PathFilter] = None,
+                 poll_schedule: Optional[PollSchedule] = None,
+                 analysis_cache: Optional[AnalysisCache] = None):
+        # Git state is read asynchronously in initialize(), so only the
+        # attributes are shared with the synchronous GitWatcher.__init__
+        self._init_state(repo_path, poll_interval, analysis_pool, payload_policy, churn_index,
+                         checkpoint, catchup_batch, path_filter, poll_schedule, analysis_cache)
+        self.max_concurrency = max_concurrency
+        
+        # When set, events are handed to this coroutine instead of /tmp files
+        self.event_sink = event_sink
+        
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._initialized = False
+        self.last_heartbeat = 0.0
+    
+    async def initialize(self):
+        """Initialize watcher state from current git status"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        try:
+            if self._checkpoint_usable() and await self._checkpoint_valid():
+                self._restore_checkpoint()
+            else:
+                self.known_refs = await self._get_ref_map()
+                self.last_commit_hash = self.known_refs.get("HEAD", "")
+                self.known_branches = set(self.known_refs) - {"HEAD"}
+            self._initialized = True
+            
+            print("Async Git Watcher initialized:")
+            print(f"  Repository: {self.repo_path}")
+            print(f"  Current commit: {self.last_commit_hash[:8]}")
+            print(f"  Known branches: {len(self.known_branches)}")
+            
+            # Backfill streams git log synchronously; keep it off the loop
+            await asyncio.get_running_loop().run_in_executor(None, self._sync_churn_index)
+        
+        except Exception as e:
+            print(f"Error initializing git watcher: {e}")
+            raise
+    
+    @timed("async_git_watcher._run_git_command")
+    async def _run_git_command(self, command: List[str], stdin: Optional[str] = None) -> str:
+        """Run a git command without blocking the event loop"""
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                "git", *command,
+                cwd=str(self.repo_path),
+                stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate(stdin.encode() if stdin is not None else None)
+        
+        if process.returncode != 0:
+            print(f"Git command failed: git {' '.join(command)}: {stderr.decode().strip()}")
+            return ""
+        return stdout.decode().strip()
+    
+    async def _get_current_commit(self) -> str:
+        """Get the current HEAD commit hash"""
+        return await self._run_git_command(["rev-parse", "HEAD"])
+    
+    async def _checkpoint_valid(self) -> bool:
+        """The checkpointed commit still exists (e.g. not lost to a re-clone)"""
+        exists = await self._run_git_command(["cat-file", "-t", self.checkpoint.head]) == "commit"
+        if not exists:
+            print(f"  Checkpoint commit {self.checkpoint.head[:8]} is gone; starting from HEAD")
+        return exists
+    
+    async def _get_ref_map(self) -> Dict[str, str]:
+        """All local and remote-tracking branches with their tips, in one git call"""
+        return self._parse_ref_map(await self._run_git_command(self.REF_MAP_COMMAND))
+    
+    async def _get_all_branches(self) -> List[str]:
+        """Get all branch names"""
+        return [name for name in await self._get_ref_map() if name != "HEAD"]
+    
+    async def _get_commit_header(self, commit_hash: str) -> str:
+        """Ingest stage: fetch the commit's author and message line"""
+        return await self._run_git_command(["show", "-s", f"--format={self.COMMIT_FORMAT}", commit_hash])
+    
+    async def _stream_diff_summary(self, commit_hash: str) -> Dict[str, Any]:
+        """Aggregate numstat output line by line as git produces it
+        
+        Raises RuntimeError if git fails, rather than passing on a partial
+        or empty summary as if the commit changed nothing.
+        """
+        aggregator = DiffStatAggregator(self.payload_policy, commit_hash)
+        command = numstat_command(commit_hash, self.path_filter.pathspec())
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                "git", *command,
+                cwd=str(self.repo_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            async for line in process.stdout:
+                aggregator.feed(line.decode().rstrip("\n"))
+            # git reports errors before any output, so stderr cannot fill up meanwhile
+            stderr = await process.stderr.read()
+            await process.wait()
+        if process.returncode != 0:
+            aggregator.discard()
+            raise RuntimeError(f"git {' '.join(command)} failed: {stderr.decode().strip()}")
+        return aggregator.finish()
+    
+    async def _changes_files(self, commit_hash: str) -> bool:
+        """Whether the commit changes any file at all, ignoring the path filter"""
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                "git", *changes_command(commit_hash),
+                cwd=str(self.repo_path),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            return await process.wait() == 1
+    
+    async def _get_commit_info(self, commit_hash: str) -> Dict[str, Any]:
+        """Get detailed information about a commit"""
+        cached = self._cached_analysis(commit_hash)
+        if cached:
+            return self._build_commit_info(cached["header"], cached["analysis"]["summary"])
+        output = await self._get_commit_header(commit_hash)
+        if not output:
+            return {}
+        return self._build_commit_info(output, await self._stream_diff_summary(commit_hash))
+    
+    async def _analyze(self, commit_hash: str, output: str) -> Dict:
+        """Analysis stage: run in the pool if configured, without blocking the loop"""
+        subject = self._commit_subject(output)
+        if self.analysis_pool is None:
+            summary = await self._stream_diff_summary(commit_hash)
+            if self.path_filter:
+                summary["excluded_only"] = not summary["total_files"] and await self._changes_files(commit_hash)
+            return {"summary": summary, **score_commit(subject, summary)}
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.analysis_pool, analyze_commit,
+            str(self.repo_path), commit_hash, subject, self.payload_policy, self.path_filter.pathspec()
+        )
+    
+    @timed("async_git_watcher._check_for_new_commits")
+    async def _check_for_new_commits(self):
+        """Check every branch for new commits and rewrites, and generate events"""
+        if self.catchup is None:
+            # An unchanged ref map costs one git call and no further work
+            current_refs = self._polled_refs = await self._get_ref_map()
+            if not current_refs or current_refs == self.known_refs:
+                return
+            await self._detect_rewrites(current_refs)
+            self._start_catchup(current_refs)
+        
+        if self._catchup_commits is None:
+            command, stdin = self._catchup_command()
+            self._set_catchup_commits(await self._run_git_command(command, stdin) if command else None)
+            if self.catchup is None:
+                return
+        
+        # At most one batch per poll, oldest first
+        batch = self._next_catchup_batch()
+        if any(branch is None for _, branch in batch):
+            head_branch = await self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
+            batch = [(commit_hash, branch or head_branch) for commit_hash, branch in batch]
+        
+        # Commits already analysed on another ref or in another repository cost no git calls
+        cached = [self._cached_analysis(commit_hash) for commit_hash, _ in batch]
+        
+        # Ingest every other commit concurrently (bounded by the semaphore)
+        fetched = iter(await asyncio.gather(
+            *(self._get_commit_header(commit_hash) for (commit_hash, _), hit in zip(batch, cached) if not hit)
+        ))
+        headers = [hit["header"] if hit else next(fetched) for hit in cached]
+        
+        # Analyse concurrently; other repositories keep polling meanwhile
+        commits = [(h, branch, output, hit) for (h, branch), output, hit in zip(batch, headers, cached) if output]
+        self._commit_done(len(batch) - len(commits))
+        computed = iter(await asyncio.gather(
+            *(self._analyze(commit_hash, output) for commit_hash, _, output, hit in commits if not hit),
+            return_exceptions=True
+        ))
+        
+        # Queue events in rev-list order; the range completes with its last commit
+        for commit_hash, branch, output, hit in commits:
+            analysis = hit["analysis"] if hit else next(computed)
+            if isinstance(analysis, Exception):
+                print(f"Commit analysis failed for {commit_hash[:8]}: {analysis}")
+                self._commit_done()
+                continue
+            self._finish_commit(commit_hash, output, branch, analysis)
+    
+    async def _detect_rewrites(self, current_refs: Dict[str, str]):
+        """Raise rewrite events for branches whose old tip is no longer an ancestor"""
+        changed = self._changed_refs(current_refs)
+        fork_points = await asyncio.gather(
+            *(self._run_git_command(["merge-base", old_tip, new_tip]) for _, old_tip, new_tip in changed)
+        )
+        for (branch, old_tip, new_tip), fork_point in zip(changed, fork_points):
+            if fork_point == old_tip:
+                continue  # Fast-forward
+            dropped = await self._run_git_command(["rev-list", "--count", f"{fork_point}..{old_tip}"]) if fork_point else ""
+            reason = await self._run_git_command(["log", "-g", "-1", "--format=%gs", self._full_refname(branch)])
+            self._queue_rewrite_event(branch, old_tip, new_tip, fork_point, int(dropped or 0), reason)
+    
+    async def _check_for_new_branches(self):
+        """Check for new branches and generate events"""
+        # Reuse the ref map read by this poll's commit check when there is one
+        current_refs = self._polled_refs or await self._get_ref_map()
+        self._polled_refs = None
+        if not current_refs:
+            return
+        current_branches = set(current_refs) - {"HEAD"}
+        new_branches = current_branches - self.known_branches
+        
+        if new_branches:
+            created_from = await self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
+            for branch in new_branches:
+                self._queue_branch_event(branch, created_from)
+        
+        self.known_branches = current_branches
+    
+    async def process_events(self):
+        """Hand queued events to the sink, or fall back to the /tmp drop"""
+        while self.event_queue:
+            event = self.event_queue.pop(0)
+            
+            if self.event_sink:
+                await self.event_sink(event.to_dict())
+            else:
+                event_file = self._write_event_file(event)
+                print(f"\n📤 Event {event.event_type.value} written to: {event_file}")
+    
+    async def poll_once(self):
+        """Run a single detection cycle"""
+        # Sequential so the branch check reuses the commit check's ref map
+        await self._check_for_new_commits()
+        await self._check_for_new_branches()
+        await self.process_events()
+        if self.churn_index is not None:
+            self.churn_index.flush()
+        self.save_checkpoint()
+    
+    async def start(self):
+        """Start monitoring for git events"""
+        if not self._initialized:
+            await self.initialize()
+        
+        self.running = True
+        print("\n🚀 Async Git Watcher started")
+        print(f"   Polling interval: {self.poll_interval} seconds"
+              + (" (adaptive)" if self.poll_state else ""))
+        print(f"   Max concurrent git calls: {self.max_concurrency}")
+        
+        while self.running:
+            self.last_heartbeat = time.time()
+            refs_before = self.known_refs
+            try:
+                if self.poll_schedule:
+                    # Shared slots; recently active repositories are admitted first
+                    async with self.poll_schedule.slot(self.poll_state):
+                        await self.poll_once()
+                else:
+                    await self.poll_once()
+            except Exception as e:
+                print(f"❌ Error in git watcher loop ({self.repo_path}): {e}")
+            
+            if self.profiler:
+                self.profiler.poll()
+            
+            # A backlog is caught up batch by batch, yielding between batches
+            await self._idle(self._next_poll_delay(refs_before))
+    
+    async def _idle(self, delay: float):
+        """Sleep until the next poll, keeping the heartbeat fresh through long idle intervals"""
+        deadline = time.time() + delay
+        while True:
+            await asyncio.sleep(min(max(deadline - time.time(), 0), self.HEARTBEAT_INTERVAL))
+            if not self.running or time.time() >= deadline:
+                return
+            self.last_heartbeat = time.time()
+    
+    def stop(self):
+        """Stop the watcher"""
+        self.running = False
+
+
+async def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Async Git Event Watcher")
+    parser.add_argument(
+        "--repo",
+        action="append",
+        default=None,
+        help="Path to git repository to watch; repeat for several (default: current directory)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=10,
+        help="Polling interval in seconds (default: 10)"
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Maximum concurrent git subprocesses per repository (default: 8)"
+    )
+    parser.add_argument(
+        "--analysis-workers",
+        type=int,
+        default=0,
+        help="Shared process pool size for commit analysis (default: 0, inline)"
+    )
+    add_payload_arguments(parser)
+    add_churn_index_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_path_filter_arguments(parser)
+    add_poll_schedule_arguments(parser)
+    add_analysis_cache_arguments(parser)
+    add_profiling_arguments(parser)
+    
+    args = parser.parse_args()
+    
+    payload_policy = payload_policy_from_args(args)
+    analysis_pool = None
+    if args.analysis_workers > 0:
+        from concurrent.futures import ProcessPoolExecutor
+        analysis_pool = ProcessPoolExecutor(max_workers=args.analysis_workers)
+    
+    poll_schedule = poll_schedule_from_args(args)
+    analysis_cache = analysis_cache_from_args(args)
+    watchers = [
+        AsyncGitWatcher(repo, args.interval, args.max_concurrency, analysis_pool=analysis_pool,
+                        payload_policy=payload_policy,
+                        churn_index=churn_index_for(repo, args.churn_index_dir, args.churn_backfill),
+                        checkpoint=checkpoint_for(repo, args.checkpoint_dir),
+                        catchup_batch=args.catchup_batch,
+                        path_filter=path_filter_for(repo, args),
+                        poll_schedule=poll_schedule,
+                        analysis_cache=analysis_cache)
+        for repo in (args.repo or ["."])
+    ]
+    
+    # One session per process; every watcher's loop polls it
+    profiler = profiler_from_args("async-git-watcher", args)
+    for watcher in watchers:
+        watcher.profiler = profiler
+    try:
+        await asyncio.gather(*(watcher.start() for watcher in watchers))
+    finally:
+        if profiler:
+            profiler.stop()
+        if analysis_pool:
+            analysis_pool.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n\n🛑 Git Watcher stopped")
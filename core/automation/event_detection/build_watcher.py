@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Build Artifact Watcher
+Tails CI log files and parses JUnit XML reports incrementally, turning
+failures into compact BUILD_FAILURE / TEST_FAILURE events. Failures are
+fingerprinted so repeats are suppressed and flaky tests are flagged.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import xml.etree.ElementTree as ET
+from collections import deque, OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Callable, Awaitable, Any
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_detection.event_types import EventType, Priority, create_event
+from monitoring.profiler import timed
+
+
+# Lines that open a log window: failure markers and non-zero exit statuses,
+# not every mention of "error" or "failed" in a successful build's output
+ERROR_LINE = re.compile("|".join([
+    r"^(?:\S+\s+){0,3}\[?(?:ERROR|FATAL|CRITICAL)\]?[:\s]",  # Log level after timestamp/logger
+    r"^\s*(?:error|fatal)(?:\[\w+\])?:",                   # git, cargo, rustc, go vet
+    r":\d+(?::\d+)?:\s*(?:fatal )?error\b",                 # Compiler file:line:col: error
+    r"^##\[error\]",                                       # GitHub Actions annotation
+    r"^npm ERR!",
+    r"^panic:",
+    r"^Traceback \(most recent call last\)",
+    r"^(?:[\w.]+\.)?\w*(?:Error|Exception):\s",             # Final line of a traceback
+    r"^\s*FAILED\b",                                       # pytest / unittest failures
+    r"^=+ .*\b[1-9]\d* (?:failed|errors?)\b",                # pytest summary
+    r"\bBUILD FAIL(?:ED|URE)\b",                            # Ant, Gradle, Maven
+    r"\*\*\* \[.*\] Error [1-9]",                            # make
+    r"\b(?:exit(?:ed with)? (?:code|status)|returned non-zero exit status) [1-9]"
+]))
+
+# Volatile tokens stripped before fingerprinting
+VOLATILE = re.compile(r"0x[0-9a-f]+|\b[0-9a-f]{7,40}\b|\d+(\.\d+)?|/tmp/\S+", re.IGNORECASE)
+
+
+def fingerprint(key: str, *parts: str) -> str:
+    """Stable id for a failure of `key` (a test id or log name)
+    
+    Addresses, hashes, numbers and temp paths in `parts` are ignored so the
+    same failure on a later run produces the same fingerprint.
+    """
+    normalized = "|".join([key] + [VOLATILE.sub("#", part.strip().lower()) for part in parts])
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+class FailureTracker:
+    """Persistent failure fingerprints, per-test outcome history and artifact positions"""
+    
+    HISTORY = 10  # Outcomes kept per tracked test
+    
+    def __init__(self, path: Optional[str] = "/tmp/aadf-build-failures.json",
+                 dedup_window: float = 3600.0, max_tracked: int = 5000):
+        self.path = Path(path) if path else None
+        self.dedup_window = dedup_window
+        self.max_tracked = max_tracked
+        
+        # fingerprint -> {"first_seen", "last_seen", "count"}
+        self.fingerprints: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        # test id -> recent outcomes, newest last ("P"/"F"); only tests that have failed
+        self.history: "OrderedDict[str, str]" = OrderedDict()
+        # artifact path -> [mtime_ns, size] of a parsed report, or [inode, offset] of a log
+        self.artifacts: Dict[str, List[int]] = {}
+        self.saved_at: Optional[float] = None
+        self._dirty = False
+        self._load()
+    
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.fingerprints.update(data.get("fingerprints", {}))
+            self.history.update(data.get("history", {}))
+            self.artifacts = data.get("artifacts", {})
+            self.saved_at = data.get("saved_at")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable failure history {self.path}: {e}")
+    
+    def flush(self):
+        """Atomically persist fingerprints, test history and artifact positions if they changed"""
+        if not self._dirty or not self.path:
+            return
+        self.saved_at = time.time()
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "fingerprints": self.fingerprints,
+                "history": self.history,
+                "artifacts": self.artifacts,
+                "saved_at": self.saved_at
+            }, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+    
+    def record_artifacts(self, artifacts: Dict[str, List[int]]):
+        """Remember how far each artifact has been read, for the next run"""
+        if artifacts != self.artifacts:
+            self.artifacts = artifacts
+            self._dirty = True
+    
+    def _bound(self, table: OrderedDict):
+        while len(table) > self.max_tracked:
+            table.popitem(last=False)
+    
+    def observe(self, fp: str) -> bool:
+        """Record a failure occurrence; True if it is new within the dedup window"""
+        now = time.time()
+        entry = self.fingerprints.get(fp)
+        is_new = entry is None or now - entry["last_seen"] > self.dedup_window
+        if entry is None:
+            entry = {"first_seen": now, "last_seen": now, "count": 0}
+        entry["last_seen"] = now
+        entry["count"] += 1
+        self.fingerprints[fp] = entry
+        self.fingerprints.move_to_end(fp)
+        self._bound(self.fingerprints)
+        self._dirty = True
+        return is_new
+    
+    def outcome(self, test_id: str, passed: bool) -> bool:
+        """Record a test result; True if the test's recent history is flaky
+        
+        Passing results are only recorded for tests that have failed before,
+        so the cost per passing testcase is one dictionary lookup.
+        """
+        history = self.history.get(test_id)
+        if history is None:
+            if passed:
+                return False
+            history = ""
+        history = (history + ("P" if passed else "F"))[-self.HISTORY:]
+        self.history[test_id] = history
+        self.history.move_to_end(test_id)
+        self._bound(self.history)
+        self._dirty = True
+        # Flaky: failed at least once and flipped between outcomes at least twice
+        flips = sum(1 for a, b in zip(history, history[1:]) if a != b)
+        return "F" in history and flips >= 2
+
+
+def parse_junit(path: Path, tracker: FailureTracker, max_failures: int = 50,
+                max_text: int = 2000) -> Dict[str, Any]:
+    """Stream a JUnit XML report with iterparse in constant memory
+    
+    Finished <testcase> elements are detached from their parent as soon as
+    they are read, so even very large reports only hold one testcase and
+    the open <testsuite> stack in memory.
+    """
+    tests = 0
+    failed = 0
+    failures: List[Dict[str, Any]] = []
+    stack: List[ET.Element] = []
+    
+    for event, elem in ET.iterparse(str(path), events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        
+        stack.pop()
+        if elem.tag != "testcase":
+            continue
+        
+        tests += 1
+        test_id = f"{elem.get('classname', '')}::{elem.get('name', '')}".strip(":")
+        problem = elem.find("failure")
+        if problem is None:
+            problem = elem.find("error")
+        # Surefire records retries that eventually passed as flaky elements
+        reran = elem.find("flakyFailure") is not None or elem.find("flakyError") is not None
+        
+        if problem is None:
+            if reran:
+                tracker.outcome(test_id, passed=False)
+            flaky = tracker.outcome(test_id, passed=True)
+        else:
+            failed += 1
+            flaky = tracker.outcome(test_id, passed=False) or reran
+            if len(failures) < max_failures:
+                message = problem.get("message") or (problem.text or "").strip().split("\n", 1)[0]
+                failures.append({
+                    "test": test_id,
+                    "type": problem.get("type", problem.tag),
+                    "message": message[:200],
+                    "text": (problem.text or "")[:max_text],
+                    "fingerprint": fingerprint(test_id, problem.get("type", ""), message),
+                    "flaky": flaky
+                })
+        
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+    
+    return {"tests": tests, "failed": failed, "failures": failures}
+
+
+class LogTail:
+    """Incremental reader for one log file that collects error windows"""
+    
+    def __init__(self, path: Path, before: int = 10, after: int = 10,
+                 max_windows: int = 3, max_window_lines: int = 30,
+                 inode: Optional[int] = None, offset: int = 0):
+        self.path = path
+        self.offset = offset
+        self.inode = inode
+        self.last_growth = time.time()
+        self.after = after
+        self.max_windows = max_windows
+        self.max_window_lines = max_window_lines
+        
+        self.context = deque(maxlen=before)  # Lines preceding the next error
+        self.windows: List[Dict[str, Any]] = []
+        self._open_window: Optional[List[str]] = None
+        self._after_left = 0
+        self._line_start = offset
+        self._window_start: Optional[int] = None  # Offset of the first unreported error
+        self.errors = 0
+    
+    @property
+    def resume_offset(self) -> int:
+        """Where a restarted watcher should resume so unreported errors are read again"""
+        return self._window_start if self._window_start is not None else self.offset
+    
+    def read(self) -> bool:
+        """Consume newly appended complete lines; True if the file grew"""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # New or truncated file (log rotation, CI job re-run)
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.reset()
+        if stat.st_size == self.offset:
+            return False
+        
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Partial line; re-read once it is complete
+                self._line_start = self.offset
+                self.offset += len(raw)
+                self._feed(raw.decode("utf-8", "replace").rstrip("\r\n"))
+        self.last_growth = time.time()
+        return True
+    
+    def _feed(self, line: str):
+        if self._open_window is not None:
+            if len(self._open_window) < self.max_window_lines:
+                self._open_window.append(line)
+            if ERROR_LINE.search(line):
+                self._after_left = self.after
+                self.errors += 1
+            else:
+                self._after_left -= 1
+            if self._after_left <= 0:
+                self._open_window = None
+            self.context.append(line)
+            return
+        
+        if ERROR_LINE.search(line):
+            self.errors += 1
+            if self._window_start is None:
+                self._window_start = self._line_start
+            if len(self.windows) < self.max_windows:
+                self._open_window = list(self.context)[-self.max_window_lines + 1:] + [line]
+                self._after_left = self.after
+                self.windows.append({"error": line.strip()[:200], "lines": self._open_window})
+        self.context.append(line)
+    
+    def reset(self):
+        """Forget collected windows once they have been reported"""
+        self.windows = []
+        self._open_window = None
+        self._after_left = 0
+        self._window_start = None
+        self.errors = 0
+        self.context.clear()
+
+
+class BuildArtifactWatcher:
+    """Watches CI output directories for failing logs and JUnit reports"""
+    
+    LOG_SUFFIXES = (".log", ".txt")
+    MAX_EXCERPT = 4000
+    
+    def __init__(self, watch_dirs: List[str], repository: str = ".", poll_interval: float = 5.0,
+                 settle_seconds: float = 10.0,
+                 event_sink: Optional[Callable[[Dict], Awaitable[None]]] = None,
+                 tracker: Optional[FailureTracker] = None):
+        self.watch_dirs = [Path(d) for d in watch_dirs]
+        self.repository = str(Path(repository).resolve())
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.event_sink = event_sink
+        self.tracker = tracker or FailureTracker()
+        
+        self.logs: Dict[Path, LogTail] = {}
+        self.reports: Dict[Path, tuple] = {}  # path -> (mtime_ns, size) already parsed
+        self._restore_positions()
+        self.event_queue = []
+        self.stats = {"reports": 0, "logs": 0, "events": 0, "suppressed": 0, "flaky": 0}
+        self.running = False
+        self.last_heartbeat = 0.0
+    
+    def _restore_positions(self):
+        """Resume from the positions the last run saved
+        
+        Artifacts unknown to the saved state are treated as already read when
+        they predate it (on a first start, when they predate startup), so old
+        builds are not reported again when the failure dedup window has lapsed.
+        """
+        self.baseline = self.tracker.saved_at or time.time()
+        for name, position in self.tracker.artifacts.items():
+            path = Path(name)
+            if path.suffix == ".xml":
+                self.reports[path] = tuple(position)
+            else:
+                self.logs[path] = LogTail(path, inode=position[0], offset=position[1])
+    
+    def _scan(self):
+        """Yield (path, stat) for candidate artifacts"""
+        for directory in self.watch_dirs:
+            if not directory.is_dir():
+                continue
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    if name.endswith(".xml") or name.endswith(self.LOG_SUFFIXES):
+                        path = Path(root) / name
+                        try:
+                            yield path, path.stat()
+                        except OSError:
+                            pass
+    
+    @timed("build_watcher.poll")
+    def poll(self):
+        """One scan: tail logs, parse settled reports, queue events"""
+        now = time.time()
+        seen = set()
+        for path, stat in self._scan():
+            seen.add(path)
+            settled = now - stat.st_mtime >= self.settle_seconds
+            old = stat.st_mtime < self.baseline
+            if path.suffix == ".xml":
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if path not in self.reports and old:
+                    self.reports[path] = signature
+                elif settled and self.reports.get(path) != signature:
+                    self.reports[path] = signature
+                    self._handle_report(path)
+            else:
+                tail = self.logs.get(path)
+                if tail is None:
+                    offset = stat.st_size if old else 0
+                    tail = self.logs[path] = LogTail(path, inode=stat.st_ino, offset=offset)
+                tail.read()
+                if tail.windows and now - tail.last_growth >= self.settle_seconds:
+                    self._handle_log(tail)
+        
+        # Forget deleted artifacts; keep positions of the rest for the next run
+        self.reports = {path: signature for path, signature in self.reports.items() if path in seen}
+        self.logs = {path: tail for path, tail in self.logs.items() if path in seen}
+        positions = {str(path): list(signature) for path, signature in self.reports.items()}
+        positions.update({str(path): [tail.inode, tail.resume_offset] for path, tail in self.logs.items()})
+        self.tracker.record_artifacts(positions)
+        self.tracker.flush()
+    
+    def _handle_report(self, path: Path):
+        """Parse a finished JUnit report and queue a TEST_FAILURE if needed"""
+        try:
+            result = parse_junit(path, self.tracker)
+        except ET.ParseError as e:
+            print(f"⚠️  Unparseable JUnit report {path}: {e}")
+            return
+        self.stats["reports"] += 1
+        if not result["failed"]:
+            return
+        
+        new = [f for f in result["failures"] if self.tracker.observe(f["fingerprint"])]
+        flaky = [f["test"] for f in result["failures"] if f["flaky"]]
+        self.stats["flaky"] += len(flaky)
+        if not new:
+            self.stats["suppressed"] += 1
+            print(f"🔁 {path.name}: {result['failed']} known failure(s), not re-reported")
+            return
+        
+        excerpt = next((f["text"] for f in new if f["text"]), "")[:self.MAX_EXCERPT]
+        for failure in result["failures"]:
+            failure.pop("text")
+        data = {
+            "repository": self.repository,
+            "build_id": f"{path.stem}-{int(path.stat().st_mtime)}",
+            "build_url": str(path),
+            "error_message": f"{result['failed']} of {result['tests']} tests failed",
+            "failed_tests": [f["test"] for f in result["failures"]],
+            "log_excerpt": excerpt,
+            "failures": new,
+            "repeated": len(result["failures"]) - len(new),
+            "flaky_tests": flaky,
+            "tests_run": result["tests"],
+            "total_failed": result["failed"]
+        }
+        # Flaky-only runs are worth a look, not an emergency
+        priority = Priority.MEDIUM if len(flaky) == len(result["failures"]) else None
+        self._queue(EventType.TEST_FAILURE, data, priority)
+    
+    def _handle_log(self, tail: LogTail):
+        """Queue a BUILD_FAILURE for a log that went quiet with errors in it"""
+        self.stats["logs"] += 1
+        windows = tail.windows
+        fingerprints = [fingerprint(str(tail.path.name), w["error"]) for w in windows]
+        new = [fp for fp in fingerprints if self.tracker.observe(fp)]
+        
+        if new:
+            excerpt = "\n...\n".join("\n".join(w["lines"]) for w in windows)
+            self._queue(EventType.BUILD_FAILURE, {
+                "repository": self.repository,
+                "build_id": tail.path.stem,
+                "build_url": str(tail.path),
+                "error_message": windows[0]["error"],
+                "log_excerpt": excerpt[-self.MAX_EXCERPT:],
+                "error_lines": tail.errors,
+                "fingerprints": fingerprints
+            })
+        else:
+            self.stats["suppressed"] += 1
+            print(f"🔁 {tail.path.name}: known failure, not re-reported")
+        tail.reset()
+    
+    def _queue(self, event_type: EventType, data: Dict, priority: Optional[Priority] = None):
+        event = create_event(event_type, data, source="build-watcher")
+        if priority:
+            event.priority = priority
+        self.event_queue.append(event)
+        self.stats["events"] += 1
+        print(f"\n🚨 {event_type.value}: {data['error_message']} ({data['build_url']})")
+    
+    async def process_events(self):
+        """Hand queued events to the sink, or fall back to the /tmp drop"""
+        while self.event_queue:
+            event = self.event_queue.pop(0)
+            if self.event_sink:
+                await self.event_sink(event.to_dict())
+            else:
+                event_file = Path(f"/tmp/aadf-event-{event.event_id}.json")
+                with open(event_file, "w") as f:
+                    json.dump(event.to_dict(), f, indent=2)
+                print(f"📤 Event {event.event_type.value} written to: {event_file}")
+    
+    async def start(self):
+        """Poll artifact directories until stopped"""
+        self.running = True
+        print("\n🚀 Build Artifact Watcher started")
+        print(f"   Watching: {', '.join(str(d) for d in self.watch_dirs)}")
+        
+        loop = asyncio.get_running_loop()
+        while self.running:
+            self.last_heartbeat = time.time()
+            try:
+                # Parsing is blocking file I/O; keep it off the event loop
+                await loop.run_in_executor(None, self.poll)
+                await self.process_events()
+            except Exception as e:
+                print(f"❌ Error in build watcher loop: {e}")
+            await asyncio.sleep(self.poll_interval)
+    
+    def stop(self):
+        """Stop the watcher"""
+        self.running = False
+
+
+async def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Build Artifact Watcher")
+    parser.add_argument(
+        "--dir",
+        action="append",
+        required=True,
+        help="Directory of CI logs and JUnit XML reports; repeat for several"
+    )
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Repository these builds belong to (default: current directory)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Polling interval in seconds (default: 5)"
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=10.0,
+        help="Seconds an artifact must be unchanged before it is reported (default: 10)"
+    )
+    
+    args = parser.parse_args()
+    
+    watcher = BuildArtifactWatcher(args.dir, args.repo, args.interval, args.settle)
+    await watcher.start()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n\n🛑 Build Artifact Watcher stopped")
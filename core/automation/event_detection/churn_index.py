@@ -0,0 +1,304 @@
+"""
+Churn Index
+Incrementally maintained per-file and per-directory change history
+(frequency, recent authors, decayed churn, co-change pairs) so commit
+events can carry hotspot scores without running `git log` per file.
+"""
+
+import os
+import math
+import json
+import time
+import hashlib
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable
+
+
+DEFAULT_INDEX_DIR = "/tmp/aadf-churn"
+
+
+def default_index_path(repo_path: str, index_dir: str = DEFAULT_INDEX_DIR) -> Path:
+    """One index file per repository, keyed by its resolved path"""
+    digest = hashlib.sha1(str(Path(repo_path).resolve()).encode()).hexdigest()[:12]
+    return Path(index_dir) / f"{digest}.json"
+
+
+class ChurnIndex:
+    """On-disk history of how often and how heavily paths change
+    
+    Counts decay exponentially with `half_life_days`, so a file that breaks
+    every week stays hot while one rewritten once a year cools off. Lookups
+    are dictionary reads; the index is updated once per ingested commit.
+    """
+    
+    # Scales at which frequency and churn contribute ~63% of their weight
+    FREQUENCY_SCALE = 4.0
+    CHURN_SCALE = 400.0
+    FREQUENCY_WEIGHT = 0.6
+    
+    MAX_AUTHORS = 5
+    MAX_PARTNERS = 20         # Co-change partners kept per file
+    MAX_COCHANGE_FILES = 30   # Larger commits (mass renames, formatting) skip co-change
+    RECENT_COMMITS = 512      # Hashes remembered to avoid double counting
+    
+    def __init__(self, path: Optional[str], half_life_days: float = 30.0,
+                 max_paths: int = 50000, backfill_limit: int = 5000):
+        self.path = Path(path) if path else None
+        self.half_life = half_life_days * 86400.0
+        self.max_paths = max_paths
+        self.backfill_limit = backfill_limit
+        
+        # path -> {"commits", "frequency", "churn", "updated", "authors"}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.directories: Dict[str, Dict[str, Any]] = {}
+        # path -> {partner: co-change count}
+        self.co_changes: Dict[str, Dict[str, int]] = {}
+        
+        self.last_commit: Optional[str] = None
+        self.recent_commits = deque(maxlen=self.RECENT_COMMITS)
+        self._recent_set = set()
+        self._dirty = False
+        
+        self._load()
+    
+    def _load(self):
+        """Read a previously flushed index"""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.directories = data.get("directories", {})
+            self.co_changes = data.get("co_changes", {})
+            self.last_commit = data.get("last_commit")
+            self.recent_commits.extend(data.get("recent_commits", []))
+            self._recent_set = set(self.recent_commits)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable churn index {self.path}: {e}")
+    
+    def flush(self):
+        """Atomically persist the index if it changed"""
+        if not self._dirty or not self.path:
+            return
+        self._prune()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "last_commit": self.last_commit,
+                "recent_commits": list(self.recent_commits),
+                "files": self.files,
+                "directories": self.directories,
+                "co_changes": self.co_changes
+            }, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+    
+    def _prune(self):
+        """Drop the coldest paths once the index outgrows max_paths"""
+        if len(self.files) <= self.max_paths:
+            return
+        now = time.time()
+        coldest = sorted(self.files, key=lambda p: self._decayed(self.files[p], "frequency", now))
+        for path in coldest[:len(self.files) - self.max_paths]:
+            del self.files[path]
+            for partner in self.co_changes.pop(path, {}):
+                self.co_changes.get(partner, {}).pop(path, None)
+    
+    def _decay_factor(self, since: float, now: float) -> float:
+        return 0.5 ** (max(now - since, 0.0) / self.half_life)
+    
+    def _decayed(self, record: Dict[str, Any], key: str, now: float) -> float:
+        return record[key] * self._decay_factor(record["updated"], now)
+    
+    def _bump(self, table: Dict[str, Dict[str, Any]], path: str, churn: int,
+              author: str, timestamp: float):
+        record = table.get(path)
+        if record is None:
+            record = {"commits": 0, "frequency": 0.0, "churn": 0.0, "updated": timestamp, "authors": []}
+            table[path] = record
+        
+        factor = self._decay_factor(record["updated"], timestamp)
+        record["frequency"] = record["frequency"] * factor + 1.0
+        record["churn"] = record["churn"] * factor + churn
+        record["updated"] = max(record["updated"], timestamp)
+        record["commits"] += 1
+        
+        if author:
+            authors = [a for a in record["authors"] if a != author]
+            record["authors"] = ([author] + authors)[:self.MAX_AUTHORS]
+    
+    def _link(self, path: str, partner: str):
+        """Count a co-change, keeping only each file's strongest partners"""
+        partners = self.co_changes.setdefault(path, {})
+        partners[partner] = partners.get(partner, 0) + 1
+        if len(partners) > self.MAX_PARTNERS:
+            weakest = min(partners, key=partners.get)
+            del partners[weakest]
+    
+    def record_commit(self, commit_hash: str, author: str, timestamp: float,
+                      diff_stats: Dict[str, Dict[str, int]]) -> bool:
+        """Fold one commit's per-file stats into the index; False if already seen"""
+        if commit_hash in self._recent_set:
+            return False
+        
+        directory_churn: Dict[str, int] = {}
+        for path, stats in diff_stats.items():
+            churn = stats.get("additions", 0) + stats.get("deletions", 0)
+            self._bump(self.files, path, churn, author, timestamp)
+            directory = os.path.dirname(path) or "."
+            directory_churn[directory] = directory_churn.get(directory, 0) + churn
+        
+        for directory, churn in directory_churn.items():
+            self._bump(self.directories, directory, churn, author, timestamp)
+        
+        paths = sorted(diff_stats)
+        if 1 < len(paths) <= self.MAX_COCHANGE_FILES:
+            for i, path in enumerate(paths):
+                for partner in paths[i + 1:]:
+                    self._link(path, partner)
+                    self._link(partner, path)
+        
+        if len(self.recent_commits) == self.recent_commits.maxlen:
+            self._recent_set.discard(self.recent_commits[0])
+        self.recent_commits.append(commit_hash)
+        self._recent_set.add(commit_hash)
+        self._dirty = True
+        return True
+    
+    def mark_synced(self, commit_hash: str):
+        """Record that history up to `commit_hash` has been ingested"""
+        if commit_hash and commit_hash != self.last_commit:
+            self.last_commit = commit_hash
+            self._dirty = True
+    
+    def score(self, path: str, now: Optional[float] = None) -> float:
+        """Hotspot score (0-100) for a single file"""
+        record = self.files.get(path)
+        if record is None:
+            return 0.0
+        now = now or time.time()
+        frequency = 1 - math.exp(-self._decayed(record, "frequency", now) / self.FREQUENCY_SCALE)
+        churn = 1 - math.exp(-self._decayed(record, "churn", now) / self.CHURN_SCALE)
+        return 100 * (self.FREQUENCY_WEIGHT * frequency + (1 - self.FREQUENCY_WEIGHT) * churn)
+    
+    def hotspots(self, paths: Iterable[str], top: int = 10) -> Dict[str, Any]:
+        """Hotspot summary for the files and directories of a commit, from history before it"""
+        now = time.time()
+        paths = list(paths)
+        directories = {os.path.dirname(path) or "." for path in paths}
+        scores = {path: self.score(path, now) for path in paths}
+        hottest = sorted(scores.items(), key=lambda item: -item[1])[:top]
+        
+        # Files that usually change alongside these but are missing from the commit
+        missing: Dict[str, int] = {}
+        changed = set(paths)
+        for path in paths:
+            for partner, count in self.co_changes.get(path, {}).items():
+                if partner not in changed:
+                    missing[partner] = missing.get(partner, 0) + count
+        
+        # Directory history covers files the index has not seen yet
+        directory_stats = {directory: self.directory_stats(directory, now) for directory in directories}
+        busiest_directories = sorted(((d, stats) for d, stats in directory_stats.items() if stats),
+                                     key=lambda item: -item[1]["churn"])[:5]
+        
+        return {
+            "max_score": round(max(scores.values(), default=0.0), 2),
+            "mean_score": round(sum(scores.values()) / len(scores), 2) if scores else 0.0,
+            "files": {
+                path: {
+                    "score": round(score, 2),
+                    "commits": self.files[path]["commits"] if path in self.files else 0,
+                    "recent_authors": self.files[path]["authors"] if path in self.files else []
+                }
+                for path, score in hottest
+            },
+            "usually_changed_with": [
+                {"path": partner, "count": count}
+                for partner, count in sorted(missing.items(), key=lambda item: -item[1])[:5]
+            ],
+            "directories": dict(busiest_directories)
+        }
+    
+    def directory_stats(self, directory: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Decayed frequency and churn for a directory, if it has history"""
+        record = self.directories.get(directory)
+        if record is None:
+            return None
+        now = now or time.time()
+        return {
+            "commits": record["commits"],
+            "frequency": round(self._decayed(record, "frequency", now), 3),
+            "churn": round(self._decayed(record, "churn", now), 1),
+            "recent_authors": record["authors"]
+        }
+    
+    def backfill(self, repo_path: str, until: str) -> int:
+        """Build the index from history with a single streamed `git log`
+        
+        `until` is a commit hash. Resumes from last_commit when it is still
+        an ancestor, so restarts only read the commits made while the
+        watcher was down.
+        """
+        revision = until
+        if self.last_commit:
+            if self.last_commit == until:
+                return 0
+            is_ancestor = subprocess.run(
+                ["git", "merge-base", "--is-ancestor", self.last_commit, until],
+                cwd=repo_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ).returncode == 0
+            if is_ancestor:
+                revision = f"{self.last_commit}..{until}"
+        
+        count = 0
+        current: Optional[List] = None
+        with subprocess.Popen(
+            ["git", "log", "--reverse", "--no-merges", "--numstat", "--format=@@%H|%ae|%ct",
+             f"--max-count={self.backfill_limit}", revision],
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        ) as process:
+            for line in process.stdout:
+                line = line.rstrip("\n")
+                if line.startswith("@@"):
+                    if current and self.record_commit(*current):
+                        count += 1
+                    commit_hash, author, timestamp = line[2:].split("|", 2)
+                    current = [commit_hash, author, float(timestamp), {}]
+                    continue
+                
+                parts = line.split("\t", 2)
+                if current and len(parts) == 3:
+                    current[3][parts[2]] = {
+                        "additions": int(parts[0]) if parts[0] != "-" else 0,
+                        "deletions": int(parts[1]) if parts[1] != "-" else 0
+                    }
+        
+        if current and self.record_commit(*current):
+            count += 1
+        
+        self.mark_synced(until)
+        return count
+
+
+def add_churn_index_arguments(parser):
+    """Register churn index command-line flags"""
+    parser.add_argument("--churn-index-dir", default=DEFAULT_INDEX_DIR,
+                        help=f"Per-repository churn index location, empty to disable (default: {DEFAULT_INDEX_DIR})")
+    parser.add_argument("--churn-backfill", type=int, default=5000,
+                        help="Commits of history read when first building an index (default: 5000)")
+
+
+def churn_index_for(repo_path: str, index_dir: Optional[str],
+                    backfill_limit: int = 5000) -> Optional[ChurnIndex]:
+    """The churn index for a repository, or None when disabled"""
+    if not index_dir:
+        return None
+    return ChurnIndex(default_index_path(repo_path, index_dir), backfill_limit=backfill_limit)
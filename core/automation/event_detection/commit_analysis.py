@@ -0,0 +1,378 @@
+"""
+Commit Analysis
+Streaming diff statistics, payload limits, and pure commit classification.
+Importable by worker processes so analysis can run off the watcher's
+polling thread.
+"""
+
+import os
+import time
+import heapq
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from event_detection.event_types import Priority
+
+
+@dataclass
+class PayloadPolicy:
+    """Bounds on how much per-file detail a commit event may carry"""
+    max_files: int = 200             # Top-N files (by churn) kept in the event
+    max_directories: int = 50        # Directory rollups kept in the event
+    rollup_depth: int = 2            # Path components used for directory rollups
+    spill_dir: Optional[str] = "/tmp/aadf-spill"  # Full numstat list for truncated commits
+    spill_max_age: float = 7 * 24 * 3600  # Spill files older than this are removed
+    spill_max_mb: float = 512.0           # Oldest spill files go first past this total
+    
+    # Hard cap on distinct rollup keys tracked while streaming
+    max_tracked_directories: int = 2000
+
+
+class DiffStatAggregator:
+    """Aggregates `diff-tree --numstat` lines as they are read
+    
+    Memory is bounded by the policy regardless of commit size: only the
+    top-N files by churn and a capped set of directory rollups are kept.
+    Once a commit exceeds max_files, every line is written through to a
+    side file so the full list remains available.
+    """
+    
+    # Beyond these counts the complexity score is already saturated
+    SCORING_CAP = 64
+    
+    def __init__(self, policy: PayloadPolicy, commit_hash: str):
+        self.policy = policy
+        self.commit_hash = commit_hash
+        
+        self.total_files = 0
+        self.total_additions = 0
+        self.total_deletions = 0
+        self.has_tests = False
+        self.has_docs = False
+        self.extensions = set()
+        self.directories = set()
+        self.rollup: Dict[str, Dict[str, int]] = {}
+        
+        self._head: List[str] = []   # First max_files lines, in git order
+        self._top: List[tuple] = []  # Min-heap of (churn, seq, path, additions, deletions)
+        self._spill = None
+        self.spill_path: Optional[Path] = None
+    
+    def feed(self, line: str):
+        """Consume one numstat line"""
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            return
+        
+        additions = int(parts[0]) if parts[0] != "-" else 0
+        deletions = int(parts[1]) if parts[1] != "-" else 0
+        path = parts[2]
+        churn = additions + deletions
+        
+        self.total_files += 1
+        self.total_additions += additions
+        self.total_deletions += deletions
+        
+        if not self.has_tests and "test" in path:
+            self.has_tests = True
+        if not self.has_docs and path.endswith(".md"):
+            self.has_docs = True
+        if "." in path and len(self.extensions) < self.SCORING_CAP:
+            self.extensions.add(path.split(".")[-1])
+        if len(self.directories) < self.SCORING_CAP:
+            self.directories.add(os.path.dirname(path))
+        
+        self._add_to_rollup(path, additions, deletions)
+        
+        entry = (churn, self.total_files, path, additions, deletions)
+        if len(self._top) < self.policy.max_files:
+            heapq.heappush(self._top, entry)
+        elif churn > self._top[0][0]:
+            heapq.heapreplace(self._top, entry)
+        
+        self._write_through(line)
+    
+    def _add_to_rollup(self, path: str, additions: int, deletions: int):
+        """Roll file stats up to their directory prefix"""
+        components = path.split("/")[:-1][:self.policy.rollup_depth]
+        key = "/".join(components) or "."
+        if key not in self.rollup and len(self.rollup) >= self.policy.max_tracked_directories:
+            key = "(other)"
+        
+        rollup = self.rollup.get(key)
+        if rollup is None:
+            rollup = {"files": 0, "additions": 0, "deletions": 0}
+            self.rollup[key] = rollup
+        rollup["files"] += 1
+        rollup["additions"] += additions
+        rollup["deletions"] += deletions
+    
+    def _write_through(self, line: str):
+        """Buffer the first max_files lines, then spill everything to disk"""
+        if self._spill is not None:
+            self._spill.write(line + "\n")
+            return
+        
+        if self.total_files <= self.policy.max_files:
+            self._head.append(line)
+            return
+        
+        if not self.policy.spill_dir:
+            self._head = []
+            return
+        
+        spill_dir = Path(self.policy.spill_dir)
+        spill_dir.mkdir(parents=True, exist_ok=True)
+        prune_spill_dir(self.policy)
+        self.spill_path = spill_dir / f"{self.commit_hash}.numstat"
+        self._spill = open(self.spill_path, "w")
+        self._spill.writelines(buffered + "\n" for buffered in self._head)
+        self._spill.write(line + "\n")
+        self._head = []
+    
+    def discard(self):
+        """Close and remove any side file, for a diff that could not be read in full"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self.spill_path is not None:
+            try:
+                self.spill_path.unlink()
+            except OSError:
+                pass
+            self.spill_path = None
+    
+    def finish(self) -> Dict[str, Any]:
+        """Close any side file and return the bounded summary"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        
+        truncated = self.total_files > self.policy.max_files
+        if truncated:
+            kept = sorted(self._top, key=lambda e: (-e[0], e[1]))
+        else:
+            kept = sorted(self._top, key=lambda e: e[1])  # Original git order
+        
+        directories = sorted(self.rollup.items(), key=lambda item: -(item[1]["additions"] + item[1]["deletions"]))
+        
+        return {
+            "files_changed": [e[2] for e in kept],
+            "diff_stats": {e[2]: {"additions": e[3], "deletions": e[4]} for e in kept},
+            "total_files": self.total_files,
+            "total_additions": self.total_additions,
+            "total_deletions": self.total_deletions,
+            "truncated": truncated,
+            "directory_rollup": dict(directories[:self.policy.max_directories]),
+            "full_file_list": str(self.spill_path) if self.spill_path else None,
+            "has_tests": self.has_tests,
+            "has_docs": self.has_docs,
+            "extension_count": len(self.extensions),
+            "directory_count": len(self.directories)
+        }
+
+
+def prune_spill_dir(policy: PayloadPolicy) -> int:
+    """Remove spill files past the policy's age, then the oldest beyond its size cap
+    
+    Events only carry the path, and agents may read a file long after the
+    commit was analysed, so files are expired rather than deleted on use.
+    Returns the number of files removed.
+    """
+    if not policy.spill_dir:
+        return 0
+    files = []
+    for path in Path(policy.spill_dir).glob("*.numstat"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # Removed by another worker
+        files.append((stat.st_mtime, stat.st_size, path))
+    
+    cutoff = time.time() - policy.spill_max_age
+    budget = policy.spill_max_mb * 1024 * 1024
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in sorted(files, key=lambda f: f[0]):
+        if mtime >= cutoff and total <= budget:
+            break
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+        total -= size
+    return removed
+
+
+def numstat_command(commit_hash: str, pathspec: Optional[List[str]] = None) -> List[str]:
+    """git arguments producing per-file stats (and the file list) for a commit
+    
+    A pathspec restricts the diff inside git, so excluded paths are never
+    compared or streamed.
+    """
+    return ["diff-tree", "--no-commit-id", "--numstat", "-r", commit_hash] + (pathspec or [])
+
+
+def changes_command(commit_hash: str) -> List[str]:
+    """git arguments exiting 1 if the commit changes any file (stops at the first)"""
+    return ["diff-tree", "--quiet", "-r", commit_hash]
+
+
+def excluded_only(repo_path: str, commit_hash: str, summary: Dict[str, Any]) -> bool:
+    """True for a commit whose changes were all filtered out by the pathspec"""
+    if summary["total_files"]:
+        return False
+    # Merges and empty commits have no diff at all and are not suppressed
+    result = subprocess.run(["git"] + changes_command(commit_hash), cwd=repo_path,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return result.returncode == 1
+
+
+def stream_diff_summary(repo_path: str, commit_hash: str, policy: PayloadPolicy,
+                        pathspec: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Stream numstat output through a DiffStatAggregator without buffering it
+    
+    Raises RuntimeError if git fails, like the watcher's async path.
+    """
+    aggregator = DiffStatAggregator(policy, commit_hash)
+    command = numstat_command(commit_hash, pathspec)
+    with subprocess.Popen(
+        ["git"] + command,
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    ) as process:
+        for line in process.stdout:
+            aggregator.feed(line.rstrip("\n"))
+        stderr = process.stderr.read()
+    if process.returncode != 0:
+        aggregator.discard()
+        raise RuntimeError(f"git {' '.join(command)} failed: {stderr.strip()}")
+    return aggregator.finish()
+
+
+def determine_commit_priority(subject: str, file_count: int) -> Priority:
+    """Determine priority based on commit characteristics"""
+    subject = subject.lower()
+    
+    # Critical keywords
+    if any(keyword in subject for keyword in ["fix", "bug", "critical", "urgent"]):
+        return Priority.CRITICAL
+    
+    # High priority keywords
+    if any(keyword in subject for keyword in ["feat", "feature", "refactor"]):
+        return Priority.HIGH
+    
+    # Check file count
+    if file_count > 10:
+        return Priority.HIGH
+    
+    return Priority.MEDIUM
+
+
+def detect_patterns_in_commit(subject: str, has_tests: bool, has_docs: bool) -> List[str]:
+    """Detect which patterns might apply to this commit"""
+    patterns = []
+    
+    # Check for test files
+    if has_tests:
+        patterns.append("test-pattern")
+    
+    # Check for documentation
+    if has_docs:
+        patterns.append("documentation-pattern")
+    
+    # Check for refactoring
+    if "refactor" in subject.lower():
+        patterns.append("refactoring-pattern")
+    
+    # Check for new features
+    if any(word in subject.lower() for word in ["feat", "feature", "add"]):
+        patterns.append("feature-pattern")
+    
+    return patterns
+
+
+def estimate_commit_complexity(file_count: int, total_changes: int,
+                               extension_count: int, directory_count: int) -> float:
+    """Estimate complexity score (0-100) based on commit characteristics"""
+    complexity = 0.0
+    
+    # File count factor
+    complexity += min(file_count * 2, 30)  # Max 30 points for files
+    
+    # Lines changed factor
+    complexity += min(total_changes / 10, 30)  # Max 30 points for lines
+    
+    # File type diversity
+    complexity += min(extension_count * 5, 20)  # Max 20 points for diversity
+    
+    # Integration complexity (multiple directories)
+    complexity += min(directory_count * 3, 20)  # Max 20 points for integration
+    
+    return min(complexity, 100)
+
+
+def score_commit(subject: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Classify a commit from its streamed summary"""
+    return {
+        "priority": determine_commit_priority(subject, summary["total_files"]).value,
+        "patterns": detect_patterns_in_commit(subject, summary["has_tests"], summary["has_docs"]),
+        "complexity": estimate_commit_complexity(
+            summary["total_files"],
+            summary["total_additions"] + summary["total_deletions"],
+            summary["extension_count"],
+            summary["directory_count"]
+        )
+    }
+
+
+def analyze_commit(repo_path: str, commit_hash: str, subject: str,
+                   policy: PayloadPolicy, pathspec: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Analysis stage entry point, safe to run in a ProcessPoolExecutor
+    
+    The worker streams git output itself, so only the commit hash goes in
+    and only the policy-bounded summary comes back across the process
+    boundary.
+    """
+    summary = stream_diff_summary(repo_path, commit_hash, policy, pathspec)
+    if pathspec:
+        summary["excluded_only"] = excluded_only(repo_path, commit_hash, summary)
+    return {"summary": summary, **score_commit(subject, summary)}
+
+
+def add_payload_arguments(parser):
+    """Register commit event payload limit command-line flags"""
+    parser.add_argument(
+        "--max-event-files",
+        type=int,
+        default=PayloadPolicy.max_files,
+        help=f"Files listed per commit event before truncating (default: {PayloadPolicy.max_files})"
+    )
+    parser.add_argument(
+        "--spill-dir",
+        default=PayloadPolicy.spill_dir,
+        help=f"Where full file lists of truncated commits are written (default: {PayloadPolicy.spill_dir})"
+    )
+    parser.add_argument(
+        "--spill-max-age-days",
+        type=float,
+        default=PayloadPolicy.spill_max_age / 86400,
+        help=f"Days a full file list is kept (default: {PayloadPolicy.spill_max_age / 86400:g})"
+    )
+    parser.add_argument(
+        "--spill-max-mb",
+        type=float,
+        default=PayloadPolicy.spill_max_mb,
+        help=f"Total size of kept file lists; oldest are removed first (default: {PayloadPolicy.spill_max_mb:g})"
+    )
+
+
+def payload_policy_from_args(args) -> PayloadPolicy:
+    """Build a PayloadPolicy from parsed arguments"""
+    return PayloadPolicy(max_files=args.max_event_files, spill_dir=args.spill_dir,
+                         spill_max_age=args.spill_max_age_days * 86400, spill_max_mb=args.spill_max_mb)
@@ -16,6 +16,7 @@ class EventType(Enum):
     NEW_BRANCH = "new_branch"
     PR_CREATED = "pr_created"
     PR_MERGED = "pr_merged"
+    HISTORY_REWRITTEN = "history_rewritten"
     
     # Time-based events
     SESSION_START = "session_start"
@@ -143,6 +144,66 @@ EVENT_HANDLERS = {
         "priority": Priority.MEDIUM,
         "agents": ["framework-architect"],
         "patterns": ["pattern-documentation", "pattern-validation"]
+    },
+    EventType.PR_CREATED: {
+        "handler": "handle_pr_created",
+        "priority": Priority.HIGH,
+        "agents": ["cto"],
+        "patterns": ["code-review"]
+    },
+    EventType.PR_MERGED: {
+        "handler": "handle_pr_merged",
+        "priority": Priority.MEDIUM,
+        "agents": ["framework-architect"],
+        "patterns": ["pattern-extraction"]
+    },
+    EventType.TEST_FAILURE: {
+        "handler": "handle_build_failure",
+        "priority": Priority.HIGH,
+        "agents": ["cto"],
+        "patterns": ["error-diagnosis"]
+    },
+    EventType.LINT_ERROR: {
+        "handler": "handle_build_failure",
+        "priority": Priority.MEDIUM,
+        "agents": ["cto"],
+        "patterns": ["error-diagnosis", "quick-fix"]
+    },
+    EventType.TYPE_ERROR: {
+        "handler": "handle_build_failure",
+        "priority": Priority.MEDIUM,
+        "agents": ["cto"],
+        "patterns": ["error-diagnosis", "quick-fix"]
+    },
+    EventType.ISSUE_CREATED: {
+        "handler": "handle_issue_created",
+        "priority": Priority.MEDIUM,
+        "agents": ["strategic-advisor"],
+        "patterns": ["task-prioritization"]
+    },
+    EventType.HISTORY_REWRITTEN: {
+        "handler": "handle_history_rewritten",
+        "priority": Priority.LOW,
+        "agents": ["cto"],
+        "patterns": ["code-review"]
+    },
+    EventType.SESSION_END: {
+        "handler": "handle_session_end",
+        "priority": Priority.MEDIUM,
+        "agents": ["strategic-advisor"],
+        "patterns": ["session-review"]
+    },
+    EventType.DAILY_STANDUP: {
+        "handler": "handle_daily_standup",
+        "priority": Priority.MEDIUM,
+        "agents": ["strategic-advisor"],
+        "patterns": ["progress-reporting"]
+    },
+    EventType.WEEKLY_REVIEW: {
+        "handler": "handle_weekly_review",
+        "priority": Priority.MEDIUM,
+        "agents": ["cto", "strategic-advisor"],
+        "patterns": ["architecture-review", "velocity-tracking"]
     }
 }
 
@@ -169,7 +230,7 @@ def create_event(event_type: EventType, data: Dict[str, Any],
     
     # Create specific event types
     if event_type in [EventType.NEW_COMMIT, EventType.NEW_BRANCH, 
-                     EventType.PR_CREATED, EventType.PR_MERGED]:
+                     EventType.PR_CREATED, EventType.PR_MERGED, EventType.HISTORY_REWRITTEN]:
         # Extract git-specific fields from data
         git_params = {
             'repository': data.get('repository', ''),
@@ -180,7 +241,8 @@ def create_event(event_type: EventType, data: Dict[str, Any],
             'diff_stats': data.get('diff_stats')
         }
         return GitEvent(**git_params, **base_params)
-    elif event_type in [EventType.BUILD_FAILURE, EventType.TEST_FAILURE]:
+    elif event_type in [EventType.BUILD_FAILURE, EventType.TEST_FAILURE,
+                        EventType.LINT_ERROR, EventType.TYPE_ERROR]:
         # Extract build-specific fields from data
         build_params = {
             'build_id': data.get('build_id', ''),
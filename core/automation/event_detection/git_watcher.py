@@ -10,56 +10,195 @@ import time
 import json
 import subprocess
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Any
+from collections import deque
+from concurrent.futures import Executor, Future
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from event_types import EventType, create_event, Priority
+from event_detection.event_types import EventType, create_event, Priority
+from event_detection.commit_analysis import (
+    PayloadPolicy, analyze_commit, stream_diff_summary,
+    determine_commit_priority, detect_patterns_in_commit, estimate_commit_complexity,
+    add_payload_arguments, payload_policy_from_args
+)
+from event_detection.churn_index import ChurnIndex, add_churn_index_arguments, churn_index_for
+from event_detection.path_filter import PathFilter, load_path_filter, add_path_filter_arguments, path_filter_for
+from event_detection.poll_schedule import PollSchedule, add_poll_schedule_arguments, poll_schedule_from_args
+from event_detection.analysis_cache import AnalysisCache, add_analysis_cache_arguments, analysis_cache_from_args
+from event_detection.pattern_store import PatternStore
+from event_detection.watcher_checkpoint import WatcherCheckpoint, add_checkpoint_arguments, checkpoint_for
+from monitoring.profiler import timed, add_profiling_arguments, profiler_from_args
 
 
 class GitWatcher:
     """Monitors git repository for automation-triggering events"""
     
-    def __init__(self, repo_path: str = ".", poll_interval: int = 10):
+    COMMIT_FORMAT = "%H|%an|%ae|%ct|%s|%b"
+    REF_MAP_COMMAND = ["show-ref", "--head"]
+    
+    # Newly reachable commits, oldest first, each tagged with the tip it was reached from
+    NEW_COMMITS_COMMAND = ["log", "--reverse", "--topo-order", "--source", "--ignore-missing",
+                           "--format=%H %S", "--stdin"]
+    
+    # Rewrites of these branches (local or remote-tracking) are raised as HIGH priority
+    PROTECTED_BRANCHES = ("main", "master", "develop")
+    
+    # Complexity points added per point of the hottest file's score
+    HOTSPOT_WEIGHT = 0.3
+    
+    def __init__(self, repo_path: str = ".", poll_interval: int = 10,
+                 analysis_pool: Optional[Executor] = None,
+                 payload_policy: Optional[PayloadPolicy] = None,
+                 churn_index: Optional[ChurnIndex] = None,
+                 checkpoint: Optional[WatcherCheckpoint] = None, catchup_batch: int = 200,
+                 path_filter: Optional[PathFilter] = None,
+                 poll_schedule: Optional[PollSchedule] = None,
+                 analysis_cache: Optional[AnalysisCache] = None):
+        self._init_state(repo_path, poll_interval, analysis_pool, payload_policy, churn_index,
+                         checkpoint, catchup_batch, path_filter, poll_schedule, analysis_cache)
+        
+        # Initialize state
+        self._initialize_state()
+    
+    def _init_state(self, repo_path: str, poll_interval: int, analysis_pool: Optional[Executor],
+                    payload_policy: Optional[PayloadPolicy], churn_index: Optional[ChurnIndex],
+                    checkpoint: Optional[WatcherCheckpoint], catchup_batch: int,
+                    path_filter: Optional[PathFilter], poll_schedule: Optional[PollSchedule],
+                    analysis_cache: Optional[AnalysisCache]):
+        """Set up watcher attributes without touching git (shared with AsyncGitWatcher)"""
         self.repo_path = Path(repo_path).resolve()
         self.poll_interval = poll_interval
+        self.payload_policy = payload_policy or PayloadPolicy()
+        
+        # Optional adaptive schedule; poll_interval is then only the starting interval
+        self.poll_schedule = poll_schedule
+        self.poll_state = poll_schedule.register(str(self.repo_path), poll_interval) if poll_schedule else None
+        
+        # Pathspecs passed to git so excluded paths are never diffed
+        self.path_filter = path_filter or load_path_filter(str(self.repo_path))
+        self.filter_stats = {"commits_suppressed": 0}
+        
+        # Optional analyses by commit ID, shareable across watchers and repositories
+        self.analysis_cache = analysis_cache
+        self.analysis_variant = AnalysisCache.variant(self.payload_policy, self.path_filter.pathspec(),
+                                                      self.COMMIT_FORMAT)
+        
+        # Optional resume point; new commits are processed catchup_batch at a time
+        self.checkpoint = checkpoint
+        self.catchup_batch = catchup_batch
+        self.catchup: Optional[Dict] = None
+        self._catchup_commits: Optional[List[str]] = None
+        self._catchup_dispatched = 0
+        self.event_sequence = 0
+        
+        # Optional per-file history used to score hotspots without git log
+        self.churn_index = churn_index
+        
+        # Indexed .ai/patterns library for attaching related patterns
+        self.pattern_store = PatternStore(self.repo_path / ".ai" / "patterns")
+        
+        # Optional executor (e.g. ProcessPoolExecutor) for the analysis stage;
+        # pending analyses are completed strictly in commit order
+        self.analysis_pool = analysis_pool
+        self.pending_analyses = deque()
         self.last_commit_hash = None
         self.known_branches: Set[str] = set()
+        self.known_refs: Dict[str, str] = {}  # Branch/HEAD tips whose commits are processed
+        self._polled_refs: Optional[Dict[str, str]] = None
         self.running = False
         
+        # Optional ProfileSession, polled from the main loop
+        self.profiler = None
+        
         # Event queue for processing
         self.event_queue = []
-        
-        # Initialize state
-        self._initialize_state()
     
     def _initialize_state(self):
         """Initialize watcher state from current git status"""
         try:
-            # Get current commit
-            self.last_commit_hash = self._get_current_commit()
-            
-            # Get all branches
-            branches = self._get_all_branches()
-            self.known_branches = set(branches)
+            if self._checkpoint_usable() and self._checkpoint_valid():
+                self._restore_checkpoint()
+            else:
+                # Tips of every branch and HEAD, in one git call
+                self.known_refs = self._get_ref_map()
+                self.last_commit_hash = self.known_refs.get("HEAD", "")
+                self.known_branches = set(self.known_refs) - {"HEAD"}
             
             print(f"Git Watcher initialized:")
             print(f"  Repository: {self.repo_path}")
             print(f"  Current commit: {self.last_commit_hash[:8]}")
             print(f"  Known branches: {len(self.known_branches)}")
             
+            self._sync_churn_index()
+        
         except Exception as e:
             print(f"Error initializing git watcher: {e}")
             raise
     
-    def _run_git_command(self, command: List[str]) -> str:
+    def _checkpoint_usable(self) -> bool:
+        """A checkpoint with a processed commit is available"""
+        return self.checkpoint is not None and bool(self.checkpoint.head)
+    
+    def _checkpoint_valid(self) -> bool:
+        """The checkpointed commit still exists (e.g. not lost to a re-clone)"""
+        exists = self._run_git_command(["cat-file", "-t", self.checkpoint.head]) == "commit"
+        if not exists:
+            print(f"  Checkpoint commit {self.checkpoint.head[:8]} is gone; starting from HEAD")
+        return exists
+    
+    def _restore_checkpoint(self):
+        """Resume from the checkpoint; commits made since are caught up on the next polls"""
+        checkpoint = self.checkpoint
+        self.last_commit_hash = checkpoint.head
+        self.known_refs = dict(checkpoint.refs)
+        self.catchup = checkpoint.catchup
+        self.known_branches = set(self.catchup["target"] if self.catchup else self.known_refs) - {"HEAD"}
+        self.event_sequence = checkpoint.sequence
+        if self.catchup:
+            self._catchup_dispatched = self.catchup["done"]
+        print(f"  Resumed from checkpoint (event #{self.event_sequence}, "
+              f"saved {time.time() - checkpoint.updated:.0f}s ago)")
+    
+    def save_checkpoint(self):
+        """Record the position reached once queued events have been handed off"""
+        if self.checkpoint is None:
+            return
+        self.checkpoint.update(self.last_commit_hash, self.known_refs, self.catchup, self.event_sequence)
+        self.checkpoint.save()
+    
+    def catchup_progress(self) -> Optional[Dict[str, Optional[int]]]:
+        """Commits dispatched and total in the range being caught up, or None"""
+        if self.catchup is None:
+            return None
+        total = len(self._catchup_commits) if self._catchup_commits is not None else None
+        return {"done": self.catchup["done"], "total": total}
+    
+    def _next_sequence(self) -> int:
+        """Per-repository event number; consumers can spot gaps and repeats"""
+        self.event_sequence += 1
+        return self.event_sequence
+    
+    def _sync_churn_index(self):
+        """Build the churn index, or catch it up to the current commit"""
+        if self.churn_index is None or not self.last_commit_hash:
+            return
+        start = time.time()
+        count = self.churn_index.backfill(str(self.repo_path), self.last_commit_hash)
+        self.churn_index.flush()
+        print(f"  Churn index: {len(self.churn_index.files)} files "
+              f"({count} commits backfilled in {time.time() - start:.2f}s)")
+    
+    @timed("git_watcher._run_git_command")
+    def _run_git_command(self, command: List[str], stdin: Optional[str] = None) -> str:
         """Run a git command and return output"""
         try:
             result = subprocess.run(
                 ["git"] + command,
                 cwd=self.repo_path,
+                input=stdin,
                 capture_output=True,
                 text=True,
                 check=True
@@ -73,101 +212,359 @@ class GitWatcher:
         """Get the current HEAD commit hash"""
         return self._run_git_command(["rev-parse", "HEAD"])
     
+    @staticmethod
+    def _parse_ref_map(output: str) -> Dict[str, str]:
+        """Branch name (as `git branch -a` prints it) -> tip commit, plus HEAD"""
+        refs = {}
+        for line in output.split("\n"):
+            commit, _, refname = line.partition(" ")
+            if refname == "HEAD":
+                refs["HEAD"] = commit
+            elif refname.startswith("refs/heads/"):
+                refs[refname[len("refs/heads/"):]] = commit
+            elif refname.startswith("refs/remotes/"):
+                refs[refname[len("refs/"):]] = commit
+        return refs
+    
+    @staticmethod
+    def _full_refname(branch: str) -> str:
+        """Inverse of the naming used by _parse_ref_map"""
+        if branch == "HEAD":
+            return branch
+        if branch.startswith("remotes/"):
+            return f"refs/{branch}"
+        return f"refs/heads/{branch}"
+    
+    def _get_ref_map(self) -> Dict[str, str]:
+        """All local and remote-tracking branches with their tips, in one git call"""
+        return self._parse_ref_map(self._run_git_command(self.REF_MAP_COMMAND))
+    
     def _get_all_branches(self) -> List[str]:
         """Get all branch names"""
-        output = self._run_git_command(["branch", "-a"])
-        branches = []
-        for line in output.split("\n"):
-            branch = line.strip().lstrip("* ")
-            if branch:
-                branches.append(branch)
-        return branches
+        return [name for name in self._get_ref_map() if name != "HEAD"]
     
-    def _get_commit_info(self, commit_hash: str) -> Dict[str, any]:
+    def _get_commit_header(self, commit_hash: str) -> str:
+        """Ingest stage: fetch the commit's author and message line"""
+        return self._run_git_command(["show", "-s", f"--format={self.COMMIT_FORMAT}", commit_hash])
+    
+    def _get_commit_info(self, commit_hash: str) -> Dict[str, Any]:
         """Get detailed information about a commit"""
-        # Get commit details
-        format_str = "%H|%an|%ae|%s|%b"
-        output = self._run_git_command(["show", "-s", f"--format={format_str}", commit_hash])
+        cached = self._cached_analysis(commit_hash)
+        if cached:
+            return self._build_commit_info(cached["header"], cached["analysis"]["summary"])
+        
+        output = self._get_commit_header(commit_hash)
         
         if not output:
             return {}
         
-        parts = output.split("|", 4)
-        if len(parts) < 4:
+        # File list and stats are streamed and bounded by the payload policy
+        summary = stream_diff_summary(str(self.repo_path), commit_hash, self.payload_policy,
+                                      self.path_filter.pathspec())
+        return self._build_commit_info(output, summary)
+    
+    def _cached_analysis(self, commit_hash: str) -> Optional[Dict]:
+        """Header and analysis of a commit already seen on another ref or repository"""
+        if self.analysis_cache is None:
+            return None
+        return self.analysis_cache.get(commit_hash, self.analysis_variant)
+    
+    def _build_commit_info(self, output: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble commit info from `git show` output and a streamed diff summary"""
+        parts = output.split("|", 5)
+        if len(parts) < 5:
             return {}
         
-        # Get changed files
-        files_output = self._run_git_command(["diff-tree", "--no-commit-id", "--name-only", "-r", commit_hash])
-        files_changed = files_output.split("\n") if files_output else []
-        
-        # Get diff stats
-        stats_output = self._run_git_command(["diff-tree", "--no-commit-id", "--numstat", "-r", commit_hash])
-        
         return {
             "commit_hash": parts[0],
             "author": parts[1],
             "author_email": parts[2],
-            "subject": parts[3],
-            "body": parts[4] if len(parts) > 4 else "",
-            "files_changed": files_changed,
-            "diff_stats": self._parse_diff_stats(stats_output)
+            "commit_time": float(parts[3]),
+            "subject": parts[4],
+            "body": parts[5] if len(parts) > 5 else "",
+            **summary
         }
     
-    def _parse_diff_stats(self, stats_output: str) -> Dict[str, Dict[str, int]]:
-        """Parse git diff numstat output"""
-        stats = {}
-        for line in stats_output.split("\n"):
-            if line:
-                parts = line.split("\t")
-                if len(parts) == 3:
-                    stats[parts[2]] = {
-                        "additions": int(parts[0]) if parts[0] != "-" else 0,
-                        "deletions": int(parts[1]) if parts[1] != "-" else 0
-                    }
-        return stats
+    def _commit_subject(self, output: str) -> str:
+        """Extract the subject from `git show` header output"""
+        return (output.split("|", 5) + [""] * 5)[4]
+    
+    def _changed_refs(self, current_refs: Dict[str, str]) -> List[tuple]:
+        """(branch, old tip, new tip) for branches that existed before and moved"""
+        return [
+            (branch, self.known_refs[branch], tip)
+            for branch, tip in current_refs.items()
+            if branch != "HEAD" and branch in self.known_refs and self.known_refs[branch] != tip
+        ]
+    
+    def _queue_rewrite_event(self, branch: str, old_tip: str, new_tip: str,
+                             fork_point: str, dropped: int, reason: str):
+        """Queue a HISTORY_REWRITTEN event for a branch that moved to a non-descendant"""
+        event_data = {
+            "repository": str(self.repo_path),
+            "branch": branch,
+            "commit_hash": new_tip,
+            "old_tip": old_tip,
+            "fork_point": fork_point or None,
+            "dropped_commits": dropped,
+            "reason": reason or "unknown",
+            "protected": branch.split("/")[-1] in self.PROTECTED_BRANCHES,
+            "sequence": self._next_sequence()
+        }
+        
+        event = create_event(EventType.HISTORY_REWRITTEN, event_data, source="git-watcher")
+        event.priority = Priority.HIGH if event_data["protected"] else Priority.LOW
+        
+        self.event_queue.append(event)
+        print(f"\n✂️  History rewritten on {branch}: {old_tip[:8]} -> {new_tip[:8]} "
+              f"({dropped} commits dropped, {event_data['reason']})")
+    
+    def _detect_rewrites(self, current_refs: Dict[str, str]):
+        """Raise rewrite events for branches whose old tip is no longer an ancestor"""
+        for branch, old_tip, new_tip in self._changed_refs(current_refs):
+            fork_point = self._run_git_command(["merge-base", old_tip, new_tip])
+            if fork_point == old_tip:
+                continue  # Fast-forward
+            dropped = self._run_git_command(["rev-list", "--count", f"{fork_point}..{old_tip}"]) if fork_point else ""
+            reason = self._run_git_command(["log", "-g", "-1", "--format=%gs", self._full_refname(branch)])
+            self._queue_rewrite_event(branch, old_tip, new_tip, fork_point, int(dropped or 0), reason)
+    
+    def _start_catchup(self, target: Dict[str, str]):
+        """Begin turning commits newly reachable from `target` refs into events"""
+        self.catchup = {"base": dict(self.known_refs), "target": dict(target), "done": 0}
+        self._catchup_commits = None
+        self._catchup_dispatched = 0
+    
+    def _catchup_command(self) -> tuple:
+        """(git command, stdin) listing the range being caught up, or (None, None)
+        
+        One walk from every moved or new tip, stopping at every previously
+        processed tip, so each new commit is listed exactly once however many
+        branches reach it and nothing already processed is revisited. Output
+        is oldest first so resuming by count is exact.
+        """
+        base, target = self.catchup["base"], self.catchup["target"]
+        if not base:
+            return None, None  # First run, just track current commit
+        new_tips = {tip for name, tip in target.items() if base.get(name) != tip}
+        old_tips = set(base.values())
+        stdin = "\n".join(sorted(new_tips - old_tips) + [f"^{tip}" for tip in sorted(old_tips)]) + "\n"
+        return self.NEW_COMMITS_COMMAND, stdin
+    
+    def _tip_names(self) -> Dict[str, str]:
+        """Tip commit -> branch it is attributed to (local before remote, HEAD last)"""
+        names = {}
+        ordered = sorted(self.catchup["target"], key=lambda b: (b == "HEAD", b.startswith("remotes/"), b))
+        for branch in ordered:
+            names.setdefault(self.catchup["target"][branch], branch)
+        return names
+    
+    def _set_catchup_commits(self, output: Optional[str]):
+        if output is None:
+            head = self.catchup["target"].get("HEAD")
+            self._catchup_commits = [(head, None)] if head else []
+        else:
+            names = self._tip_names()
+            self._catchup_commits = []
+            for line in output.split("\n"):
+                commit_hash, _, source = line.partition(" ")
+                if commit_hash:
+                    self._catchup_commits.append((commit_hash, names.get(source, source)))
+        if self._catchup_dispatched > len(self._catchup_commits):
+            self._catchup_dispatched = self.catchup["done"] = 0  # Range changed underneath us
+        if len(self._catchup_commits) > self.catchup_batch:
+            print(f"\n⏩ Catching up on {len(self._catchup_commits) - self.catchup['done']} commits "
+                  f"in batches of {self.catchup_batch}")
+        elif not self._catchup_commits:
+            self._commit_done(0)  # Nothing newly reachable (branch created, deleted or rewound)
+    
+    def _next_catchup_batch(self) -> List[tuple]:
+        """Next slice of the range to dispatch"""
+        start = self._catchup_dispatched
+        batch = self._catchup_commits[start:start + self.catchup_batch]
+        self._catchup_dispatched += len(batch)
+        return batch
+    
+    def _commit_done(self, count: int = 1):
+        """Count commits whose events are queued (or that were skipped); finish the range"""
+        if self.catchup is None:
+            return
+        self.catchup["done"] += count
+        if self._catchup_commits is not None and self.catchup["done"] >= len(self._catchup_commits):
+            self.known_refs = self.catchup["target"]
+            self.last_commit_hash = self.known_refs.get("HEAD", self.last_commit_hash)
+            if self.churn_index is not None:
+                self.churn_index.mark_synced(self.last_commit_hash)
+            self.catchup = None
+            self._catchup_commits = None
+    
+    def _next_poll_delay(self, refs_before: Dict[str, str]) -> float:
+        """Seconds to wait after a poll; any ref movement counts as activity"""
+        if self.poll_state is not None:
+            delay = self.poll_state.record(self.catching_up or self.known_refs != refs_before)
+        else:
+            delay = self.poll_interval
+        # A backlog is caught up without pausing
+        return 0 if self.catching_up else delay
+    
+    @property
+    def catching_up(self) -> bool:
+        """Undispatched commits remain in the current range"""
+        return self.catchup is not None and (
+            self._catchup_commits is None or self._catchup_dispatched < len(self._catchup_commits)
+        )
     
+    @timed("git_watcher._check_for_new_commits")
     def _check_for_new_commits(self):
-        """Check for new commits and generate events"""
-        current_commit = self._get_current_commit()
-        
-        if current_commit != self.last_commit_hash:
-            # Get all commits between last known and current
-            if self.last_commit_hash:
-                commit_range = f"{self.last_commit_hash}..{current_commit}"
-                new_commits = self._run_git_command(["rev-list", commit_range])
-                
-                for commit_hash in new_commits.split("\n"):
-                    if commit_hash:
-                        self._handle_new_commit(commit_hash)
-            else:
-                # First run, just track current commit
-                self._handle_new_commit(current_commit)
-            
-            self.last_commit_hash = current_commit
+        """Check every branch for new commits and rewrites, and generate events"""
+        if self.catchup is None:
+            # An unchanged ref map costs one git call and no further work
+            current_refs = self._polled_refs = self._get_ref_map()
+            if not current_refs or current_refs == self.known_refs:
+                return
+            self._detect_rewrites(current_refs)
+            self._start_catchup(current_refs)
+        
+        if self._catchup_commits is None:
+            command, stdin = self._catchup_command()
+            self._set_catchup_commits(self._run_git_command(command, stdin) if command else None)
+        
+        if self.catchup is None:
+            return
+        
+        # Bound in-flight pool work while a large gap is being caught up
+        if len(self.pending_analyses) >= self.catchup_batch:
+            self._collect_analyses(wait=True)
+        for commit_hash, branch in self._next_catchup_batch():
+            self._handle_new_commit(commit_hash, branch)
     
-    def _handle_new_commit(self, commit_hash: str):
+    @timed("git_watcher._handle_new_commit")
+    def _handle_new_commit(self, commit_hash: str, branch: Optional[str] = None):
         """Process a new commit and create event"""
-        commit_info = self._get_commit_info(commit_hash)
+        cached = self._cached_analysis(commit_hash)
+        output = cached["header"] if cached else self._get_commit_header(commit_hash)
+        
+        if not output:
+            self._commit_done()
+            return
         
-        if not commit_info:
+        if branch is None:
+            branch = self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
+        
+        if cached:
+            if self.analysis_pool is None:
+                self._finish_commit(commit_hash, output, branch, cached["analysis"])
+                return
+            # Queued behind pending analyses so events keep commit order
+            future = Future()
+            future.set_result(cached["analysis"])
+            self.pending_analyses.append((commit_hash, output, branch, future))
             return
         
+        args = (str(self.repo_path), commit_hash, self._commit_subject(output), self.payload_policy,
+                self.path_filter.pathspec())
+        
+        if self.analysis_pool is None:
+            try:
+                analysis = analyze_commit(*args)
+            except RuntimeError as e:
+                print(f"Commit analysis failed for {commit_hash[:8]}: {e}")
+                self._commit_done()
+                return
+            self._finish_commit(commit_hash, output, branch, analysis)
+            return
+        
+        # The analysis stage streams diff stats inside the worker, so only the
+        # hash goes in and a policy-bounded summary comes back; results are
+        # collected in order by _collect_analyses()
+        future = self.analysis_pool.submit(analyze_commit, *args)
+        self.pending_analyses.append((commit_hash, output, branch, future))
+    
+    def _collect_analyses(self, wait: bool = False):
+        """Queue events for finished analyses, preserving commit order"""
+        while self.pending_analyses:
+            commit_hash, output, branch, future = self.pending_analyses[0]
+            if not wait and not future.done():
+                break
+            self.pending_analyses.popleft()
+            
+            try:
+                analysis = future.result()
+            except Exception as e:
+                print(f"Commit analysis failed for {commit_hash[:8]}: {e}")
+                self._commit_done()
+                continue
+            
+            self._finish_commit(commit_hash, output, branch, analysis)
+    
+    def _finish_commit(self, commit_hash: str, output: str, branch: str, analysis: Dict):
+        """Combine header and analysis results into a queued event"""
+        if self.analysis_cache is not None:
+            self.analysis_cache.put(commit_hash, self.analysis_variant, output, analysis)
+        
+        if analysis["summary"].get("excluded_only"):
+            self.filter_stats["commits_suppressed"] += 1
+            print(f"🚫 Commit {commit_hash[:8]} only touches excluded paths, no event")
+            self._commit_done()
+            return
+        
+        commit_info = self._build_commit_info(output, analysis["summary"])
+        if commit_info:
+            self._queue_commit_event(commit_hash, commit_info, branch, analysis)
+        self._commit_done()
+    
+    def _queue_commit_event(self, commit_hash: str, commit_info: Dict, branch: str,
+                            analysis: Optional[Dict] = None):
+        """Classify commit info and queue a NEW_COMMIT event (no git calls)"""
+        if analysis is None:
+            analysis = {
+                "priority": self._determine_commit_priority(commit_info).value,
+                "patterns": self._detect_patterns_in_commit(commit_info),
+                "complexity": self._estimate_commit_complexity(commit_info)
+            }
+        
         # Determine priority based on commit characteristics
-        priority = self._determine_commit_priority(commit_info)
+        priority = Priority(analysis["priority"])
         
-        # Check for patterns in commit
-        patterns = self._detect_patterns_in_commit(commit_info)
+        # Check for patterns in commit, plus library patterns matching its files and message
+        patterns = list(analysis["patterns"])
+        library_matches = self.pattern_store.match(commit_info["files_changed"], commit_info["subject"])
+        patterns.extend(record.name for record in library_matches if record.name not in patterns)
         
         # Create event
         event_data = {
             "repository": str(self.repo_path),
-            "branch": self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"]),
+            "branch": branch,
             "commit_hash": commit_hash,
             "author": commit_info["author"],
+            "subject": commit_info["subject"],
             "files_changed": commit_info["files_changed"],
-            "diff_stats": commit_info["diff_stats"]
+            "diff_stats": commit_info["diff_stats"],
+            "total_files": commit_info["total_files"],
+            "total_additions": commit_info["total_additions"],
+            "total_deletions": commit_info["total_deletions"],
+            "sequence": self._next_sequence()
         }
         
+        # Large commits carry rollups and a side-file reference instead of every path
+        if commit_info["truncated"]:
+            event_data["truncated"] = True
+            event_data["directory_rollup"] = commit_info["directory_rollup"]
+            event_data["full_file_list"] = commit_info["full_file_list"]
+        
+        # Hotspots reflect history before this commit, which then joins the index
+        # at its commit time, as backfilled history does
+        complexity = analysis["complexity"]
+        if self.churn_index is not None:
+            hotspots = self.churn_index.hotspots(commit_info["files_changed"])
+            self.churn_index.record_commit(commit_hash, commit_info["author_email"],
+                                           commit_info["commit_time"], commit_info["diff_stats"])
+            event_data["hotspots"] = hotspots
+            complexity = min(complexity + self.HOTSPOT_WEIGHT * hotspots["max_score"], 100)
+        
+        if library_matches:
+            event_data["matched_patterns"] = [record.summary() for record in library_matches]
+        
         event = create_event(
             EventType.NEW_COMMIT,
             event_data,
@@ -181,88 +578,44 @@ class GitWatcher:
         if patterns:
             event.related_patterns = patterns
         
-        # Estimate complexity based on changes
-        event.estimated_complexity = self._estimate_commit_complexity(commit_info)
+        # Estimate complexity based on changes and file history
+        event.estimated_complexity = complexity
         
         self.event_queue.append(event)
         print(f"\n🔍 New commit detected: {commit_hash[:8]}")
         print(f"   Author: {commit_info['author']}")
-        print(f"   Files changed: {len(commit_info['files_changed'])}")
+        print(f"   Files changed: {commit_info['total_files']}")
         print(f"   Priority: {priority.value}")
         print(f"   Complexity: {event.estimated_complexity:.2f}")
+        if "hotspots" in event_data:
+            print(f"   Hotspot score: {event_data['hotspots']['max_score']:.2f}")
     
     def _determine_commit_priority(self, commit_info: Dict) -> Priority:
         """Determine priority based on commit characteristics"""
-        subject = commit_info["subject"].lower()
-        
-        # Critical keywords
-        if any(keyword in subject for keyword in ["fix", "bug", "critical", "urgent"]):
-            return Priority.CRITICAL
-        
-        # High priority keywords
-        if any(keyword in subject for keyword in ["feat", "feature", "refactor"]):
-            return Priority.HIGH
-        
-        # Check file count
-        if len(commit_info["files_changed"]) > 10:
-            return Priority.HIGH
-        
-        return Priority.MEDIUM
+        return determine_commit_priority(commit_info["subject"], commit_info["total_files"])
     
     def _detect_patterns_in_commit(self, commit_info: Dict) -> List[str]:
         """Detect which patterns might apply to this commit"""
-        patterns = []
-        
-        # Check for test files
-        if any("test" in f for f in commit_info["files_changed"]):
-            patterns.append("test-pattern")
-        
-        # Check for documentation
-        if any(f.endswith(".md") for f in commit_info["files_changed"]):
-            patterns.append("documentation-pattern")
-        
-        # Check for refactoring
-        if "refactor" in commit_info["subject"].lower():
-            patterns.append("refactoring-pattern")
-        
-        # Check for new features
-        if any(word in commit_info["subject"].lower() for word in ["feat", "feature", "add"]):
-            patterns.append("feature-pattern")
-        
-        return patterns
+        return detect_patterns_in_commit(commit_info["subject"], commit_info["has_tests"],
+                                         commit_info["has_docs"])
     
     def _estimate_commit_complexity(self, commit_info: Dict) -> float:
         """Estimate complexity score (0-100) based on commit characteristics"""
-        complexity = 0.0
-        
-        # File count factor
-        file_count = len(commit_info["files_changed"])
-        complexity += min(file_count * 2, 30)  # Max 30 points for files
-        
-        # Lines changed factor
-        total_changes = 0
-        for stats in commit_info["diff_stats"].values():
-            total_changes += stats["additions"] + stats["deletions"]
-        complexity += min(total_changes / 10, 30)  # Max 30 points for lines
-        
-        # File type diversity
-        extensions = set()
-        for file in commit_info["files_changed"]:
-            if "." in file:
-                extensions.add(file.split(".")[-1])
-        complexity += min(len(extensions) * 5, 20)  # Max 20 points for diversity
-        
-        # Integration complexity (multiple directories)
-        directories = set()
-        for file in commit_info["files_changed"]:
-            directories.add(os.path.dirname(file))
-        complexity += min(len(directories) * 3, 20)  # Max 20 points for integration
-        
-        return min(complexity, 100)
+        return estimate_commit_complexity(
+            commit_info["total_files"],
+            commit_info["total_additions"] + commit_info["total_deletions"],
+            commit_info["extension_count"],
+            commit_info["directory_count"]
+        )
     
     def _check_for_new_branches(self):
         """Check for new branches and generate events"""
-        current_branches = set(self._get_all_branches())
+        # Reuse the ref map read by this poll's commit check when there is one
+        current_refs = self._polled_refs or self._get_ref_map()
+        self._polled_refs = None
+        if not current_refs:
+            return
+        current_branches = set(current_refs) - {"HEAD"}
         new_branches = current_branches - self.known_branches
         
         for branch in new_branches:
@@ -272,10 +625,16 @@ class GitWatcher:
     
     def _handle_new_branch(self, branch_name: str):
         """Process a new branch and create event"""
+        created_from = self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
+        self._queue_branch_event(branch_name, created_from)
+    
+    def _queue_branch_event(self, branch_name: str, created_from: str):
+        """Queue a NEW_BRANCH event (no git calls)"""
         event_data = {
             "repository": str(self.repo_path),
             "branch": branch_name,
-            "created_from": self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
+            "created_from": created_from,
+            "sequence": self._next_sequence()
         }
         
         event = create_event(
@@ -287,6 +646,7 @@ class GitWatcher:
         self.event_queue.append(event)
         print(f"\n🌿 New branch detected: {branch_name}")
     
+    @timed("git_watcher.process_events")
     def process_events(self):
         """Process queued events (send to orchestrator)"""
         while self.event_queue:
@@ -299,34 +659,52 @@ class GitWatcher:
             print(f"   Data: {json.dumps(event.data, indent=2)}")
             
             # Write event to file for orchestrator to pick up
-            event_file = Path(f"/tmp/aadf-event-{event.event_id}.json")
-            with open(event_file, "w") as f:
-                json.dump(event.to_dict(), f, indent=2)
-            
+            event_file = self._write_event_file(event)
             print(f"   Written to: {event_file}")
     
+    def _write_event_file(self, event) -> Path:
+        """Write an event to the drop directory the orchestrator polls"""
+        event_file = Path(f"/tmp/aadf-event-{event.event_id}.json")
+        with open(event_file, "w") as f:
+            json.dump(event.to_dict(), f, indent=2)
+        return event_file
+    
     def start(self):
         """Start monitoring for git events"""
         self.running = True
         print("\n🚀 Git Watcher started")
-        print(f"   Polling interval: {self.poll_interval} seconds")
+        print(f"   Polling interval: {self.poll_interval} seconds"
+              + (" (adaptive)" if self.poll_state else ""))
         print("   Press Ctrl+C to stop\n")
         
         try:
             while self.running:
+                refs_before = self.known_refs
+                
                 # Check for various git events
                 self._check_for_new_commits()
                 self._check_for_new_branches()
                 
-                # Process any queued events
+                # Collect finished off-thread analyses, then process queued events
+                self._collect_analyses()
                 self.process_events()
+                if self.churn_index is not None:
+                    self.churn_index.flush()
+                self.save_checkpoint()
                 
-                # Wait before next check
-                time.sleep(self.poll_interval)
+                if self.profiler:
+                    self.profiler.poll()
                 
+                # Wait before next check
+                delay = self._next_poll_delay(refs_before)
+                if delay:
+                    time.sleep(delay)
+        
         except KeyboardInterrupt:
             print("\n\n🛑 Git Watcher stopped")
             self.running = False
+            if self.profiler:
+                self.profiler.stop()
     
     def stop(self):
         """Stop the watcher"""
@@ -349,12 +727,43 @@ def main():
         default=10,
         help="Polling interval in seconds (default: 10)"
     )
+    parser.add_argument(
+        "--analysis-workers",
+        type=int,
+        default=0,
+        help="Run commit analysis in a process pool of this size (default: 0, inline)"
+    )
+    add_payload_arguments(parser)
+    add_churn_index_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_path_filter_arguments(parser)
+    add_poll_schedule_arguments(parser)
+    add_analysis_cache_arguments(parser)
+    add_profiling_arguments(parser)
     
     args = parser.parse_args()
     
+    payload_policy = payload_policy_from_args(args)
+    analysis_pool = None
+    if args.analysis_workers > 0:
+        from concurrent.futures import ProcessPoolExecutor
+        analysis_pool = ProcessPoolExecutor(max_workers=args.analysis_workers)
+    
     # Create and start watcher
-    watcher = GitWatcher(args.repo, args.interval)
-    watcher.start()
+    watcher = GitWatcher(args.repo, args.interval, analysis_pool=analysis_pool,
+                         payload_policy=payload_policy,
+                         churn_index=churn_index_for(args.repo, args.churn_index_dir, args.churn_backfill),
+                         checkpoint=checkpoint_for(args.repo, args.checkpoint_dir),
+                         catchup_batch=args.catchup_batch,
+                         path_filter=path_filter_for(args.repo, args),
+                         poll_schedule=poll_schedule_from_args(args),
+                         analysis_cache=analysis_cache_from_args(args))
+    watcher.profiler = profiler_from_args("git-watcher", args)
+    try:
+        watcher.start()
+    finally:
+        if analysis_pool:
+            analysis_pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""
+Path Filter
+Per-repository include/exclude pathspecs for commit ingestion. The
+pathspecs are handed to git itself, so vendored directories, lockfiles
+and generated code are never diffed, streamed or counted towards a
+commit's complexity.
+
+Configured in <repo>/.ai/watch-paths.json:
+
+    {"include": ["src", "lib"], "exclude": ["vendor", "*.lock", "*_pb2.py"]}
+
+plus --include-path/--exclude-path flags applied to every watched repo.
+Entries use git pathspec syntax ("vendor" matches the directory, "*.lock"
+matches at any depth).
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+
+CONFIG_FILE = Path(".ai") / "watch-paths.json"
+
+
+@dataclass
+class PathFilter:
+    """Include/exclude pathspecs for one repository"""
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    
+    def __bool__(self) -> bool:
+        return bool(self.include or self.exclude)
+    
+    def pathspec(self) -> List[str]:
+        """Trailing git arguments restricting a diff to included, non-excluded paths"""
+        if not self:
+            return []
+        return ["--", *self.include, *(f":(exclude){pattern}" for pattern in self.exclude)]
+
+
+def load_path_filter(repo_path: str, include: Optional[List[str]] = None,
+                     exclude: Optional[List[str]] = None) -> PathFilter:
+    """The repository's configured filter, extended with command-line patterns"""
+    config = {}
+    config_path = Path(repo_path) / CONFIG_FILE
+    if config_path.exists():
+        try:
+            with open(config_path, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable path filter {config_path}: {e}")
+    
+    return PathFilter(
+        include=list(config.get("include", [])) + list(include or []),
+        exclude=list(config.get("exclude", [])) + list(exclude or [])
+    )
+
+
+def add_path_filter_arguments(parser):
+    """Register path filter command-line flags"""
+    parser.add_argument("--include-path", action="append", default=[],
+                        help=f"Only analyse changes under this pathspec (repeatable; also {CONFIG_FILE})")
+    parser.add_argument("--exclude-path", action="append", default=[],
+                        help=f"Ignore changes matching this pathspec, e.g. vendor or '*.lock' "
+                             f"(repeatable; also {CONFIG_FILE})")
+
+
+def path_filter_for(repo_path: str, args) -> PathFilter:
+    """Build a repository's PathFilter from its config file and parsed arguments"""
+    return load_path_filter(repo_path, args.include_path, args.exclude_path)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Pattern Store
+Indexed view of the pattern library under .ai/patterns. Pattern records
+are looked up by name, category, file glob and keyword through inverted
+indexes that are refreshed incrementally when pattern files change.
+"""
+
+import os
+import re
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Iterable, Tuple
+
+
+# Tokens too common in pattern names and commit messages to discriminate
+STOPWORDS = {"pattern", "patterns", "the", "and", "for", "with", "from", "into", "add", "fix", "update"}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lower-case word tokens of three or more characters, minus stopwords"""
+    return {t for t in TOKEN_RE.findall(text.lower()) if len(t) >= 3 and t not in STOPWORDS}
+
+
+def glob_to_regex(glob: str) -> "re.Pattern":
+    """Compile a path glob; `**` spans directories, globs without `/` match basenames"""
+    if "/" not in glob:
+        glob = "**/" + glob
+    regex = ""
+    i = 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif glob.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif glob[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif glob[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(glob[i])
+            i += 1
+    return re.compile(regex + r"\Z")
+
+
+def _string_field(data: Dict, *keys: str) -> Optional[str]:
+    """First non-empty value among `keys`; ValueError if it is not a string"""
+    for key in keys:
+        value = data.get(key)
+        if value:
+            if not isinstance(value, str):
+                raise ValueError(f"'{key}' must be a string, not {type(value).__name__}")
+            return value
+    return None
+
+
+def _list_field(data: Dict, *keys: str) -> List[str]:
+    """First non-empty value among `keys`; ValueError unless it is a list of strings"""
+    for key in keys:
+        value = data.get(key)
+        if value:
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"'{key}' must be a list of strings")
+            return value
+    return []
+
+
+def _number_field(data: Dict, key: str) -> Optional[float]:
+    """Value of `key` if present; ValueError unless it is a number"""
+    value = data.get(key)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError(f"'{key}' must be a number")
+    return value
+
+
+@dataclass
+class PatternRecord:
+    """A single pattern from the library"""
+    name: str
+    category: str
+    path: Path
+    description: str = ""
+    file_globs: List[str] = field(default_factory=list)
+    keywords: Set[str] = field(default_factory=set)
+    related: List[str] = field(default_factory=list)
+    acceleration_factor: Optional[float] = None
+    confidence_score: Optional[float] = None
+    
+    @classmethod
+    def from_file(cls, path: Path, root: Path) -> "PatternRecord":
+        """Parse a JSON pattern, or a free-form markdown note"""
+        default_category = path.parent.name if path.parent != root else "general"
+        
+        if path.suffix == ".md":
+            lines = [line.strip("# ").strip() for line in path.read_text().splitlines() if line.strip()]
+            title = lines[0] if lines else path.stem
+            return cls(
+                name=path.stem,
+                category=default_category,
+                path=path,
+                description=title,
+                keywords=tokenize(path.stem) | tokenize(title)
+            )
+        
+        with open(path, "r") as f:
+            data = json.load(f)
+        # Hand-edited files: a wrong shape is reported like unreadable JSON
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a JSON object, not {type(data).__name__}")
+        name = _string_field(data, "name", "id") or path.stem
+        category = _string_field(data, "category") or default_category
+        keywords = tokenize(name) | tokenize(category)
+        for keyword in _list_field(data, "keywords") + _list_field(data, "tags"):
+            keywords |= tokenize(keyword)
+        
+        return cls(
+            name=name,
+            category=category,
+            path=path,
+            description=_string_field(data, "description") or "",
+            file_globs=_list_field(data, "files", "file_globs", "appliesTo"),
+            keywords=keywords,
+            related=_list_field(data, "related_patterns", "related"),
+            acceleration_factor=_number_field(data, "acceleration_factor"),
+            confidence_score=_number_field(data, "confidence_score")
+        )
+    
+    def summary(self) -> Dict:
+        """Compact form attached to events and tasks"""
+        return {
+            "name": self.name,
+            "category": self.category,
+            "path": str(self.path),
+            "description": self.description,
+            "related": self.related
+        }
+
+
+class PatternStore:
+    """Inverted indexes over the pattern library with incremental refresh"""
+    
+    def __init__(self, root: Path, check_interval: float = 2.0):
+        self.root = Path(root)
+        self.check_interval = check_interval
+        
+        self.records: Dict[Path, PatternRecord] = {}
+        self.by_name: Dict[str, Path] = {}
+        self.by_category: Dict[str, Set[Path]] = {}
+        self.by_keyword: Dict[str, Set[Path]] = {}
+        
+        # Globs are bucketed by extension or leading directory so a file
+        # only tests the handful of globs that could match it
+        self.globs: Dict[Path, List[Tuple[str, "re.Pattern"]]] = {}
+        self.by_extension: Dict[str, Set[Path]] = {}
+        self.by_prefix: Dict[str, Set[Path]] = {}
+        self.unbucketed: Set[Path] = set()
+        
+        self._keys: Dict[Path, List[Tuple[Dict[str, Set[Path]], str]]] = {}  # index entries per record
+        self._mtimes: Dict[Path, int] = {}
+        self._last_check = 0.0
+        self.refresh()
+    
+    def _pattern_files(self) -> Dict[Path, int]:
+        """Every pattern file under the root with its mtime"""
+        files = {}
+        if not self.root.is_dir():
+            return files
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith((".json", ".md")):
+                    path = Path(directory) / name
+                    try:
+                        files[path] = path.stat().st_mtime_ns
+                    except OSError:
+                        pass
+        return files
+    
+    def refresh(self) -> int:
+        """Reindex added, changed and removed files; returns how many changed"""
+        current = self._pattern_files()
+        changed = [p for p, mtime in current.items() if self._mtimes.get(p) != mtime]
+        removed = [p for p in self._mtimes if p not in current]
+        
+        for path in removed + changed:
+            self._unindex(path)
+        for path in changed:
+            try:
+                self._index(PatternRecord.from_file(path, self.root))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping pattern {path}: {e}")
+        
+        self._mtimes = current
+        self._last_check = time.time()
+        return len(changed) + len(removed)
+    
+    def maybe_refresh(self):
+        """Refresh if the check interval has passed"""
+        if time.time() - self._last_check >= self.check_interval:
+            self.refresh()
+    
+    def _index(self, record: PatternRecord):
+        path = record.path
+        self.records[path] = record
+        self.by_name.setdefault(record.name.lower(), path)
+        self.by_name.setdefault(path.stem.lower(), path)
+        
+        keys = [(self.by_category, record.category.lower())]
+        keys.extend((self.by_keyword, keyword) for keyword in record.keywords)
+        
+        compiled = []
+        for glob in record.file_globs:
+            compiled.append((glob, glob_to_regex(glob)))
+            basename = glob.rsplit("/", 1)[-1]
+            head = glob.split("/", 1)[0]
+            extension = basename.rsplit(".", 1)[1] if "." in basename else ""
+            if basename.startswith("*") and extension and not any(c in extension for c in "*?["):
+                keys.append((self.by_extension, "." + extension))
+            elif "/" in glob and not any(c in head for c in "*?["):
+                keys.append((self.by_prefix, head))
+            else:
+                self.unbucketed.add(path)
+        self.globs[path] = compiled
+        
+        for index, key in keys:
+            index.setdefault(key, set()).add(path)
+        self._keys[path] = keys
+    
+    def _unindex(self, path: Path):
+        record = self.records.pop(path, None)
+        if record is None:
+            return
+        for key in (record.name.lower(), path.stem.lower()):
+            if self.by_name.get(key) == path:
+                del self.by_name[key]
+        for index, key in self._keys.pop(path, []):
+            paths = index.get(key)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del index[key]
+        self.unbucketed.discard(path)
+        self.globs.pop(path, None)
+    
+    def get(self, name: str) -> Optional[PatternRecord]:
+        """Pattern by name (or file stem)"""
+        self.maybe_refresh()
+        path = self.by_name.get(name.lower())
+        return self.records.get(path) if path else None
+    
+    def resolve(self, names: Iterable[str]) -> List[PatternRecord]:
+        """Records for the names that exist in the library, in order"""
+        records = []
+        for name in names or []:
+            record = self.get(name)
+            if record is not None and record not in records:
+                records.append(record)
+        return records
+    
+    def in_category(self, category: str) -> List[PatternRecord]:
+        """All patterns in a category"""
+        self.maybe_refresh()
+        return [self.records[p] for p in sorted(self.by_category.get(category.lower(), ()))]
+    
+    def _paths_for_file(self, file_path: str) -> Set[Path]:
+        """Patterns whose file globs match `file_path`"""
+        extension = os.path.splitext(file_path)[1]
+        candidates = (self.by_extension.get(extension, set())
+                      | self.by_prefix.get(file_path.split("/", 1)[0], set())
+                      | self.unbucketed)
+        return {
+            path for path in candidates
+            if any(regex.match(file_path) for _, regex in self.globs.get(path, ()))
+        }
+    
+    def match(self, files: Iterable[str] = (), text: str = "",
+              categories: Iterable[str] = (), limit: int = 5) -> List[PatternRecord]:
+        """Best patterns for a change: file globs score 2, keywords and categories 1"""
+        self.maybe_refresh()
+        if not self.records:
+            return []
+        
+        scores: Dict[Path, int] = {}
+        for file_path in files:
+            for path in self._paths_for_file(file_path):
+                scores[path] = scores.get(path, 0) + 2
+        for token in tokenize(text):
+            for path in self.by_keyword.get(token, ()):
+                scores[path] = scores.get(path, 0) + 1
+        for category in categories:
+            for path in self.by_category.get(category.lower(), ()):
+                scores[path] = scores.get(path, 0) + 1
+        
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.records[item[0]].name))
+        return [self.records[path] for path, _ in ranked[:limit]]
+    
+    def stats(self) -> Dict:
+        """Library size by category"""
+        self.maybe_refresh()
+        return {
+            "patterns": len(self.records),
+            "categories": {category: len(paths) for category, paths in sorted(self.by_category.items())},
+            "keywords": len(self.by_keyword)
+        }
+    
+    def counts(self) -> Dict:
+        """Library size as last indexed, without checking the files for changes"""
+        return {
+            "patterns": len(self.records),
+            "categories": {category: len(paths) for category, paths in self.by_category.items()}
+        }
+
+
+def main():
+    """Query the pattern library from the command line"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Pattern Store")
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Repository whose .ai/patterns to index (default: current directory)"
+    )
+    parser.add_argument(
+        "--files",
+        nargs="*",
+        default=[],
+        help="Changed files to match against pattern globs"
+    )
+    parser.add_argument(
+        "--text",
+        default="",
+        help="Free text (e.g. a commit message) to match against keywords"
+    )
+    parser.add_argument(
+        "--name",
+        action="append",
+        default=[],
+        help="Resolve a pattern by name; repeat for several"
+    )
+    
+    args = parser.parse_args()
+    
+    store = PatternStore(Path(args.repo) / ".ai" / "patterns")
+    if args.name:
+        records = store.resolve(args.name)
+    elif args.files or args.text:
+        records = store.match(args.files, args.text)
+    else:
+        print(json.dumps(store.stats(), indent=2))
+        return
+    print(json.dumps([record.summary() for record in records], indent=2))
+
+
+if __name__ == "__main__":
+    main()
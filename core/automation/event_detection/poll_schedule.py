@@ -0,0 +1,161 @@
+"""
+Adaptive Poll Schedule
+Per-repository polling intervals driven by recent commit activity. A repo
+whose refs moved is polled again at the minimum interval; every idle poll
+stretches its interval by the backoff factor up to the maximum, so a fleet
+of dormant repositories costs a handful of git calls per minute while busy
+ones are watched closely. Every delay is jittered so watchers started
+together drift apart instead of polling in lockstep.
+
+Watchers sharing a PollSchedule also share a bounded number of concurrent
+polls, admitted most recently active repository first.
+"""
+
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import contextlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class AdaptivePollConfig:
+    """Bounds and growth of adaptive polling intervals"""
+    min_interval: float = 2.0
+    max_interval: float = 300.0
+    backoff: float = 1.5          # Interval growth per idle poll
+    jitter: float = 0.1           # +/- fraction applied to every delay
+    max_concurrent_polls: int = 8
+
+
+class RepositoryPollState:
+    """One repository's current interval and activity history"""
+    
+    def __init__(self, repository: str, config: AdaptivePollConfig, initial_interval: float):
+        self.repository = repository
+        self.config = config
+        self.interval = min(max(initial_interval, config.min_interval), config.max_interval)
+        self.last_activity: Optional[float] = None
+        self.next_poll = time.time()
+        self.polls = 0
+        self.active_polls = 0
+    
+    def record(self, active: bool, now: Optional[float] = None) -> float:
+        """Adjust the interval after a poll and return the jittered delay until the next one"""
+        now = now or time.time()
+        self.polls += 1
+        if active:
+            self.active_polls += 1
+            self.last_activity = now
+            self.interval = self.config.min_interval
+        else:
+            self.interval = min(self.interval * self.config.backoff, self.config.max_interval)
+        
+        delay = self.interval * random.uniform(1 - self.config.jitter, 1 + self.config.jitter)
+        self.next_poll = now + delay
+        return delay
+    
+    def snapshot(self, now: float) -> Dict:
+        return {
+            "repository": self.repository,
+            "interval": round(self.interval, 1),
+            "next_poll_in": round(max(0.0, self.next_poll - now), 1),
+            "last_activity_age": round(now - self.last_activity, 1) if self.last_activity else None,
+            "polls": self.polls,
+            "active_polls": self.active_polls
+        }
+
+
+class PollSchedule:
+    """Adaptive intervals and prioritized poll admission for a set of watchers"""
+    
+    def __init__(self, config: Optional[AdaptivePollConfig] = None):
+        self.config = config or AdaptivePollConfig()
+        self.repositories: Dict[str, RepositoryPollState] = {}
+        self.started = time.time()
+        
+        self._active = 0
+        self._waiters: List = []  # Heap of (-last activity, seq, future)
+        self._sequence = itertools.count()
+    
+    def register(self, repository: str, initial_interval: float) -> RepositoryPollState:
+        """Poll state for a repository; a restarted watcher keeps its history"""
+        state = self.repositories.get(repository)
+        if state is None:
+            state = RepositoryPollState(repository, self.config, initial_interval)
+            self.repositories[repository] = state
+        return state
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, state: RepositoryPollState):
+        """Hold one of the shared poll slots while polling"""
+        await self._acquire(state)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    async def _acquire(self, state: RepositoryPollState):
+        if self._active < self.config.max_concurrent_polls and not self._waiters:
+            self._active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-(state.last_activity or 0.0), next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # Admitted just as we were cancelled
+            raise
+    
+    def _release(self):
+        self._active -= 1
+        while self._waiters and self._active < self.config.max_concurrent_polls:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._active += 1
+                future.set_result(None)
+    
+    def snapshot(self) -> Dict:
+        """Current schedule, soonest poll first, with the overall poll rate"""
+        now = time.time()
+        polls = sum(state.polls for state in self.repositories.values())
+        elapsed = max(now - self.started, 1.0)
+        return {
+            "repositories": len(self.repositories),
+            "polls_per_minute": round(polls / elapsed * 60, 2),
+            "waiting": len(self._waiters),
+            "schedule": [
+                state.snapshot(now)
+                for state in sorted(self.repositories.values(), key=lambda s: s.next_poll)
+            ]
+        }
+
+
+def add_poll_schedule_arguments(parser):
+    """Register adaptive polling command-line flags"""
+    defaults = AdaptivePollConfig()
+    parser.add_argument("--adaptive-poll", action="store_true",
+                        help="Adapt each repository's polling interval to its commit activity")
+    parser.add_argument("--min-interval", type=float, default=defaults.min_interval,
+                        help=f"Adaptive polling interval after activity (default: {defaults.min_interval:g})")
+    parser.add_argument("--max-interval", type=float, default=defaults.max_interval,
+                        help=f"Adaptive polling interval ceiling for idle repositories "
+                             f"(default: {defaults.max_interval:g})")
+    parser.add_argument("--max-concurrent-polls", type=int, default=defaults.max_concurrent_polls,
+                        help=f"Repositories polled at once, most recently active first "
+                             f"(default: {defaults.max_concurrent_polls})")
+
+
+def poll_schedule_from_args(args) -> Optional[PollSchedule]:
+    """Build a PollSchedule when --adaptive-poll was given"""
+    if not args.adaptive_poll:
+        return None
+    return PollSchedule(AdaptivePollConfig(
+        min_interval=args.min_interval,
+        max_interval=max(args.max_interval, args.min_interval),
+        max_concurrent_polls=max(1, args.max_concurrent_polls)
+    ))
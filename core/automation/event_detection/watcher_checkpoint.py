@@ -0,0 +1,98 @@
+"""
+Watcher Checkpoint
+Compact per-repository record of what a git watcher has already turned
+into events (processed commit range, known refs, event sequence number),
+so a restarted watcher resumes where it stopped instead of jumping to
+HEAD and silently skipping the commits made while it was down.
+
+Checkpoints are written after events have been handed off, so delivery is
+at-least-once: a crash between the two repeats the last batch rather than
+losing it.
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_CHECKPOINT_DIR = "/tmp/aadf-checkpoints"
+
+
+def default_checkpoint_path(repo_path: str, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR) -> Path:
+    """One checkpoint file per repository, keyed by its resolved path"""
+    digest = hashlib.sha1(str(Path(repo_path).resolve()).encode()).hexdigest()[:12]
+    return Path(checkpoint_dir) / f"{digest}.json"
+
+
+class WatcherCheckpoint:
+    """Persisted resume point for one repository's watcher"""
+    
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self.head: Optional[str] = None        # Last commit whose range is fully processed
+        self.refs: Dict[str, str] = {}         # Known ref -> tip commit
+        self.catchup: Optional[Dict] = None    # {"base", "target", "done"} for a range in progress
+        self.sequence = 0                      # Last event sequence number issued
+        self.updated = 0.0
+        self._saved: Optional[Dict] = None
+        self._load()
+    
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable watcher checkpoint {self.path}: {e}")
+            return
+        self.head = data.get("head")
+        self.refs = data.get("refs", {})
+        self.catchup = data.get("catchup")
+        self.sequence = data.get("sequence", 0)
+        self.updated = data.get("updated", 0.0)
+    
+    def update(self, head: Optional[str], refs: Dict[str, str], catchup: Optional[Dict], sequence: int):
+        """Record the watcher's current position"""
+        self.head = head
+        self.refs = dict(refs)
+        self.catchup = dict(catchup) if catchup else None
+        self.sequence = sequence
+    
+    def save(self):
+        """Atomically persist the checkpoint if the position moved"""
+        if not self.path:
+            return
+        position = {
+            "head": self.head,
+            "refs": self.refs,
+            "catchup": self.catchup,
+            "sequence": self.sequence
+        }
+        if position == self._saved:
+            return
+        self.updated = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({**position, "updated": self.updated}, f)
+        os.replace(tmp_path, self.path)
+        self._saved = position
+
+
+def add_checkpoint_arguments(parser):
+    """Register watcher checkpoint command-line flags"""
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_CHECKPOINT_DIR,
+                        help=f"Per-repository watcher checkpoints, empty to disable (default: {DEFAULT_CHECKPOINT_DIR})")
+    parser.add_argument("--catchup-batch", type=int, default=200,
+                        help="Commits turned into events per pass while catching up (default: 200)")
+
+
+def checkpoint_for(repo_path: str, checkpoint_dir: Optional[str]) -> Optional[WatcherCheckpoint]:
+    """The checkpoint for a repository, or None when disabled"""
+    if not checkpoint_dir:
+        return None
+    return WatcherCheckpoint(default_checkpoint_path(repo_path, checkpoint_dir))
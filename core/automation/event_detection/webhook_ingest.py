@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Webhook Ingest
+Receives pushed pull request, issue and CI events from git hosts and CI
+systems, validates their signatures, maps them through create_event and
+hands them to the orchestrator in batches through a bounded queue
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Callable, Awaitable, Any
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_detection.event_types import EventType, create_event
+from monitoring.metrics_server import MetricsServer
+
+
+PROVIDERS = ("github", "gitlab", "ci")
+
+# Where each provider's signing secret is read from; never passed on the command line
+SECRET_ENV = {
+    "github": "AADF_GITHUB_WEBHOOK_SECRET",
+    "gitlab": "AADF_GITLAB_WEBHOOK_TOKEN",
+    "ci": "AADF_CI_WEBHOOK_SECRET"
+}
+
+CI_FAILURE_STATUSES = {"failed", "failure", "error", "errored", "timed_out", "broken"}
+
+CI_EVENT_TYPES = {
+    "build": EventType.BUILD_FAILURE,
+    "test": EventType.TEST_FAILURE,
+    "lint": EventType.LINT_ERROR,
+    "type": EventType.TYPE_ERROR
+}
+
+Mapped = List[Tuple[EventType, Dict[str, Any]]]
+
+
+def secrets_from_env() -> Dict[str, str]:
+    """Per-provider secrets from the environment"""
+    return {provider: os.environ[name] for provider, name in SECRET_ENV.items() if os.environ.get(name)}
+
+
+def map_github(kind: str, payload: Dict) -> Mapped:
+    """GitHub (and Gitea/Forgejo, which send the same shapes) payloads"""
+    repository = payload.get("repository", {}).get("full_name", "")
+    action = payload.get("action")
+    
+    if kind == "pull_request":
+        pr = payload["pull_request"]
+        data = {
+            "repository": repository,
+            "branch": pr["head"]["ref"],
+            "base_branch": pr["base"]["ref"],
+            "commit_hash": pr["head"]["sha"],
+            "author": pr["user"]["login"],
+            "pr_number": pr["number"],
+            "title": pr.get("title", ""),
+            "url": pr.get("html_url", "")
+        }
+        if action in ("opened", "reopened", "ready_for_review"):
+            return [(EventType.PR_CREATED, data)]
+        if action == "closed" and pr.get("merged"):
+            data["commit_hash"] = pr.get("merge_commit_sha") or data["commit_hash"]
+            return [(EventType.PR_MERGED, data)]
+    
+    elif kind == "issues" and action == "opened":
+        issue = payload["issue"]
+        return [(EventType.ISSUE_CREATED, {
+            "repository": repository,
+            "issue_number": issue["number"],
+            "title": issue.get("title", ""),
+            "author": issue["user"]["login"],
+            "labels": [label["name"] for label in issue.get("labels", [])],
+            "url": issue.get("html_url", "")
+        })]
+    
+    elif kind in ("workflow_run", "check_run") and action == "completed":
+        run = payload[kind]
+        if run.get("conclusion") in ("failure", "timed_out"):
+            head_branch = run.get("head_branch") or run.get("check_suite", {}).get("head_branch", "")
+            return [(EventType.BUILD_FAILURE, {
+                "repository": repository,
+                "branch": head_branch,
+                "commit_hash": run.get("head_sha"),
+                "build_id": str(run["id"]),
+                "build_url": run.get("html_url", ""),
+                "error_message": f"{run.get('name', kind)} {run['conclusion']}"
+            })]
+    
+    return []
+
+
+def map_gitlab(kind: str, payload: Dict) -> Mapped:
+    """GitLab system and project hook payloads"""
+    project = payload.get("project", {})
+    repository = project.get("path_with_namespace", "")
+    attributes = payload.get("object_attributes", {})
+    author = payload.get("user", {}).get("username")
+    
+    if kind == "Merge Request Hook":
+        data = {
+            "repository": repository,
+            "branch": attributes["source_branch"],
+            "base_branch": attributes["target_branch"],
+            "commit_hash": attributes.get("last_commit", {}).get("id"),
+            "author": author,
+            "pr_number": attributes["iid"],
+            "title": attributes.get("title", ""),
+            "url": attributes.get("url", "")
+        }
+        if attributes.get("action") in ("open", "reopen"):
+            return [(EventType.PR_CREATED, data)]
+        if attributes.get("action") == "merge":
+            data["commit_hash"] = attributes.get("merge_commit_sha") or data["commit_hash"]
+            return [(EventType.PR_MERGED, data)]
+    
+    elif kind == "Issue Hook" and attributes.get("action") == "open":
+        return [(EventType.ISSUE_CREATED, {
+            "repository": repository,
+            "issue_number": attributes["iid"],
+            "title": attributes.get("title", ""),
+            "author": author,
+            "labels": [label["title"] for label in payload.get("labels", [])],
+            "url": attributes.get("url", "")
+        })]
+    
+    elif kind == "Pipeline Hook" and attributes.get("status") == "failed":
+        failed_jobs = [b["name"] for b in payload.get("builds", []) if b.get("status") == "failed"]
+        return [(EventType.BUILD_FAILURE, {
+            "repository": repository,
+            "branch": attributes.get("ref", ""),
+            "commit_hash": attributes.get("sha"),
+            "build_id": str(attributes["id"]),
+            "build_url": f"{project.get('web_url', '')}/-/pipelines/{attributes['id']}",
+            "error_message": f"pipeline failed: {', '.join(failed_jobs) or 'unknown job'}",
+            "failed_jobs": failed_jobs
+        })]
+    
+    return []
+
+
+def map_ci(kind: Optional[str], payload: Any) -> Mapped:
+    """Generic CI format: one result object, or a list of them
+    
+    {"kind": "build"|"test"|"lint"|"type", "status": "failed", "build_id": ...,
+     "build_url": ..., "error_message": ..., "failed_tests": [...],
+     "log_excerpt": ..., "repository": ..., "branch": ..., "commit_hash": ...}
+    """
+    results = payload if isinstance(payload, list) else [payload]
+    mapped = []
+    for result in results:
+        if str(result.get("status", "")).lower() not in CI_FAILURE_STATUSES:
+            continue
+        event_type = CI_EVENT_TYPES.get(result.get("kind", "build"), EventType.BUILD_FAILURE)
+        data = {key: value for key, value in result.items() if key not in ("kind", "status")}
+        data["build_id"] = str(data.get("build_id", ""))
+        mapped.append((event_type, data))
+    return mapped
+
+
+MAPPERS: Dict[str, Tuple[Optional[str], Callable[[Optional[str], Any], Mapped]]] = {
+    "github": ("x-github-event", map_github),
+    "gitlab": ("x-gitlab-event", map_gitlab),
+    "ci": (None, map_ci)
+}
+
+
+class WebhookIngest:
+    """Validates and maps webhooks, then delivers events in batches"""
+    
+    # Delivery ids remembered to drop redeliveries
+    RECENT_DELIVERIES = 1000
+    
+    def __init__(self, event_sink: Optional[Callable[[Dict], Awaitable[None]]] = None,
+                 secrets: Optional[Dict[str, str]] = None, allow_unsigned: bool = False,
+                 max_queue: int = 1000, batch_size: int = 50, batch_interval: float = 0.2):
+        self.event_sink = event_sink
+        self.secrets = secrets if secrets is not None else secrets_from_env()
+        self.allow_unsigned = allow_unsigned
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        
+        self.queue: Optional[asyncio.Queue] = None
+        self.recent_deliveries: "OrderedDict[str, None]" = OrderedDict()
+        self.stats = {
+            "received": 0, "accepted": 0, "ignored": 0, "rejected": 0,
+            "duplicates": 0, "dropped": 0, "batches": 0, "delivered": 0
+        }
+        self.running = False
+        self.last_heartbeat = 0.0
+    
+    def register(self, server: MetricsServer):
+        """Mount POST /webhooks/<provider> and GET /webhooks on a server"""
+        for provider in PROVIDERS:
+            server.add_route(
+                f"/webhooks/{provider}",
+                lambda headers, body, provider=provider: self.receive(provider, headers, body),
+                method="POST"
+            )
+        server.add_route("/webhooks", lambda: (200, self.metrics()))
+    
+    def _verify(self, provider: str, headers: Dict[str, str], body: bytes) -> bool:
+        """Check the provider's signature (HMAC-SHA256) or shared token"""
+        secret = self.secrets.get(provider)
+        if not secret:
+            return self.allow_unsigned
+        if provider == "gitlab":
+            return hmac.compare_digest(headers.get("x-gitlab-token", ""), secret)
+        header = "x-hub-signature-256" if provider == "github" else "x-aadf-signature"
+        expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(headers.get(header, ""), expected)
+    
+    async def receive(self, provider: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict]:
+        """POST handler: validate, map and enqueue; never blocks on delivery"""
+        self.stats["received"] += 1
+        if self.queue is None:
+            return 503, {"error": "ingest not started"}
+        
+        if not self._verify(provider, headers, body):
+            self.stats["rejected"] += 1
+            return 401, {"error": "invalid signature"}
+        
+        delivery = (headers.get("x-github-delivery") or headers.get("x-gitlab-event-uuid")
+                    or headers.get("x-request-id"))
+        if delivery and delivery in self.recent_deliveries:
+            self.stats["duplicates"] += 1
+            return 200, {"duplicate": delivery}
+        
+        kind_header, mapper = MAPPERS[provider]
+        kind = headers.get(kind_header) if kind_header else None
+        if kind == "ping":
+            return 200, {"pong": True}
+        
+        try:
+            mapped = mapper(kind, json.loads(body))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.stats["rejected"] += 1
+            return 400, {"error": f"unrecognized {provider} payload: {e!r}"}
+        
+        if not mapped:
+            self.stats["ignored"] += 1
+            return 200, {"accepted": 0, "ignored": kind or "non-failure result"}
+        
+        # Bounded queue: shed at the edge so the sender retries later
+        if self.queue.qsize() + len(mapped) > self.max_queue:
+            self.stats["dropped"] += len(mapped)
+            return 429, {"error": "ingest queue full", "queued": self.queue.qsize()}
+        
+        event_ids = []
+        for event_type, data in mapped:
+            event = create_event(event_type, data, source=f"webhook:{provider}")
+            self.queue.put_nowait(event)
+            event_ids.append(event.event_id)
+        
+        if delivery:
+            self.recent_deliveries[delivery] = None
+            if len(self.recent_deliveries) > self.RECENT_DELIVERIES:
+                self.recent_deliveries.popitem(last=False)
+        
+        self.stats["accepted"] += len(event_ids)
+        return 202, {"accepted": len(event_ids), "event_ids": event_ids}
+    
+    async def _next_batch(self) -> List:
+        """Wait for one event, then gather more until the batch fills or the window closes"""
+        batch = [await asyncio.wait_for(self.queue.get(), timeout=1.0)]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _deliver(self, batch: List):
+        """Hand a batch to the sink, or fall back to the /tmp drop"""
+        for event in batch:
+            if self.event_sink:
+                await self.event_sink(event.to_dict())
+            else:
+                self._write_event_file(event)
+        self.stats["batches"] += 1
+        self.stats["delivered"] += len(batch)
+        print(f"📨 Delivered {len(batch)} webhook event(s)")
+    
+    def _write_event_file(self, event) -> Path:
+        """Write an event to the drop directory, atomically so pollers never see a partial file"""
+        event_file = Path(f"/tmp/aadf-event-{event.event_id}.json")
+        tmp_file = event_file.with_name(f".{event_file.name}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(event.to_dict(), f, indent=2)
+        os.replace(tmp_file, event_file)
+        return event_file
+    
+    def start_queue(self):
+        """Create the bounded queue; receive() rejects requests until this runs"""
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+    
+    async def run(self):
+        """Batching delivery loop"""
+        self.start_queue()
+        self.running = True
+        print(f"🪝 Webhook ingest ready (providers: {', '.join(PROVIDERS)}; "
+              f"signed: {', '.join(sorted(self.secrets)) or 'none'})")
+        
+        while self.running:
+            self.last_heartbeat = time.time()
+            try:
+                batch = await self._next_batch()
+            except asyncio.TimeoutError:
+                continue
+            await self._deliver(batch)
+    
+    async def flush(self):
+        """Deliver everything still queued"""
+        if self.queue is None:
+            return
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if batch:
+            await self._deliver(batch)
+    
+    def stop(self):
+        """Stop the delivery loop"""
+        self.running = False
+    
+    def metrics(self) -> Dict[str, int]:
+        """Request and delivery counters"""
+        return {**self.stats, "queued": self.queue.qsize() if self.queue else 0}
+
+
+async def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="AADF Webhook Ingest",
+        epilog="Secrets are read from " + ", ".join(SECRET_ENV.values())
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Bind address (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8081,
+        help="Port (default: 8081)"
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=1000,
+        help="Events buffered before requests are refused with 429 (default: 1000)"
+    )
+    parser.add_argument(
+        "--allow-unsigned",
+        action="store_true",
+        help="Accept requests for providers without a configured secret"
+    )
+    
+    args = parser.parse_args()
+    
+    ingest = WebhookIngest(allow_unsigned=args.allow_unsigned, max_queue=args.max_queue)
+    server = MetricsServer(args.host, args.port)
+    ingest.register(server)
+    ingest.start_queue()
+    await server.start()
+    try:
+        await ingest.run()
+    finally:
+        await server.stop()
+        await ingest.flush()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n\n🛑 Webhook ingest stopped")
@@ -8,17 +8,37 @@ import os
 import sys
 import time
 import json
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring.timeseries import TimeSeriesStore, RESOLUTIONS
 
 # Simple terminal-based dashboard (no external dependencies)
 
+# Metrics kept as time series, written by the supervisor or the demo loop
+TREND_METRICS = [
+    "events_processed", "tasks_created", "tasks_completed", "automation_rate",
+    "average_response_time", "cost_estimate"
+]
+
+
+def acceleration(average_response_time: float) -> float:
+    """Speed-up over a 4 hour manual baseline, from the average response time in seconds"""
+    baseline_time = 4 * 60  # 4 hours in minutes
+    current_time = average_response_time / 60 if average_response_time > 0 else baseline_time
+    return baseline_time / current_time if current_time > 0 else 1.0
+
 
 class AutomationDashboard:
     """Terminal-based dashboard for monitoring AADF automation"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[TimeSeriesStore] = None, resolution: int = 60,
+                 trend_buckets: int = 10):
         self.metrics = {
             "start_time": datetime.now(),
             "events_processed": 0,
@@ -27,13 +47,19 @@ class AutomationDashboard:
             "automation_rate": 0.0,
             "average_response_time": 0.0,
             "human_interventions": 0,
-            "cost_estimate": 0.0
+            "cost_estimate": 0.0,
+            "daily_budget": 100.0
         }
         
-        self.recent_events = []  # Last 10 events
+        self.recent_events = deque(maxlen=20)
         self.active_tasks = []
-        self.acceleration_history = []
         
+        # Fixed-size history at 1s/1m/1h resolution; read-only when attached to
+        # a store another process writes
+        self.store = store or TimeSeriesStore()
+        self.resolution = resolution
+        self.trend_buckets = trend_buckets
+    
     def clear_screen(self):
         """Clear terminal screen"""
         os.system('clear' if os.name == 'posix' else 'cls')
@@ -69,16 +95,14 @@ class AutomationDashboard:
         print("-" * 40)
         
         # Calculate current acceleration
-        baseline_time = 4 * 60  # 4 hours in minutes
-        current_time = self.metrics["average_response_time"] / 60 if self.metrics["average_response_time"] > 0 else baseline_time
-        acceleration = baseline_time / current_time if current_time > 0 else 1.0
+        current_acceleration = acceleration(self.metrics["average_response_time"])
         
         print(f"Events Processed:     {self.metrics['events_processed']:>10}")
         print(f"Tasks Created:        {self.metrics['tasks_created']:>10}")
         print(f"Tasks Completed:      {self.metrics['tasks_completed']:>10}")
         print(f"Automation Rate:      {self.metrics['automation_rate']:>9.1f}%")
         print(f"Avg Response Time:    {self.metrics['average_response_time']:>9.1f}s")
-        print(f"Current Acceleration: {acceleration:>9.1f}x")
+        print(f"Current Acceleration: {current_acceleration:>9.1f}x")
         print(f"Human Interventions:  {self.metrics['human_interventions']:>10}")
         print(f"Est. Cost Today:      ${self.metrics['cost_estimate']:>9.2f}")
     
@@ -90,7 +114,7 @@ class AutomationDashboard:
         if not self.recent_events:
             print("No events yet...")
         else:
-            for event in self.recent_events[-5:]:
+            for event in list(self.recent_events)[-5:]:
                 timestamp = event.get('timestamp', 'Unknown')
                 event_type = event.get('type', 'Unknown')
                 priority = event.get('priority', 'Unknown')
@@ -123,19 +147,23 @@ class AutomationDashboard:
     
     def render_acceleration_graph(self):
         """Render simple ASCII acceleration graph"""
-        print("\n📈 ACCELERATION TREND (Last 10 measurements)")
+        label = next((name for name, width in RESOLUTIONS.items() if width == self.resolution),
+                     f"{self.resolution}s")
+        print(f"\n📈 ACCELERATION TREND (Last {self.trend_buckets} x {label}, mean per bucket)")
         print("-" * 60)
         
-        if not self.acceleration_history:
+        points = self.store.recent("acceleration", self.resolution, self.trend_buckets)
+        if not points:
             print("Gathering data...")
         else:
             # Simple ASCII bar chart
-            max_accel = max(self.acceleration_history[-10:]) if self.acceleration_history else 50
+            max_accel = max(point[2] for point in points) or 1.0
             
-            for i, accel in enumerate(self.acceleration_history[-10:]):
+            for start, _, accel, low, high, _ in points:
                 bar_length = int((accel / max_accel) * 40)
                 bar = "█" * bar_length
-                print(f"{i+1:2d}: {bar} {accel:.1f}x")
+                stamp = datetime.fromtimestamp(start).strftime('%m-%d %H:%M:%S' if self.resolution < 60 else '%m-%d %H:%M')
+                print(f"{stamp}: {bar} {accel:.1f}x ({low:.1f}-{high:.1f})")
     
     def render_status_indicators(self):
         """Render system status indicators"""
@@ -155,7 +183,7 @@ class AutomationDashboard:
         print(f"A2A Messaging:  {a2a_status}")
         
         # Cost Status
-        daily_limit = 100.0
+        daily_limit = self.metrics.get('daily_budget', 100.0)
         cost_status = "🟢 Normal" if self.metrics['cost_estimate'] < daily_limit * 0.8 else "🟡 Warning"
         print(f"Cost Control:   {cost_status}")
     
@@ -203,15 +231,22 @@ class AutomationDashboard:
     def update_metrics(self, new_metrics: Dict):
         """Update metrics from external source"""
         self.metrics.update(new_metrics)
+        if not self.store.readonly:
+            for name in TREND_METRICS:
+                if name in new_metrics:
+                    self.store.record(name, new_metrics[name])
+    
+    def load_from_store(self):
+        """Refresh metrics from the latest samples in an attached store"""
+        for name in TREND_METRICS:
+            value = self.store.latest(name)
+            if value is not None:
+                self.metrics[name] = int(value) if isinstance(self.metrics.get(name), int) else value
     
     def add_event(self, event: Dict):
-        """Add new event to recent events"""
+        """Add new event to recent events (the deque keeps the last 20)"""
         event['timestamp'] = datetime.now().strftime('%H:%M:%S')
         self.recent_events.append(event)
-        
-        # Keep only last 20 events
-        if len(self.recent_events) > 20:
-            self.recent_events = self.recent_events[-20:]
     
     def update_tasks(self, tasks: List[Dict]):
         """Update active tasks list"""
@@ -219,11 +254,7 @@ class AutomationDashboard:
     
     def add_acceleration_measurement(self, acceleration: float):
         """Add acceleration measurement to history"""
-        self.acceleration_history.append(acceleration)
-        
-        # Keep only last 100 measurements
-        if len(self.acceleration_history) > 100:
-            self.acceleration_history = self.acceleration_history[-100:]
+        self.store.record("acceleration", acceleration)
     
     def simulate_data(self):
         """Simulate data updates for demo purposes"""
@@ -241,6 +272,7 @@ class AutomationDashboard:
         
         self.metrics['average_response_time'] = random.uniform(2.0, 5.0)
         self.metrics['cost_estimate'] += random.uniform(0.1, 0.5)
+        self.update_metrics({name: self.metrics[name] for name in TREND_METRICS})
         
         # Simulate events
         if random.random() > 0.7:
@@ -289,19 +321,52 @@ class AutomationDashboard:
                 # Render dashboard
                 self.render()
                 
-                # Simulate data updates (in production, would read from real sources)
-                self.simulate_data()
+                # Attached to a live store, or simulated data for demo purposes
+                if self.store.readonly:
+                    self.load_from_store()
+                else:
+                    self.simulate_data()
                 
                 # Wait before refresh
                 time.sleep(5)
                 
         except KeyboardInterrupt:
             print("\n\nDashboard stopped.")
+        finally:
+            self.store.close()
 
 
 def main():
     """Main entry point"""
-    dashboard = AutomationDashboard()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Automation Dashboard")
+    parser.add_argument(
+        "--attach",
+        default=None,
+        help="Show live trends from a metrics store written by the supervisor (--metrics-store)"
+    )
+    parser.add_argument(
+        "--store",
+        default=None,
+        help="Persist the demo's simulated metrics to this store (default: in memory)"
+    )
+    parser.add_argument(
+        "--resolution",
+        choices=sorted(RESOLUTIONS, key=RESOLUTIONS.get),
+        default="1m",
+        help="Trend bucket width: 1s, 1m or 1h (default: 1m)"
+    )
+    parser.add_argument(
+        "--buckets",
+        type=int,
+        default=10,
+        help="Trend buckets shown, e.g. 48 at 1h for two days (default: 10)"
+    )
+    args = parser.parse_args()
+    
+    store = TimeSeriesStore(args.attach, readonly=True) if args.attach else TimeSeriesStore(args.store)
+    dashboard = AutomationDashboard(store, RESOLUTIONS[args.resolution], args.buckets)
     dashboard.run()
 
 
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+AADF Metrics Server
+Minimal asyncio HTTP endpoint exposing health and metrics as JSON, and
+accepting POSTed payloads (e.g. webhooks) on registered paths
+"""
+
+import json
+import asyncio
+from typing import Dict, Callable, Optional, Tuple
+
+
+REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable"
+}
+
+
+class MetricsServer:
+    """Serves JSON documents produced by registered callables"""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, max_body: int = 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.routes: Dict[str, Callable[[], Tuple[int, Dict]]] = {}
+        # POST handlers take (headers, body) and may be coroutines
+        self.post_routes: Dict[str, Callable] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    def add_route(self, path: str, handler: Callable, method: str = "GET"):
+        """Register a handler returning (status_code, json_body) for `method` `path`"""
+        if method == "POST":
+            self.post_routes[path] = handler
+        else:
+            self.routes[path] = handler
+    
+    @property
+    def ready(self) -> bool:
+        """True once the server is accepting connections"""
+        return self._server is not None and self._server.is_serving()
+    
+    async def start(self):
+        """Start listening; returns once the socket is bound"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        print(f"📡 Metrics server listening on http://{self.host}:{self.port}")
+    
+    async def stop(self):
+        """Stop accepting connections"""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle a single HTTP/1.0-style request"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            
+            parts = request_line.decode("latin-1").split()
+            method = parts[0] if parts else ""
+            path = parts[1].split("?", 1)[0] if len(parts) >= 2 else "/"
+            routes = self.post_routes if method == "POST" else self.routes
+            handler = routes.get(path)
+            
+            if len(parts) < 2 or method not in ("GET", "POST"):
+                status, body = 405, {"error": "method not allowed"}
+            elif handler is None:
+                status, body = 404, {"error": f"unknown path {path}", "paths": sorted(routes)}
+            elif method == "POST":
+                status, body = await self._handle_post(handler, headers, reader)
+            else:
+                try:
+                    status, body = handler()
+                except Exception as e:
+                    status, body = 500, {"error": str(e)}
+            
+            payload = json.dumps(body, default=str).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _handle_post(self, handler: Callable, headers: Dict[str, str],
+                           reader: asyncio.StreamReader) -> Tuple[int, Dict]:
+        """Read a Content-Length body and pass it to a POST handler"""
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, {"error": "invalid content-length"}
+        if length > self.max_body:
+            return 413, {"error": f"body exceeds {self.max_body} bytes"}
+        
+        body = await asyncio.wait_for(reader.readexactly(length), timeout=10) if length else b""
+        try:
+            result = handler(headers, body)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        except Exception as e:
+            return 500, {"error": str(e)}
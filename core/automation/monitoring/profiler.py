@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+AADF Runtime Profiler
+Opt-in profiling surface for long-running automation components
+"""
+
+import io
+import os
+import sys
+import time
+import json
+import signal
+import cProfile
+import pstats
+import asyncio
+import functools
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Callable, Any
+
+
+class FunctionTimers:
+    """Cheap per-function call counters for hot paths"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+    
+    def record(self, name: str, elapsed: float):
+        """Record a single timed call"""
+        with self._lock:
+            entry = self.stats.get(name)
+            if entry is None:
+                entry = {"calls": 0, "total": 0.0, "max": 0.0}
+                self.stats[name] = entry
+            entry["calls"] += 1
+            entry["total"] += elapsed
+            if elapsed > entry["max"]:
+                entry["max"] = elapsed
+    
+    def timed(self, name: str) -> Callable:
+        """Decorator timing a sync or async function under `name`"""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.record(name, time.perf_counter() - start)
+                return async_wrapper
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of the counters with averages filled in"""
+        with self._lock:
+            result = {}
+            for name, entry in self.stats.items():
+                result[name] = dict(entry)
+                result[name]["avg"] = entry["total"] / entry["calls"] if entry["calls"] else 0.0
+            return result
+    
+    def reset(self):
+        """Clear all counters"""
+        with self._lock:
+            self.stats.clear()
+
+
+# Process-wide timers shared by all instrumented components
+TIMERS = FunctionTimers()
+timed = TIMERS.timed
+
+
+class ProfileSession:
+    """Captures cProfile or stack-sampling profiles for a bounded time window"""
+    
+    MODES = ("cprofile", "sample")
+    
+    def __init__(self, component: str, output_dir: str = "/tmp/aadf-profiles",
+                 window: float = 30.0, mode: str = "cprofile",
+                 sample_interval: float = 0.005):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        
+        self.component = component
+        self.output_dir = Path(output_dir)
+        self.window = window
+        self.mode = mode
+        self.sample_interval = sample_interval
+        
+        self.active = False
+        self.started_at = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._samples: Counter = Counter()
+        self._target_thread = threading.main_thread().ident
+        self._stop_sampling = threading.Event()
+        self._pending_toggle = False
+    
+    def install_signal_handler(self, signum: int = getattr(signal, "SIGUSR1", 0)):
+        """Toggle capture when the process receives `signum` (SIGUSR1 by default)"""
+        if not signum:
+            return
+        
+        def handler(_signum, _frame):
+            # Defer to the next poll() so the toggle happens on the main loop
+            self._pending_toggle = True
+        
+        signal.signal(signum, handler)
+        print(f"   Profiling: send signal {signum} to PID {os.getpid()} to capture "
+              f"{self.window:.0f}s {self.mode} profile")
+    
+    def start(self):
+        """Begin capturing a profile"""
+        if self.active:
+            return
+        
+        self.active = True
+        self.started_at = time.time()
+        TIMERS.reset()
+        
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._samples = Counter()
+            self._stop_sampling.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+        
+        print(f"\n🔬 Profiling {self.component} ({self.mode}, {self.window:.0f}s window)")
+    
+    def stop(self) -> Optional[Path]:
+        """Stop capturing and write the profile to disk"""
+        if not self.active:
+            return None
+        
+        self.active = False
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+        
+        output_file = self._write()
+        self._profile = None
+        print(f"🔬 Profile written to: {output_file}")
+        return output_file
+    
+    def toggle(self):
+        """Start capture if idle, stop it otherwise"""
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+    
+    def poll(self):
+        """Handle pending signal toggles and close expired windows; call from the main loop"""
+        if self._pending_toggle:
+            self._pending_toggle = False
+            self.toggle()
+        elif self.active and time.time() - self.started_at >= self.window:
+            self.stop()
+    
+    def _sample_loop(self):
+        """Sample the main thread's stack at a fixed interval"""
+        while not self._stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is None:
+                continue
+            
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self._samples[";".join(reversed(stack))] += 1
+    
+    def _write(self) -> Path:
+        """Write profile data and timer counters to the output directory"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = self.output_dir / f"{self.component}-{stamp}-{os.getpid()}"
+        
+        if self.mode == "cprofile":
+            output_file = base.with_suffix(".prof")
+            self._profile.dump_stats(str(output_file))
+            
+            # Human-readable summary next to the binary stats
+            summary = io.StringIO()
+            pstats.Stats(self._profile, stream=summary).sort_stats("cumulative").print_stats(40)
+            base.with_suffix(".txt").write_text(summary.getvalue())
+        else:
+            # Folded stacks, loadable by flamegraph.pl / speedscope
+            output_file = base.with_suffix(".folded")
+            with open(output_file, "w") as f:
+                for stack, count in self._samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        
+        with open(base.with_suffix(".timers.json"), "w") as f:
+            json.dump({
+                "component": self.component,
+                "duration": time.time() - self.started_at,
+                "timers": TIMERS.snapshot()
+            }, f, indent=2)
+        
+        return output_file
+
+
+def add_profiling_arguments(parser):
+    """Register the shared profiling command-line flags"""
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help="Enable profiling; SIGUSR1 toggles capture, output written here"
+    )
+    parser.add_argument(
+        "--profile-window",
+        type=float,
+        default=30.0,
+        help="Seconds per capture window (default: 30)"
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=ProfileSession.MODES,
+        default="cprofile",
+        help="Deterministic cProfile or low-overhead stack sampling (default: cprofile)"
+    )
+    parser.add_argument(
+        "--profile-now",
+        action="store_true",
+        help="Start a capture window immediately on startup"
+    )
+
+
+def profiler_from_args(component: str, args: Any) -> Optional[ProfileSession]:
+    """Build a ProfileSession from parsed arguments, or None if profiling is off"""
+    if not args.profile_dir:
+        return None
+    
+    session = ProfileSession(component, args.profile_dir, args.profile_window, args.profile_mode)
+    session.install_signal_handler()
+    if args.profile_now:
+        session.start()
+    return session
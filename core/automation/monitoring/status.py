@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+AADF Status
+One JSON document covering every watched repository, the orchestrator's
+queues, agent states and pattern counts, served by the supervisor at
+GET /status and printed by this script for monitoring to poll.
+
+The document is assembled from state the components already keep in memory
+(watcher refs and counters, queue lengths, the pattern indexes), so it costs
+no git calls and no directory scans however many repositories are watched.
+Agent session files (.ai/agents/*/state.json) are the one on-disk input;
+they are re-read only when their mtime changes, at most every few seconds.
+"""
+
+import sys
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Any
+
+
+DEFAULT_URL = "http://127.0.0.1:8080/status"
+
+
+class AgentStateIndex:
+    """Parsed .ai/agents/<role>/state.json files, refreshed when they change"""
+    
+    def __init__(self, agents_dir: Path, check_interval: float = 5.0):
+        self.agents_dir = Path(agents_dir)
+        self.check_interval = check_interval
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._last_check = 0.0
+    
+    def refresh(self):
+        """Re-read state files whose mtime changed; drop removed agents"""
+        current = {}
+        if self.agents_dir.is_dir():
+            for path in self.agents_dir.glob("*/state.json"):
+                try:
+                    current[path.parent.name] = path.stat().st_mtime_ns
+                except OSError:
+                    pass
+        
+        for role in list(self.states):
+            if role not in current:
+                del self.states[role]
+        for role, mtime in current.items():
+            if self._mtimes.get(role) == mtime:
+                continue
+            try:
+                with open(self.agents_dir / role / "state.json", "r") as f:
+                    self.states[role] = json.load(f)
+            except (OSError, ValueError):
+                self.states.pop(role, None)
+        
+        self._mtimes = current
+        self._last_check = time.time()
+    
+    def get(self) -> Dict[str, Dict[str, Any]]:
+        """Agent states, refreshed if the check interval has passed"""
+        if time.time() - self._last_check >= self.check_interval:
+            self.refresh()
+        return self.states
+
+
+def _age(timestamp: Optional[float], now: float) -> Optional[float]:
+    return round(now - timestamp, 1) if timestamp else None
+
+
+def repository_status(watcher, now: Optional[float] = None) -> Dict[str, Any]:
+    """One watcher's position and activity, read from its attributes"""
+    now = now or time.time()
+    poll_state = watcher.poll_state
+    return {
+        "running": watcher.running,
+        "heartbeat_age": _age(getattr(watcher, "last_heartbeat", 0.0), now),
+        "head": watcher.last_commit_hash,
+        "branches": len(watcher.known_branches),
+        "events": watcher.event_sequence,
+        "commits_suppressed": watcher.filter_stats["commits_suppressed"],
+        "catchup": watcher.catchup_progress(),
+        "poll_interval": round(poll_state.interval, 1) if poll_state else watcher.poll_interval,
+        "last_activity_age": _age(poll_state.last_activity, now) if poll_state else None,
+        "patterns": watcher.pattern_store.counts()["patterns"]
+    }
+
+
+def orchestrator_status(orchestrator, now: Optional[float] = None) -> Dict[str, Any]:
+    """Queue lengths and throughput counters of an orchestrator"""
+    now = now or time.time()
+    metrics = orchestrator.automation_metrics
+    batcher = orchestrator.batcher
+    return {
+        "running": orchestrator.running,
+        "heartbeat_age": _age(orchestrator.last_heartbeat, now),
+        "queued_events": len(orchestrator.event_queue),
+        "active_tasks": len(orchestrator.active_tasks),
+        "deferred_tasks": len(orchestrator.deferred_tasks),
+        "batched_tasks": sum(len(queue) for queue in batcher.pending.values()) if batcher else 0,
+        "events_processed": metrics["events_processed"],
+        "tasks_created": metrics["tasks_created"],
+        "tasks_completed": metrics["tasks_completed"],
+        "automation_rate": metrics["automation_rate"],
+        "cost_today": round(orchestrator.budget.cost_today, 4),
+        "daily_budget": orchestrator.budget.config.daily_budget
+    }
+
+
+def agent_status(registry, states: AgentStateIndex) -> Dict[str, Dict[str, Any]]:
+    """Routing load from the registry merged with each agent's session state"""
+    load = registry.load() if registry else {}
+    session_states = states.get()
+    agents = {}
+    for role in sorted(set(load) | set(session_states)):
+        state = session_states.get(role, {})
+        agents[role] = {
+            **load.get(role, {"outstanding": 0, "assigned": 0}),
+            "sessions": state.get("total_sessions", 0),
+            "last_session": state.get("last_session"),
+            "status": state.get("status")
+        }
+    return agents
+
+
+def pattern_totals(stores: Iterable) -> Dict[str, Any]:
+    """Pattern counts summed over distinct libraries"""
+    seen = {}
+    for store in stores:
+        seen.setdefault(store.root.resolve(), store)
+    categories: Dict[str, int] = {}
+    for store in seen.values():
+        for category, count in store.counts()["categories"].items():
+            categories[category] = categories.get(category, 0) + count
+    return {
+        "total": sum(categories.values()),
+        "libraries": len(seen),
+        "categories": dict(sorted(categories.items()))
+    }
+
+
+def status_document(repositories: Dict[str, Dict], orchestrator: Optional[Dict],
+                    agents: Dict[str, Dict], patterns: Dict[str, Any],
+                    started: float) -> Dict[str, Any]:
+    """Top-level document with a fleet summary ahead of the details"""
+    running = sum(1 for repo in repositories.values() if repo.get("running"))
+    healthy = running == len(repositories) and bool(orchestrator and orchestrator["running"])
+    return {
+        "status": "ok" if healthy else "degraded",
+        "generated_at": datetime.now().isoformat(),
+        "summary": {
+            "repositories": len(repositories),
+            "running": running,
+            "catching_up": sum(1 for repo in repositories.values() if repo.get("catchup")),
+            "queued_events": orchestrator["queued_events"] if orchestrator else 0,
+            "agents": len(agents),
+            "patterns": patterns["total"]
+        },
+        "repositories": repositories,
+        "orchestrator": orchestrator or {},
+        "agents": agents,
+        "patterns": patterns,
+        "build_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def fetch_status(url: str = DEFAULT_URL, timeout: float = 2.0) -> Dict[str, Any]:
+    """GET the status document from a running supervisor"""
+    import urllib.request
+    
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.load(response)
+
+
+def main():
+    """Print the supervisor's status document; exit 0 ok, 1 unreachable, 2 degraded"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Status")
+    parser.add_argument(
+        "--url",
+        default=DEFAULT_URL,
+        help=f"Supervisor status endpoint (default: {DEFAULT_URL})"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=2.0,
+        help="Seconds to wait for the supervisor (default: 2)"
+    )
+    parser.add_argument(
+        "--section",
+        choices=["summary", "repositories", "orchestrator", "agents", "patterns"],
+        default=None,
+        help="Print only this part of the document"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Single-line JSON"
+    )
+    args = parser.parse_args()
+    
+    try:
+        document = fetch_status(args.url, args.timeout)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"status": "unreachable", "url": args.url, "error": str(e)}))
+        sys.exit(1)
+    
+    output = document.get(args.section, {}) if args.section else document
+    print(json.dumps(output, indent=None if args.compact else 2))
+    if document.get("status") != "ok":
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+AADF Metrics Time Series
+Fixed-size metric history: every series keeps a ring of 1-second, 1-minute
+and 1-hour buckets (count, sum, min, max, last), so hours or days of trends
+take the same memory as a few minutes. Buckets are slotted by timestamp,
+so a ring needs no head pointer and writing a sample is a few stores into
+preallocated doubles.
+
+With a path, the rings live in a memory-mapped file: the writer (e.g. the
+supervisor) updates it in place and other processes (the dashboard) map
+the same file read-only, without copying or parsing it.
+
+File layout (little-endian, 8-byte aligned):
+    header      magic, version, max series, tier count, (width, capacity) per tier
+    names       max_series x NAME_BYTES, NUL padded; empty slot = unused
+    buckets     per series, per tier, capacity x BUCKET_FIELDS doubles
+"""
+
+import os
+import mmap
+import time
+import array
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+MAGIC = b"AADFTS01"
+VERSION = 1
+NAME_BYTES = 64
+MAX_TIERS = 4
+HEADER = struct.Struct("<8sIII" + "II" * MAX_TIERS)
+HEADER_BYTES = 128
+
+# Bucket record: start time, count, sum, min, max, last value
+BUCKET_FIELDS = 6
+START, COUNT, SUM, MIN, MAX, LAST = range(BUCKET_FIELDS)
+
+# (bucket width seconds, buckets kept): 1 hour of seconds, 2 days of minutes, 30 days of hours
+DEFAULT_TIERS = ((1, 3600), (60, 2880), (3600, 720))
+
+RESOLUTIONS = {"1s": 1, "1m": 60, "1h": 3600}
+
+
+class TimeSeriesStore:
+    """Ring-buffered, downsampled metric series, optionally shared through mmap"""
+    
+    def __init__(self, path: Optional[str] = None, max_series: int = 64,
+                 tiers: Tuple[Tuple[int, int], ...] = DEFAULT_TIERS, readonly: bool = False):
+        self.path = Path(path) if path else None
+        self.readonly = readonly
+        self._mmap: Optional[mmap.mmap] = None
+        
+        if self.path and (readonly or self._layout_matches(max_series, tiers)):
+            self._open_existing()
+        else:
+            if readonly:
+                raise FileNotFoundError(f"No metrics store at {path}")
+            self.max_series = max_series
+            self.tiers = tuple(tiers)[:MAX_TIERS]
+            self._create()
+        
+        self._tier_offsets = []
+        offset = 0
+        for _, capacity in self.tiers:
+            self._tier_offsets.append(offset)
+            offset += capacity * BUCKET_FIELDS
+        self._series_stride = offset
+        self._data_start = (HEADER_BYTES + self.max_series * NAME_BYTES) // 8
+        self._index: Dict[str, int] = {}
+        self._load_names()
+    
+    def _size(self) -> int:
+        doubles = self.max_series * sum(capacity for _, capacity in self.tiers) * BUCKET_FIELDS
+        return HEADER_BYTES + self.max_series * NAME_BYTES + doubles * 8
+    
+    def _header(self) -> bytes:
+        pairs = [value for tier in self.tiers for value in tier]
+        pairs += [0] * (2 * MAX_TIERS - len(pairs))
+        return HEADER.pack(MAGIC, VERSION, self.max_series, len(self.tiers), *pairs).ljust(HEADER_BYTES, b"\0")
+    
+    def _layout_matches(self, max_series: int, tiers) -> bool:
+        """An existing file is reused only if it has the requested layout"""
+        if not self.path.exists():
+            return False
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return False
+        magic, version, stored_series, count, *pairs = HEADER.unpack(header)
+        stored_tiers = tuple(zip(pairs[0:2 * count:2], pairs[1:2 * count:2]))
+        if magic == MAGIC and version == VERSION and stored_series == max_series \
+                and stored_tiers == tuple(tiers)[:MAX_TIERS]:
+            return True
+        print(f"⚠️  Metrics store {self.path} has a different layout; starting a new one")
+        return False
+    
+    def _open_existing(self):
+        """Map an existing file, taking the layout from its header"""
+        flags = os.O_RDONLY if self.readonly else os.O_RDWR
+        fd = os.open(self.path, flags)
+        try:
+            access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+            self._mmap = mmap.mmap(fd, 0, access=access)
+        finally:
+            os.close(fd)
+        magic, version, self.max_series, count, *pairs = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a metrics store")
+        self.tiers = tuple(zip(pairs[0:2 * count:2], pairs[1:2 * count:2]))
+        self._buffer = self._mmap
+        self._values = memoryview(self._mmap).cast("d")
+    
+    def _create(self):
+        """Preallocate the rings, in a fresh mapped file or in memory"""
+        size = self._size()
+        if self.path is None:
+            # Zeroed doubles; the header and names share the same buffer
+            self._buffer = array.array("d", bytes(size))
+            self._values = memoryview(self._buffer)
+            memoryview(self._buffer).cast("B")[:HEADER_BYTES] = self._header()
+            return
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self._header())
+            f.truncate(size)  # Sparse; untouched buckets cost no disk
+        os.replace(tmp_path, self.path)
+        self._open_existing()
+    
+    def _raw(self) -> memoryview:
+        return memoryview(self._buffer).cast("B") if self.path is None else memoryview(self._buffer)
+    
+    def _load_names(self):
+        """Index the series slots in use (re-read by readers to see new series)"""
+        raw = self._raw()
+        for slot in range(self.max_series):
+            start = HEADER_BYTES + slot * NAME_BYTES
+            name = bytes(raw[start:start + NAME_BYTES]).rstrip(b"\0").decode("utf-8", "replace")
+            if name:
+                self._index[name] = slot
+    
+    def _slot_for(self, name: str) -> Optional[int]:
+        slot = self._index.get(name)
+        if slot is not None or self.readonly:
+            return slot
+        if len(self._index) >= self.max_series:
+            return None
+        encoded = name.encode("utf-8")[:NAME_BYTES]
+        slot = len(self._index)
+        start = HEADER_BYTES + slot * NAME_BYTES
+        self._raw()[start:start + NAME_BYTES] = encoded.ljust(NAME_BYTES, b"\0")
+        self._index[name] = slot
+        return slot
+    
+    def _bucket(self, slot: int, tier: int, bucket_start: int) -> int:
+        """Index of the first field of the bucket holding bucket_start"""
+        width, capacity = self.tiers[tier]
+        position = (bucket_start // width) % capacity
+        return self._data_start + slot * self._series_stride + self._tier_offsets[tier] + position * BUCKET_FIELDS
+    
+    def record(self, name: str, value: float, timestamp: Optional[float] = None) -> bool:
+        """Add a sample to every resolution; False if the store has no free series"""
+        if self.readonly:
+            raise PermissionError("Metrics store opened read-only")
+        slot = self._slot_for(name)
+        if slot is None:
+            return False
+        
+        now = int(timestamp or time.time())
+        values = self._values
+        for tier, (width, _) in enumerate(self.tiers):
+            bucket_start = now - now % width
+            i = self._bucket(slot, tier, bucket_start)
+            if values[i + START] != bucket_start or values[i + COUNT] == 0:
+                # Slot last held a bucket one lap ago (or never): reuse it
+                values[i + START] = bucket_start
+                values[i + COUNT] = 1
+                values[i + SUM] = values[i + MIN] = values[i + MAX] = value
+            else:
+                values[i + COUNT] += 1
+                values[i + SUM] += value
+                if value < values[i + MIN]:
+                    values[i + MIN] = value
+                if value > values[i + MAX]:
+                    values[i + MAX] = value
+            values[i + LAST] = value
+        return True
+    
+    def flush(self):
+        """Ask the OS to write dirty pages; readers see updates without it"""
+        if self._mmap is not None and not self.readonly:
+            self._mmap.flush()
+    
+    def close(self):
+        self._values.release()
+        if self._mmap is not None:
+            self.flush()
+            self._mmap.close()
+    
+    def series(self) -> List[str]:
+        if self.readonly:
+            self._load_names()
+        return sorted(self._index)
+    
+    def _tier_for(self, resolution: int) -> int:
+        """Finest tier at least as coarse as the requested resolution"""
+        for tier, (width, _) in enumerate(self.tiers):
+            if width >= resolution:
+                return tier
+        return len(self.tiers) - 1
+    
+    def query(self, name: str, resolution: int = 60, since: Optional[float] = None,
+              until: Optional[float] = None) -> List[Tuple[int, int, float, float, float, float]]:
+        """(start, count, mean, min, max, last) per non-empty bucket, oldest first"""
+        if name not in self._index and self.readonly:
+            self._load_names()
+        slot = self._index.get(name)
+        if slot is None:
+            return []
+        
+        tier = self._tier_for(resolution)
+        width, capacity = self.tiers[tier]
+        until = int(until or time.time())
+        last_bucket = until - until % width
+        first_bucket = last_bucket - (capacity - 1) * width
+        if since is not None:
+            first_bucket = max(first_bucket, int(since) - int(since) % width)
+        
+        values = self._values
+        points = []
+        for bucket_start in range(first_bucket, last_bucket + 1, width):
+            i = self._bucket(slot, tier, bucket_start)
+            count = values[i + COUNT]
+            if count and values[i + START] == bucket_start:
+                points.append((bucket_start, int(count), values[i + SUM] / count,
+                               values[i + MIN], values[i + MAX], values[i + LAST]))
+        return points
+    
+    def recent(self, name: str, resolution: int = 60, buckets: int = 10) -> List[Tuple]:
+        """The last `buckets` buckets at a resolution (empty ones skipped)"""
+        width = self.tiers[self._tier_for(resolution)][0]
+        now = time.time()
+        return self.query(name, resolution, since=now - (buckets - 1) * width, until=now)
+    
+    def latest(self, name: str) -> Optional[float]:
+        """Most recent sample of a series, if any in the finest ring"""
+        for points in (self.recent(name, 1, 2), self.recent(name, 60, 2), self.recent(name, 3600, 2)):
+            if points:
+                return points[-1][-1]
+        return None
+    
+    def memory_bytes(self) -> int:
+        """Size of the preallocated rings, independent of how long the store has run"""
+        return self._size()
+
+
+def main():
+    """Print the series in a metrics store"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Metrics Time Series")
+    parser.add_argument("path", help="Metrics store written with --metrics-store")
+    parser.add_argument(
+        "--resolution",
+        choices=sorted(RESOLUTIONS, key=RESOLUTIONS.get),
+        default="1m",
+        help="Bucket width to show (default: 1m)"
+    )
+    parser.add_argument(
+        "--buckets",
+        type=int,
+        default=10,
+        help="Most recent buckets per series (default: 10)"
+    )
+    args = parser.parse_args()
+    
+    store = TimeSeriesStore(args.path, readonly=True)
+    print(f"📈 {args.path}: {len(store.series())} series, {store.memory_bytes() / 1024:.0f} KiB")
+    for name in store.series():
+        points = store.recent(name, RESOLUTIONS[args.resolution], args.buckets)
+        values = " ".join(f"{point[2]:.1f}" for point in points) or "-"
+        print(f"   {name:<24} {values}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+AADF Agent Registry
+Loads agent definitions from JSON once, indexes them by capability and
+routes tasks to the least-loaded capable agent. A dispatched task counts
+against its agent until the agent reports it finished (its session ends)
+or its expected duration has passed.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Capability tags each task type needs, in order of preference
+TASK_CAPABILITIES = {
+    "PATTERN_EXTRACTION": ["patterns", "system-design"],
+    "CODE_REVIEW": ["code-review"],
+    "DOC_UPDATE": ["documentation"],
+    "BRANCH_SETUP": ["git", "ci-cd"],
+    "BUILD_DIAGNOSIS": ["blockers", "bug-analysis", "ci-cd"],
+    "SESSION_PLANNING": ["task-prioritization", "technical-decisions"],
+    "ISSUE_TRIAGE": ["task-prioritization", "bug-analysis"],
+    "SESSION_REVIEW": ["task-prioritization", "documentation"],
+    "STANDUP_REPORT": ["task-prioritization"],
+    "WEEKLY_REVIEW": ["technical-decisions", "system-design"],
+    "PATTERN_DOCUMENTATION": ["documentation", "patterns"]
+}
+
+# How strongly each section of an agent definition claims a tag (lower wins)
+TAG_TIERS = {
+    "primary": 0,
+    "priorities": 1,
+    "focusAreas": 1,
+    "secondary": 2,
+    "outputTypes": 2,
+    "tools": 3
+}
+
+
+@dataclass
+class AgentDefinition:
+    """Routing-relevant view of a core/agents/*.json definition"""
+    role: str
+    name: str
+    path: Path
+    tags: Dict[str, int] = field(default_factory=dict)  # tag -> best tier
+    session_duration: Optional[str] = None
+    targets: Dict[str, object] = field(default_factory=dict)
+    raw: Dict[str, object] = field(default_factory=dict)
+    
+    @classmethod
+    def from_json(cls, path: Path, data: Dict) -> "AgentDefinition":
+        """Build a definition, flattening capability sections into tiered tags"""
+        capabilities = data.get("capabilities", {})
+        sections = {
+            "primary": capabilities.get("primary", []),
+            "secondary": capabilities.get("secondary", []),
+            "tools": capabilities.get("tools", []),
+            "priorities": data.get("communication", {}).get("priorities", []),
+            "focusAreas": data.get("sessionPatterns", {}).get("focusAreas", []),
+            "outputTypes": data.get("sessionPatterns", {}).get("outputTypes", [])
+        }
+        
+        tags = {}
+        for section, values in sections.items():
+            for tag in values:
+                tags[tag] = min(tags.get(tag, TAG_TIERS[section]), TAG_TIERS[section])
+        
+        role = data.get("role") or (path.parent.name if path.name == "config.json" else path.stem)
+        return cls(
+            role=role,
+            name=data.get("name", role),
+            path=path,
+            tags=tags,
+            session_duration=data.get("sessionPatterns", {}).get("duration"),
+            targets=data.get("metrics", {}).get("targets", {}),
+            raw=data
+        )
+
+
+def default_search_paths(repo_path: Path) -> List[Path]:
+    """Project agents (.ai/agents) take precedence over the framework's core/agents"""
+    return [
+        Path(repo_path) / ".ai" / "agents",
+        Path(__file__).resolve().parents[2] / "agents"
+    ]
+
+
+class AgentRegistry:
+    """Capability-indexed registry of agent definitions with hot reload"""
+    
+    def __init__(self, search_paths: List[Path], check_interval: float = 2.0):
+        self.search_paths = [Path(p) for p in search_paths]
+        self.check_interval = check_interval
+        
+        self.agents: Dict[str, AgentDefinition] = {}
+        self.index: Dict[str, List[Tuple[int, str]]] = {}  # tag -> [(tier, role)]
+        self.outstanding: Dict[str, List[float]] = {}  # role -> expiry times of dispatched work
+        self.assigned: Dict[str, int] = {}
+        
+        self._signature: Tuple = ()
+        self._last_check = 0.0
+        self.reload()
+    
+    def _definition_files(self) -> List[Path]:
+        """All agent JSON files, flat (*.json) or per-agent (*/config.json)"""
+        files = []
+        for directory in self.search_paths:
+            if directory.is_dir():
+                files.extend(sorted(directory.glob("*.json")))
+                files.extend(sorted(directory.glob("*/config.json")))
+        return files
+    
+    def _current_signature(self) -> Tuple:
+        """mtimes of the search directories and every definition file"""
+        entries = []
+        for directory in self.search_paths:
+            try:
+                entries.append((str(directory), directory.stat().st_mtime_ns))
+            except OSError:
+                entries.append((str(directory), None))
+        for path in self._definition_files():
+            try:
+                entries.append((str(path), path.stat().st_mtime_ns))
+            except OSError:
+                pass
+        return tuple(entries)
+    
+    def reload(self):
+        """Load every definition and rebuild the capability index"""
+        agents: Dict[str, AgentDefinition] = {}
+        for path in self._definition_files():
+            try:
+                with open(path, "r") as f:
+                    definition = AgentDefinition.from_json(path, json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping agent definition {path}: {e}")
+                continue
+            # Earlier search paths win
+            agents.setdefault(definition.role, definition)
+        
+        index: Dict[str, List[Tuple[int, str]]] = {}
+        for role, definition in agents.items():
+            for tag, tier in definition.tags.items():
+                index.setdefault(tag, []).append((tier, role))
+        
+        self.agents = agents
+        self.index = index
+        self._signature = self._current_signature()
+        self._last_check = time.time()
+        print(f"📇 Agent registry loaded {len(agents)} agents, {len(index)} capability tags")
+    
+    def maybe_reload(self):
+        """Reload if any definition changed; stat calls are throttled"""
+        now = time.time()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self._current_signature() != self._signature:
+            self.reload()
+    
+    def capable_agents(self, tag: str) -> List[str]:
+        """Agents claiming `tag`, strongest claim first"""
+        return [role for _, role in sorted(self.index.get(tag, []))]
+    
+    def candidates(self, task_type: str) -> Dict[str, Tuple[int, int]]:
+        """Every agent able to take `task_type`, with its (tag preference, tier) rank"""
+        ranks: Dict[str, Tuple[int, int]] = {}
+        for position, tag in enumerate(TASK_CAPABILITIES.get(task_type, [])):
+            for tier, role in self.index.get(tag, []):
+                ranks[role] = min(ranks.get(role, (position, tier)), (position, tier))
+        return ranks
+    
+    def route(self, task_type: str, default: Optional[str] = None) -> Optional[str]:
+        """Pick the least-loaded capable agent; the stronger claim breaks ties"""
+        self.maybe_reload()
+        
+        ranks = self.candidates(task_type)
+        if not ranks:
+            return default
+        
+        now = time.time()
+        return min(
+            ranks,
+            key=lambda role: (self.outstanding_count(role, now), ranks[role], self.assigned.get(role, 0), role)
+        )
+    
+    def outstanding_count(self, role: str, now: Optional[float] = None) -> int:
+        """Tasks dispatched to `role` that are neither finished nor overdue"""
+        now = now or time.time()
+        pending = self.outstanding.get(role)
+        if pending:
+            pending[:] = [expiry for expiry in pending if expiry > now]
+        return len(pending or [])
+    
+    def acquire(self, role: str, expected_minutes: float):
+        """Record a task dispatched to `role`, outstanding for at most `expected_minutes`"""
+        self.outstanding.setdefault(role, []).append(time.time() + expected_minutes * 60)
+        self.outstanding[role].sort()
+        self.assigned[role] = self.assigned.get(role, 0) + 1
+    
+    def release(self, role: str, count: Optional[int] = None):
+        """Record `count` tasks (default all) finished by `role`, soonest-due first"""
+        pending = self.outstanding.get(role)
+        if pending:
+            del pending[:len(pending) if count is None else count]
+    
+    def load(self) -> Dict[str, Dict[str, int]]:
+        """Per-agent outstanding and lifetime assignment counts"""
+        now = time.time()
+        return {
+            role: {"outstanding": self.outstanding_count(role, now), "assigned": self.assigned.get(role, 0)}
+            for role in self.agents
+        }
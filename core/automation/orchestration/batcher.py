@@ -0,0 +1,262 @@
+"""
+AADF Session Batcher
+Accumulates tasks per agent and packs them into session-sized work bundles,
+sized from each agent's sessionPatterns.duration and metrics.targets, so an
+agent session gets one A2A message with a session's worth of work instead
+of one message per task.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from orchestration.agent_registry import AgentDefinition
+
+
+# Dispatch order inside a bundle
+PRIORITY_ORDER = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+
+DURATION_RANGE = re.compile(r"(\d+)\s*(?:-\s*(\d+))?\s*(minutes?|mins?|hours?|h)?", re.IGNORECASE)
+
+
+def parse_session_minutes(duration: Optional[str], default: Tuple[float, float]) -> Tuple[float, float]:
+    """(min, max) minutes from a sessionPatterns.duration such as "90-120 minutes" """
+    match = DURATION_RANGE.search(duration or "")
+    if not match:
+        return default
+    low = float(match.group(1))
+    high = float(match.group(2) or low)
+    if (match.group(3) or "").lower().startswith("h"):
+        low, high = low * 60, high * 60
+    return min(low, high), max(low, high)
+
+
+def session_task_limit(targets: Dict[str, object]) -> Optional[int]:
+    """Smallest integer *_per_session target (commits_per_session, components_per_session)"""
+    limits = [value for name, value in targets.items()
+              if name.endswith("_per_session") and isinstance(value, int) and not isinstance(value, bool)
+              and value > 0]
+    return min(limits) if limits else None
+
+
+@dataclass
+class BatchConfig:
+    """Session sizing and per-priority deadlines"""
+    base_task_minutes: float = 5.0          # Agent time per task before complexity
+    minutes_per_complexity_point: float = 0.5
+    default_session: Tuple[float, float] = (60.0, 90.0)
+    # Longest a task may wait for its bundle to fill; 0 dispatches at once
+    deadlines: Dict[str, float] = field(default_factory=lambda: {
+        "CRITICAL": 0.0,
+        "HIGH": 300.0,
+        "MEDIUM": 1800.0,
+        "LOW": 7200.0
+    })
+
+
+def estimate_task_minutes(task: Dict, config: BatchConfig) -> float:
+    """Agent time a task is expected to take, from its 0-100 complexity score"""
+    complexity = task.get('estimated_complexity') or 0.0
+    return config.base_task_minutes + complexity * config.minutes_per_complexity_point
+
+
+@dataclass
+class SessionLimits:
+    """Bundle size bounds for one agent"""
+    min_minutes: float
+    max_minutes: float
+    max_tasks: Optional[int] = None
+
+
+@dataclass
+class PendingTask:
+    """A routed task waiting for its bundle"""
+    task: Dict
+    minutes: float
+    queued_at: float
+    deadline: float
+
+
+class TaskBatcher:
+    """Per-agent pending queues, flushed when a session fills or a deadline passes"""
+    
+    def __init__(self, config: Optional[BatchConfig] = None):
+        self.config = config or BatchConfig()
+        self.pending: Dict[str, List[PendingTask]] = {}
+        self.limits: Dict[str, SessionLimits] = {}
+        self.stats = {
+            "bundles": 0,
+            "tasks_batched": 0,
+            "messages_saved": 0,
+            "deadline_flushes": 0,
+            "duplicates_merged": 0,
+            "estimated_minutes": 0.0,
+            "session_minutes": 0.0
+        }
+    
+    def estimate_minutes(self, task: Dict) -> float:
+        """Agent time a task is expected to take, from its 0-100 complexity score"""
+        return estimate_task_minutes(task, self.config)
+    
+    def _limits_for(self, definition: Optional[AgentDefinition]) -> SessionLimits:
+        if definition is None:
+            low, high = self.config.default_session
+            return SessionLimits(low, high)
+        low, high = parse_session_minutes(definition.session_duration, self.config.default_session)
+        return SessionLimits(low, high, session_task_limit(definition.targets))
+    
+    def add(self, task: Dict, definition: Optional[AgentDefinition] = None,
+            now: Optional[float] = None) -> List[List[Dict]]:
+        """Queue a routed task; returns bundles that are now ready to dispatch"""
+        now = now or time.time()
+        agent = task['agent']
+        self.limits[agent] = self._limits_for(definition)
+        
+        wait = self._wait(task)
+        queue = self.pending.setdefault(agent, [])
+        queue.append(PendingTask(task, self.estimate_minutes(task), now, now + wait))
+        
+        # An urgent task goes out now, taking whatever else this agent has waiting
+        if wait <= 0:
+            return self._flush(agent, everything=True)
+        
+        bundles = []
+        while self._full(agent):
+            bundles.append(self._pack(agent))
+        return bundles
+    
+    def _wait(self, task: Dict) -> float:
+        return self.config.deadlines.get(task.get('priority', 'MEDIUM'), self.config.deadlines["MEDIUM"])
+    
+    def absorb(self, task: Dict, now: Optional[float] = None) -> Optional[str]:
+        """Fold a task into a waiting one for the same patch id and type
+        
+        The match may wait for any agent, since routing can send identical work
+        to a different capable agent. The waiting task takes the more urgent
+        priority and deadline of the two; returns the agent it waits for, or
+        None (nothing changed) when no such task is waiting.
+        """
+        patch_id = task.get('patch_id')
+        if not patch_id:
+            return None
+        for agent, queue in self.pending.items():
+            for pending in queue:
+                if pending.task.get('patch_id') == patch_id and pending.task['type'] == task['type']:
+                    if PRIORITY_ORDER.get(task['priority'], 2) < PRIORITY_ORDER.get(pending.task['priority'], 2):
+                        pending.task['priority'] = task['priority']
+                    pending.deadline = min(pending.deadline, (now or time.time()) + self._wait(task))
+                    self.stats["duplicates_merged"] += 1
+                    return agent
+        return None
+    
+    def _full(self, agent: str) -> bool:
+        """Enough work queued to fill a session"""
+        queue = self.pending.get(agent)
+        if not queue:
+            return False
+        limits = self.limits[agent]
+        if limits.max_tasks and len(queue) >= limits.max_tasks:
+            return True
+        return sum(p.minutes for p in queue) >= limits.min_minutes
+    
+    def _pack(self, agent: str) -> List[Dict]:
+        """Take one session's worth of work, most urgent first"""
+        limits = self.limits[agent]
+        queue = sorted(self.pending[agent],
+                       key=lambda p: (PRIORITY_ORDER.get(p.task.get('priority'), 2), p.queued_at))
+        
+        bundle, minutes = [], 0.0
+        for pending in queue:
+            if bundle and (minutes + pending.minutes > limits.max_minutes
+                           or (limits.max_tasks and len(bundle) >= limits.max_tasks)):
+                continue  # Smaller tasks further down may still fit
+            bundle.append(pending)
+            minutes += pending.minutes
+        
+        taken = {id(p) for p in bundle}
+        self.pending[agent] = [p for p in self.pending[agent] if id(p) not in taken]
+        if not self.pending[agent]:
+            del self.pending[agent]
+        
+        self.stats["bundles"] += 1
+        self.stats["tasks_batched"] += len(bundle)
+        self.stats["messages_saved"] += len(bundle) - 1
+        self.stats["estimated_minutes"] += minutes
+        self.stats["session_minutes"] += limits.max_minutes
+        return [p.task for p in bundle]
+    
+    def _flush(self, agent: str, everything: bool = False) -> List[List[Dict]]:
+        bundles = []
+        while agent in self.pending:
+            bundles.append(self._pack(agent))
+            if not everything:
+                break
+        return bundles
+    
+    def due(self, now: Optional[float] = None) -> List[List[Dict]]:
+        """Bundles for agents whose oldest waiting task has reached its deadline"""
+        now = now or time.time()
+        bundles = []
+        for agent in list(self.pending):
+            if min(p.deadline for p in self.pending[agent]) <= now:
+                self.stats["deadline_flushes"] += 1
+                # Overdue work that does not fit one session goes in follow-up bundles
+                while agent in self.pending and min(p.deadline for p in self.pending[agent]) <= now:
+                    bundles.extend(self._flush(agent))
+        return bundles
+    
+    def flush_all(self) -> List[List[Dict]]:
+        """Every pending task, bundled; used on drain and shutdown"""
+        bundles = []
+        for agent in list(self.pending):
+            bundles.extend(self._flush(agent, everything=True))
+        return bundles
+    
+    def seconds_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        """Time until the earliest pending deadline, or None when nothing waits"""
+        deadlines = [p.deadline for queue in self.pending.values() for p in queue]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - (now or time.time()))
+    
+    def metrics(self) -> Dict:
+        """Bundling counts, session fill and what is still waiting"""
+        bundles = self.stats["bundles"]
+        return {
+            "bundles": bundles,
+            "tasks_batched": self.stats["tasks_batched"],
+            "messages_saved": self.stats["messages_saved"],
+            "deadline_flushes": self.stats["deadline_flushes"],
+            "duplicates_merged": self.stats["duplicates_merged"],
+            "tasks_per_bundle": round(self.stats["tasks_batched"] / bundles, 2) if bundles else 0.0,
+            "session_fill": round(self.stats["estimated_minutes"] / self.stats["session_minutes"], 3)
+            if self.stats["session_minutes"] else 0.0,
+            "pending": {agent: len(queue) for agent, queue in self.pending.items()}
+        }
+
+
+def add_batching_arguments(parser):
+    """Register session batching command-line flags"""
+    defaults = BatchConfig()
+    parser.add_argument("--batch-sessions", action="store_true",
+                        help="Bundle tasks per agent into session-sized A2A messages")
+    parser.add_argument("--minutes-per-complexity-point", type=float,
+                        default=defaults.minutes_per_complexity_point,
+                        help=f"Estimated agent minutes per complexity point "
+                             f"(default: {defaults.minutes_per_complexity_point:g})")
+    parser.add_argument("--batch-deadline", action="append", default=[], metavar="PRIORITY=SECONDS",
+                        help="Longest a task of this priority waits for its bundle (repeatable)")
+
+
+def batch_config_from_args(args) -> Optional[BatchConfig]:
+    """Build a BatchConfig when --batch-sessions was given"""
+    if not args.batch_sessions:
+        return None
+    config = BatchConfig(minutes_per_complexity_point=args.minutes_per_complexity_point)
+    for entry in args.batch_deadline:
+        priority, _, seconds = entry.partition("=")
+        if priority.upper() not in config.deadlines or not seconds:
+            raise SystemExit(f"Invalid --batch-deadline {entry!r}, expected e.g. HIGH=300")
+        config.deadlines[priority.upper()] = float(seconds)
+    return config
@@ -0,0 +1,181 @@
+"""
+AADF Budget Controller
+Token-bucket rate and cost limits for agent dispatch
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+
+# Dispatch decisions
+DISPATCH = "dispatch"
+DEFER = "defer"
+SHED = "shed"
+
+
+class TokenBucket:
+    """Classic token bucket; refills continuously up to capacity"""
+    
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+    
+    def level(self) -> float:
+        """Fill fraction in [0, 1] (negative after a forced overdraft)"""
+        self._refill()
+        return self.tokens / self.capacity if self.capacity else 0.0
+    
+    def can_consume(self, amount: float) -> bool:
+        self._refill()
+        return self.tokens >= amount
+    
+    def consume(self, amount: float):
+        """Take tokens unconditionally; may overdraw for forced dispatches"""
+        self._refill()
+        self.tokens -= amount
+
+
+@dataclass
+class BudgetConfig:
+    """Global and per-agent dispatch limits"""
+    tasks_per_minute: float = 30.0
+    daily_budget: float = 100.0         # Matches the dashboard's cost-control limit
+    agent_tasks_per_minute: float = 10.0
+    agent_daily_budget: float = 40.0
+    reserve_fraction: float = 0.25      # Below this, LOW/MEDIUM work yields to HIGH/CRITICAL
+    base_task_cost: float = 0.05        # Dollars per task before complexity
+    cost_per_complexity_point: float = 0.01
+    max_defer_seconds: float = 3600.0   # Deferred work older than this is shed
+
+
+class BudgetController:
+    """Decides whether each task is dispatched, deferred or shed"""
+    
+    def __init__(self, config: Optional[BudgetConfig] = None):
+        self.config = config or BudgetConfig()
+        self.global_rate = self._rate_bucket(self.config.tasks_per_minute)
+        self.global_cost = self._cost_bucket(self.config.daily_budget)
+        self.agent_buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        
+        self.cost_today = 0.0
+        self.cost_day = date.today()
+        self.decisions = {DISPATCH: 0, DEFER: 0, SHED: 0}
+        self.agent_decisions: Dict[str, Dict[str, int]] = {}
+    
+    @staticmethod
+    def _rate_bucket(per_minute: float) -> TokenBucket:
+        return TokenBucket(capacity=max(per_minute, 1.0), refill_per_second=per_minute / 60.0)
+    
+    @staticmethod
+    def _cost_bucket(per_day: float) -> TokenBucket:
+        return TokenBucket(capacity=per_day, refill_per_second=per_day / 86400.0)
+    
+    def _buckets_for(self, agent: str) -> Tuple[TokenBucket, TokenBucket]:
+        if agent not in self.agent_buckets:
+            self.agent_buckets[agent] = (
+                self._rate_bucket(self.config.agent_tasks_per_minute),
+                self._cost_bucket(self.config.agent_daily_budget)
+            )
+        return self.agent_buckets[agent]
+    
+    def estimate_cost(self, complexity: Optional[float]) -> float:
+        """Estimated dollar cost of a task from its 0-100 complexity score"""
+        return self.config.base_task_cost + (complexity or 0.0) * self.config.cost_per_complexity_point
+    
+    def admit(self, task: Dict, age: float = 0.0, retry: bool = False) -> str:
+        """Return DISPATCH, DEFER or SHED for `task`, consuming budget on DISPATCH"""
+        agent = task['agent']
+        priority = task.get('priority', 'MEDIUM')
+        cost = self.estimate_cost(task.get('estimated_complexity'))
+        
+        agent_rate, agent_cost = self._buckets_for(agent)
+        rate_buckets = (self.global_rate, agent_rate)
+        cost_buckets = (self.global_cost, agent_cost)
+        
+        affordable = (all(b.can_consume(1) for b in rate_buckets)
+                      and all(b.can_consume(cost) for b in cost_buckets))
+        tight = min(b.level() for b in rate_buckets + cost_buckets) < self.config.reserve_fraction
+        
+        if priority == "CRITICAL":
+            decision = DISPATCH  # Never held back; may overdraw
+        elif affordable and (priority == "HIGH" or not tight):
+            decision = DISPATCH
+        elif priority == "LOW" or age >= self.config.max_defer_seconds:
+            decision = SHED
+        else:
+            decision = DEFER
+        
+        if decision == DISPATCH:
+            for bucket in rate_buckets:
+                bucket.consume(1)
+            for bucket in cost_buckets:
+                bucket.consume(cost)
+            self._record_cost(cost)
+        
+        # A deferred task that stays deferred on retry was already counted
+        if retry and decision == DEFER:
+            return decision
+        self.decisions[decision] += 1
+        per_agent = self.agent_decisions.setdefault(agent, {DISPATCH: 0, DEFER: 0, SHED: 0})
+        per_agent[decision] += 1
+        return decision
+    
+    def _record_cost(self, cost: float):
+        today = date.today()
+        if today != self.cost_day:
+            self.cost_day = today
+            self.cost_today = 0.0
+        self.cost_today += cost
+    
+    def metrics(self) -> Dict:
+        """Throttling decisions and bucket levels"""
+        return {
+            "decisions": dict(self.decisions),
+            "agent_decisions": {agent: dict(d) for agent, d in self.agent_decisions.items()},
+            "cost_today": round(self.cost_today, 4),
+            "daily_budget": self.config.daily_budget,
+            "levels": {
+                "global_rate": round(self.global_rate.level(), 3),
+                "global_cost": round(self.global_cost.level(), 3),
+                **{
+                    f"{agent}_rate": round(buckets[0].level(), 3)
+                    for agent, buckets in self.agent_buckets.items()
+                },
+                **{
+                    f"{agent}_cost": round(buckets[1].level(), 3)
+                    for agent, buckets in self.agent_buckets.items()
+                }
+            }
+        }
+
+
+def add_budget_arguments(parser):
+    """Register budget command-line flags"""
+    defaults = BudgetConfig()
+    parser.add_argument("--tasks-per-minute", type=float, default=defaults.tasks_per_minute,
+                        help=f"Global dispatch rate limit (default: {defaults.tasks_per_minute:g})")
+    parser.add_argument("--daily-budget", type=float, default=defaults.daily_budget,
+                        help=f"Global estimated cost per day in dollars (default: {defaults.daily_budget:g})")
+    parser.add_argument("--agent-tasks-per-minute", type=float, default=defaults.agent_tasks_per_minute,
+                        help=f"Per-agent dispatch rate limit (default: {defaults.agent_tasks_per_minute:g})")
+    parser.add_argument("--agent-daily-budget", type=float, default=defaults.agent_daily_budget,
+                        help=f"Per-agent estimated cost per day (default: {defaults.agent_daily_budget:g})")
+
+
+def budget_config_from_args(args) -> BudgetConfig:
+    """Build a BudgetConfig from parsed arguments"""
+    return BudgetConfig(
+        tasks_per_minute=args.tasks_per_minute,
+        daily_budget=args.daily_budget,
+        agent_tasks_per_minute=args.agent_tasks_per_minute,
+        agent_daily_budget=args.agent_daily_budget
+    )
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+AADF Consumer Group
+Lets several orchestrator processes share the event drop directory. The
+event stream is split into partitions by repository hash; members hold
+time-bounded leases on partitions, rebalance when a member joins or dies,
+and claim each event file with an atomic rename so no event is dispatched
+twice.
+
+All coordination lives in files under the group directory, so members on
+different nodes can cooperate through a shared filesystem (with roughly
+synchronized clocks). The drop directory and the group directory must be
+on the same filesystem for rename to be atomic.
+"""
+
+import os
+import json
+import time
+import zlib
+import fcntl
+import socket
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class ConsumerGroup:
+    """Lease-based partition ownership for one orchestrator process"""
+    
+    def __init__(self, group: str = "default", group_dir: str = "/tmp/aadf-group",
+                 member_id: Optional[str] = None, partitions: int = 16,
+                 lease_ttl: float = 15.0, drop_dir: str = "/tmp"):
+        self.dir = Path(group_dir) / group
+        self.member_id = member_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.partitions = partitions
+        self.lease_ttl = lease_ttl
+        self.drop_dir = Path(drop_dir)
+        
+        self.owned: Dict[int, float] = {}     # partition -> lease expiry
+        self.claimed: Dict[str, Path] = {}    # event_id -> claimed file awaiting ack
+        self.stats = {"claimed": 0, "acked": 0, "recovered": 0, "returned": 0, "rebalances": 0}
+        self.left = False
+        
+        self._partition_cache: Dict[str, int] = {}  # drop file name -> partition
+        self._last_tick = 0.0
+        
+        self.members_dir = self.dir / "members"
+        self.leases_dir = self.dir / "leases"
+        self.claimed_dir = self.dir / "claimed" / self.member_id
+        for directory in (self.members_dir, self.leases_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+    
+    @contextmanager
+    def locked(self):
+        """Exclusive group lock; serializes lease and shared state changes across members"""
+        with open(self.dir / ".lock", "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _write_json(path: Path, data: Dict):
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict]:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def partition_for(self, repository: str) -> int:
+        """Stable partition for a repository path"""
+        return zlib.crc32(repository.encode()) % self.partitions
+    
+    def _lease_path(self, partition: int) -> Path:
+        return self.leases_dir / f"{partition:03d}.json"
+    
+    def _live_members(self, now: float, prune: bool = False) -> List[str]:
+        """Members with an unexpired heartbeat, optionally removing stale ones"""
+        members = []
+        for path in self.members_dir.glob("*.json"):
+            heartbeat = self._read_json(path)
+            if heartbeat and heartbeat.get("expires", 0) > now:
+                members.append(heartbeat["member"])
+            elif heartbeat is not None and prune:
+                path.unlink()
+        return sorted(members)
+    
+    def tick(self, force: bool = False):
+        """Heartbeat, renew leases and rebalance; throttled to a third of the TTL"""
+        now = time.time()
+        if self.left or (not force and now - self._last_tick < self.lease_ttl / 3):
+            return
+        self._last_tick = now
+        expires = now + self.lease_ttl
+        self.claimed_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._write_json(self.members_dir / f"{self.member_id}.json", {
+            "member": self.member_id,
+            "expires": expires,
+            "pid": os.getpid(),
+            "host": socket.gethostname()
+        })
+        
+        with self.locked():
+            members = self._live_members(now, prune=True)
+            if self.member_id not in members:
+                members = sorted(members + [self.member_id])
+            live = set(members)
+            before = set(self.owned)
+            
+            for partition in range(self.partitions):
+                lease_path = self._lease_path(partition)
+                lease = self._read_json(lease_path)
+                mine = lease is not None and lease.get("owner") == self.member_id
+                assigned = members[partition % len(members)] == self.member_id
+                
+                if assigned and (mine or lease is None or lease.get("expires", 0) <= now):
+                    if lease is not None and not mine and lease.get("owner") not in live:
+                        self._recover(lease.get("owner"), partition)
+                    self._write_json(lease_path, {"owner": self.member_id, "expires": expires})
+                    self.owned[partition] = expires
+                elif mine and not assigned:
+                    # Hand off: the assigned member takes over on its next tick
+                    lease_path.unlink()
+                    self.owned.pop(partition, None)
+                else:
+                    self.owned.pop(partition, None)
+        
+        if set(self.owned) != before:
+            self.stats["rebalances"] += 1
+            print(f"⚖️  {self.member_id} owns {len(self.owned)}/{self.partitions} partitions "
+                  f"({len(members)} members)")
+    
+    def _recover(self, owner: Optional[str], partition: int):
+        """Return a dead member's unacknowledged events for `partition` to the drop directory"""
+        if not owner:
+            return
+        for path in (self.dir / "claimed" / owner).glob(f"{partition:03d}-*"):
+            try:
+                os.rename(path, self.drop_dir / path.name.split("-", 1)[1])
+                self.stats["recovered"] += 1
+            except OSError:
+                pass
+    
+    def owns(self, partition: int) -> bool:
+        """True while our lease on `partition` has comfortable time left"""
+        expires = self.owned.get(partition)
+        return expires is not None and expires - self.lease_ttl * 0.2 > time.time()
+    
+    def claim_events(self) -> List[Dict]:
+        """Claim drop-directory events in our partitions, oldest first"""
+        self.tick()
+        if self.left or not self.owned:
+            return []
+        
+        files = []
+        for path in self.drop_dir.glob("aadf-event-*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+        
+        events = []
+        present = set()
+        for _, path in sorted(files):
+            present.add(path.name)
+            partition = self._partition_cache.get(path.name)
+            if partition is None:
+                event_data = self._read_json(path)
+                if event_data is None:
+                    continue  # Missing, or still being written
+                partition = self.partition_for(event_data.get("data", {}).get("repository", ""))
+                self._partition_cache[path.name] = partition
+            
+            if not self.owns(partition):
+                continue
+            
+            # rename is atomic: exactly one member wins each file
+            claimed_path = self.claimed_dir / f"{partition:03d}-{path.name}"
+            try:
+                os.rename(path, claimed_path)
+            except OSError:
+                continue
+            
+            event_data = self._read_json(claimed_path)
+            if event_data is None:
+                claimed_path.unlink()
+                continue
+            self.claimed[event_data.get("event_id", path.name)] = claimed_path
+            self.stats["claimed"] += 1
+            events.append(event_data)
+        
+        self._partition_cache = {name: p for name, p in self._partition_cache.items() if name in present}
+        return events
+    
+    def confirm(self, event_data: Dict) -> bool:
+        """Renew leases, then check a claimed event is still ours to dispatch
+        
+        Called before each event, so leases stay renewed however long a batch
+        takes. A claim whose partition moved to another member goes back to
+        the drop directory for it; one already recovered is simply forgotten.
+        Events that were not claimed through the group always pass.
+        """
+        event_id = event_data.get("event_id")
+        claimed_path = self.claimed.get(event_id)
+        if claimed_path is None:
+            return True
+        self.tick()
+        
+        partition = int(claimed_path.name.split("-", 1)[0])
+        if self.owns(partition) and claimed_path.exists():
+            return True
+        
+        del self.claimed[event_id]
+        try:
+            os.rename(claimed_path, self.drop_dir / claimed_path.name.split("-", 1)[1])
+            self.stats["returned"] += 1
+        except OSError:
+            pass  # Recovered by the partition's new owner
+        print(f"↩️  {self.member_id} no longer owns partition {partition}; "
+              f"skipped event {event_id}")
+        return False
+    
+    def ack(self, event_data: Dict):
+        """Mark a claimed event as processed"""
+        claimed_path = self.claimed.pop(event_data.get("event_id"), None)
+        if claimed_path is not None:
+            try:
+                claimed_path.unlink()
+            except OSError:
+                pass
+            self.stats["acked"] += 1
+    
+    def leave(self):
+        """Return unacknowledged events, release leases and deregister"""
+        if self.left:
+            return
+        self.left = True
+        
+        for claimed_path in self.claimed.values():
+            try:
+                os.rename(claimed_path, self.drop_dir / claimed_path.name.split("-", 1)[1])
+            except OSError:
+                pass
+        self.claimed = {}
+        
+        with self.locked():
+            for partition in list(self.owned):
+                lease = self._read_json(self._lease_path(partition))
+                if lease and lease.get("owner") == self.member_id:
+                    self._lease_path(partition).unlink()
+            self.owned = {}
+            member_file = self.members_dir / f"{self.member_id}.json"
+            if member_file.exists():
+                member_file.unlink()
+        print(f"👋 {self.member_id} left consumer group {self.dir.name}")
+    
+    def status(self) -> Dict:
+        """Group membership, lease owners and this member's counters"""
+        now = time.time()
+        leases = {}
+        for partition in range(self.partitions):
+            lease = self._read_json(self._lease_path(partition))
+            if lease:
+                leases[partition] = {"owner": lease.get("owner"), "ttl": round(lease.get("expires", 0) - now, 1)}
+        return {
+            "group": self.dir.name,
+            "member": self.member_id,
+            "members": self._live_members(now),
+            "owned": sorted(self.owned),
+            "leases": leases,
+            "pending_acks": len(self.claimed),
+            **self.stats
+        }
+
+
+def add_group_arguments(parser):
+    """Register consumer group command-line flags"""
+    parser.add_argument("--group", default=None,
+                        help="Join this consumer group to share the event drop with other orchestrators")
+    parser.add_argument("--group-dir", default="/tmp/aadf-group",
+                        help="Shared coordination directory (default: /tmp/aadf-group)")
+    parser.add_argument("--member-id", default=None,
+                        help="Member name in the group (default: hostname-pid)")
+    parser.add_argument("--partitions", type=int, default=16,
+                        help="Partitions the event stream is split into (default: 16)")
+    parser.add_argument("--lease-ttl", type=float, default=15.0,
+                        help="Seconds a partition lease lasts without renewal (default: 15)")
+
+
+def consumer_group_from_args(args) -> Optional[ConsumerGroup]:
+    """Build a ConsumerGroup when --group was given"""
+    if not args.group:
+        return None
+    return ConsumerGroup(args.group, args.group_dir, args.member_id, args.partitions, args.lease_ttl)
+
+
+def main():
+    """Print the state of a consumer group"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Consumer Group status")
+    parser.add_argument("--group", default="default", help="Group name (default: default)")
+    parser.add_argument("--group-dir", default="/tmp/aadf-group",
+                        help="Shared coordination directory (default: /tmp/aadf-group)")
+    parser.add_argument("--partitions", type=int, default=16,
+                        help="Partitions the event stream is split into (default: 16)")
+    
+    args = parser.parse_args()
+    
+    group = ConsumerGroup(args.group, args.group_dir, member_id="status", partitions=args.partitions)
+    status = group.status()
+    for key in ("member", "owned", "pending_acks", "claimed", "acked", "recovered", "returned", "rebalances"):
+        status.pop(key)
+    print(json.dumps(status, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+AADF Event Log
+Records the orchestrator's event stream, with arrival times, to a JSON
+Lines file so an incident can be replayed later (see replay.py).
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class EventRecorder:
+    """Append-only JSONL log of events as the orchestrator receives them"""
+    
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.recorded = 0
+        self._file = open(self.path, "a")
+    
+    def record(self, event_data: Dict, received_at: Optional[float] = None):
+        """Append one event; rotates to <path>.1 once the log exceeds max_bytes"""
+        line = json.dumps({"t": received_at or time.time(), "event": event_data})
+        self._file.write(line + "\n")
+        self._file.flush()
+        self.recorded += 1
+        
+        if self.max_bytes and self._file.tell() > self.max_bytes:
+            self._file.close()
+            os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            self._file = open(self.path, "a")
+    
+    def close(self):
+        """Close the log file"""
+        self._file.close()
+
+
+def read_events(path: str) -> Iterator[Tuple[float, Dict]]:
+    """Yield (arrival time, event) pairs from a recorded log, skipping torn lines"""
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Partial last line from a crash
+            yield entry["t"], entry["event"]
+
+
+def add_recording_arguments(parser):
+    """Register event recording command-line flags"""
+    parser.add_argument("--record", default=None,
+                        help="Append every received event, with arrival time, to this JSONL file")
+
+
+def recorder_from_args(args) -> Optional[EventRecorder]:
+    """Build an EventRecorder when --record was given"""
+    if not args.record:
+        return None
+    print(f"⏺️  Recording events to {args.record}")
+    return EventRecorder(args.record)
@@ -5,9 +5,11 @@ Converts events to tasks and routes them to appropriate AI agents
 """
 
 import os
+import contextlib
 import sys
 import json
 import time
+import signal
 import asyncio
 import subprocess
 from datetime import datetime
@@ -18,69 +20,212 @@ from typing import Dict, List, Optional, Any
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from event_detection.event_types import EventType, AutomationEvent, Priority
+from event_detection.async_git_watcher import AsyncGitWatcher
+from event_detection.churn_index import add_churn_index_arguments, churn_index_for
+from event_detection.watcher_checkpoint import add_checkpoint_arguments, checkpoint_for
+from event_detection.path_filter import add_path_filter_arguments, path_filter_for
+from event_detection.poll_schedule import add_poll_schedule_arguments, poll_schedule_from_args
+from event_detection.analysis_cache import add_analysis_cache_arguments, analysis_cache_from_args
+from event_detection.pattern_store import PatternStore
+from orchestration.agent_registry import AgentRegistry, default_search_paths
+from orchestration.result_cache import PatchIdCache
+from orchestration.consumer_group import ConsumerGroup, add_group_arguments, consumer_group_from_args
+from orchestration.scheduler import Scheduler, add_scheduler_arguments, scheduler_from_args
+from orchestration.event_log import add_recording_arguments, recorder_from_args
+from orchestration.batcher import (
+    TaskBatcher, BatchConfig, PRIORITY_ORDER, estimate_task_minutes, add_batching_arguments,
+    batch_config_from_args
+)
+from orchestration.budget import (
+    BudgetController, BudgetConfig, DEFER, SHED, add_budget_arguments, budget_config_from_args
+)
+from monitoring.profiler import timed, add_profiling_arguments, profiler_from_args
 
 
+# Tasks still deferred by the budget at shutdown, retried by the next run
+DEFERRED_PATH = "/tmp/aadf-deferred-tasks.json"
+
 class TaskOrchestrator:
     """Central orchestration engine for autonomous AI coordination"""
     
-    def __init__(self, repo_path: str = "."):
+    def __init__(self, repo_path: str = ".", budget_config: Optional[BudgetConfig] = None,
+                 result_cache: Optional[PatchIdCache] = None,
+                 consumer_group: Optional[ConsumerGroup] = None,
+                 scheduler: Optional[Scheduler] = None,
+                 batch_config: Optional[BatchConfig] = None,
+                 deferred_path: Optional[str] = DEFERRED_PATH):
         self.repo_path = Path(repo_path).resolve()
         self.running = False
         self.event_queue = []
         self.active_tasks = {}
+        self.profiler = None  # Optional ProfileSession, polled from the loop
+        self.recorder = None  # Optional EventRecorder capturing the event stream
+        self.a2a_sink = None  # Optional async callable(command, task) receiving dispatches
+        self._wakeup: Optional[asyncio.Event] = None
+        self.last_heartbeat = 0.0
         self.automation_metrics = {
             "events_processed": 0,
             "tasks_created": 0,
             "tasks_completed": 0,
             "automation_rate": 0.0,
-            "average_response_time": 0.0
+            "average_response_time": 0.0,
+            "tasks_deferred": 0,
+            "tasks_shed": 0,
+            "tasks_deduplicated": 0,
+            "messages_sent": 0,
+            "cost_estimate": 0.0
         }
         
+        # When set, drop-directory events are shared with other orchestrators by partition
+        self.consumer_group = consumer_group
+        
+        # Token-bucket rate and cost limits; deferred tasks wait here
+        self.budget = BudgetController(budget_config)
+        self.deferred_tasks: List = []
+        self.deferred_path = Path(deferred_path) if deferred_path else None
+        self._load_deferred()
+        
+        # patch-id keyed record of dispatched work, shared across rebased/cherry-picked commits
+        self.result_cache = result_cache or PatchIdCache()
+        
+        # Cron and interval schedules for session, standup and review events
+        self.scheduler = scheduler
+        
+        # When set, admitted tasks wait here to be packed into session-sized bundles
+        self.batcher = TaskBatcher(batch_config) if batch_config else None
+        self.task_estimates = batch_config or BatchConfig()  # Expected agent time per task
+        
+        # Agent definitions, indexed by capability for task routing
+        self.agent_registry = AgentRegistry(default_search_paths(self.repo_path))
+        
+        # Indexed pattern library; resolves related_patterns names to records
+        self.pattern_store = PatternStore(self.repo_path / ".ai" / "patterns")
+        
         # Event handlers
         self.event_handlers = {
             EventType.NEW_COMMIT: self.handle_new_commit,
             EventType.NEW_BRANCH: self.handle_new_branch,
+            EventType.HISTORY_REWRITTEN: self.handle_history_rewritten,
             EventType.BUILD_FAILURE: self.handle_build_failure,
+            EventType.TEST_FAILURE: self.handle_build_failure,
+            EventType.LINT_ERROR: self.handle_build_failure,
+            EventType.TYPE_ERROR: self.handle_build_failure,
+            EventType.PR_CREATED: self.handle_pr_created,
+            EventType.PR_MERGED: self.handle_pr_merged,
+            EventType.ISSUE_CREATED: self.handle_issue_created,
             EventType.SESSION_START: self.handle_session_start,
+            EventType.SESSION_END: self.handle_session_end,
+            EventType.DAILY_STANDUP: self.handle_daily_standup,
+            EventType.WEEKLY_REVIEW: self.handle_weekly_review,
             EventType.PATTERN_DISCOVERED: self.handle_pattern_discovered
         }
         
         print("🤖 AADF Orchestrator initialized")
     
+    async def submit_event(self, event_data: Dict):
+        """Accept an event from an in-process producer (e.g. AsyncGitWatcher)"""
+        self._record(event_data)
+        self.event_queue.append(event_data)
+        if self._wakeup:
+            self._wakeup.set()
+    
     async def autonomous_loop(self):
         """Main autonomous processing loop"""
         self.running = True
+        self._wakeup = asyncio.Event()
         print("🚀 Starting autonomous orchestration loop")
         
+        try:
+            await self._run_loop()
+        finally:
+            if self.consumer_group:
+                # Hand our partitions (and any unprocessed claims) to the remaining members
+                self.consumer_group.leave()
+    
+    async def _run_loop(self):
         while self.running:
+            self.last_heartbeat = time.time()
             try:
                 # Check for new events
                 new_events = await self.check_for_events()
                 
                 # Process each event
                 for event in new_events:
+                    if not self._confirm(event):
+                        continue
                     await self.process_event(event)
+                    self._ack(event)
+                
+                # Take over work other members left deferred when they stopped
+                if self.consumer_group:
+                    self._load_deferred()
+                
+                # Retry work deferred by the budget controller
+                if self.deferred_tasks:
+                    await self.retry_deferred()
                 
-                # Update metrics
+                # Send bundles whose most urgent task has waited long enough
+                if self.batcher:
+                    for bundle in self.batcher.due():
+                        await self.dispatch(bundle)
+                
+                # Update metrics and persist the result cache
                 self.update_metrics()
+                self.result_cache.flush()
+                
+                if self.profiler:
+                    self.profiler.poll()
                 
-                # Brief pause
-                await asyncio.sleep(5)
+                # Brief pause, cut short when an in-process event arrives;
+                # group members must also wake often enough to renew leases
+                timeout = 5
+                if self.consumer_group:
+                    timeout = min(timeout, self.consumer_group.lease_ttl / 3)
+                if self.scheduler:
+                    until_due = self.scheduler.seconds_until_next()
+                    if until_due is not None:
+                        timeout = min(timeout, until_due)
+                if self.batcher:
+                    until_deadline = self.batcher.seconds_until_next()
+                    if until_deadline is not None:
+                        timeout = min(timeout, until_deadline)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
                 
             except Exception as e:
                 print(f"❌ Error in orchestration loop: {e}")
                 await asyncio.sleep(10)
     
+    @timed("orchestrator.check_for_events")
     async def check_for_events(self) -> List[Dict]:
         """Check for new events from various sources"""
-        events = []
+        # Drain events submitted in-process
+        events, self.event_queue = self.event_queue, []
+        
+        # Time-based events whose schedule is due
+        if self.scheduler:
+            for event_data in self.scheduler.due(accept=self._owns_schedule):
+                self._record(event_data)
+                events.append(event_data)
+        
+        # Consumer-group members only take events from partitions they lease
+        if self.consumer_group:
+            for event_data in self.consumer_group.claim_events():
+                self._record(event_data)
+                events.append(event_data)
+            return events
         
         # Check for event files from git-watcher
         event_dir = Path("/tmp")
         for event_file in event_dir.glob("aadf-event-*.json"):
             try:
+                arrived = event_file.stat().st_mtime
                 with open(event_file, "r") as f:
                     event_data = json.load(f)
+                self._record(event_data, arrived)
                 events.append(event_data)
                 
                 # Remove processed file
@@ -91,6 +236,29 @@ class TaskOrchestrator:
         
         return events
     
+    def _record(self, event_data: Dict, received_at: Optional[float] = None):
+        """Log an event as it arrives, so replays see arrival times rather than processing times"""
+        if self.recorder:
+            self.recorder.record(event_data, received_at)
+    
+    def _owns_schedule(self, schedule) -> bool:
+        """Group members fire only schedules for repositories in partitions they lease"""
+        if not self.consumer_group:
+            return True
+        return self.consumer_group.owns(self.consumer_group.partition_for(schedule.repository or ""))
+    
+    def _confirm(self, event_data: Dict) -> bool:
+        """Renew group leases; False if a claimed event's partition has moved on"""
+        if self.consumer_group:
+            return self.consumer_group.confirm(event_data)
+        return True
+    
+    def _ack(self, event_data: Dict):
+        """Release a drop-directory event claimed through the consumer group"""
+        if self.consumer_group:
+            self.consumer_group.ack(event_data)
+    
+    @timed("orchestrator.process_event")
     async def process_event(self, event_data: Dict):
         """Process a single event and route to appropriate handler"""
         start_time = time.time()
@@ -125,10 +293,23 @@ class TaskOrchestrator:
         print("🔍 Analyzing new commit...")
         
         # Extract commit details
-        commit_hash = event_data['data'].get('commit_hash', '')[:8]
+        full_hash = event_data['data'].get('commit_hash', '')
+        commit_hash = full_hash[:8]
         files_changed = event_data['data'].get('files_changed', [])
         author = event_data['data'].get('author', 'Unknown')
         
+        # Known patterns, so extraction extends the library instead of duplicating it
+        known_patterns = self.pattern_store.resolve(event_data.get('related_patterns') or [])
+        if not known_patterns:
+            known_patterns = self.pattern_store.match(files_changed, event_data['data'].get('subject', ''))
+        
+        # Identical diffs share a patch id regardless of commit hash
+        patch_id = None
+        repository = event_data['data'].get('repository')
+        # Skipped for repositories not on this machine, e.g. when replaying another host's log
+        if full_hash and repository and os.path.isdir(repository):
+            patch_id = await self.result_cache.patch_id(repository, full_hash)
+        
         # Create tasks based on commit analysis
         tasks = []
         
@@ -138,10 +319,16 @@ class TaskOrchestrator:
                 "type": "PATTERN_EXTRACTION",
                 "agent": "framework-architect",
                 "priority": "HIGH",
+                "estimated_complexity": event_data.get('estimated_complexity'),
+                "patch_id": patch_id,
+                "source_commit": full_hash,
                 "description": f"Extract patterns from commit {commit_hash}",
                 "data": {
                     "commit_hash": commit_hash,
-                    "files": files_changed
+                    "files": files_changed,
+                    "total_files": event_data['data'].get('total_files', len(files_changed)),
+                    "full_file_list": event_data['data'].get('full_file_list'),
+                    "known_patterns": [record.summary() for record in known_patterns]
                 }
             })
         
@@ -151,6 +338,9 @@ class TaskOrchestrator:
                 "type": "CODE_REVIEW",
                 "agent": "cto",
                 "priority": "HIGH",
+                "estimated_complexity": event_data.get('estimated_complexity'),
+                "patch_id": patch_id,
+                "source_commit": full_hash,
                 "description": f"Review commit {commit_hash} by {author}",
                 "data": {
                     "commit_hash": commit_hash,
@@ -165,6 +355,7 @@ class TaskOrchestrator:
                 "type": "DOC_UPDATE",
                 "agent": "framework-architect",
                 "priority": "MEDIUM",
+                "estimated_complexity": event_data.get('estimated_complexity'),
                 "description": "Update documentation index",
                 "data": {
                     "files": md_files
@@ -185,6 +376,7 @@ class TaskOrchestrator:
             "type": "BRANCH_SETUP",
             "agent": "cto",
             "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
             "description": f"Setup development environment for branch {branch_name}",
             "data": {
                 "branch": branch_name
@@ -193,16 +385,97 @@ class TaskOrchestrator:
         
         await self.execute_task(task)
     
+    async def handle_history_rewritten(self, event_data: Dict):
+        """Handle force-pushes and rebases detected by the git watcher"""
+        data = event_data['data']
+        print(f"✂️  History rewritten on {data.get('branch')}: "
+              f"{data.get('dropped_commits', 0)} commits dropped ({data.get('reason')})")
+        
+        # Rebased commits arrive as NEW_COMMIT events and are deduplicated by
+        # patch id; only rewrites of shared branches need a human-facing audit
+        if not data.get('protected'):
+            return
+        
+        task = {
+            "type": "CODE_REVIEW",
+            "agent": "cto",
+            "priority": "HIGH",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": f"Audit history rewrite of {data.get('branch')}",
+            "data": data
+        }
+        
+        await self.execute_task(task)
+    
+    async def handle_pr_created(self, event_data: Dict):
+        """Handle pull/merge request events pushed by webhooks"""
+        data = event_data['data']
+        print(f"🔀 Pull request #{data.get('pr_number')} opened: {data.get('title', '')}")
+        
+        task = {
+            "type": "CODE_REVIEW",
+            "agent": "cto",
+            "priority": "HIGH",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": f"Review PR #{data.get('pr_number')} by {data.get('author')}",
+            "data": data
+        }
+        
+        await self.execute_task(task)
+    
+    async def handle_pr_merged(self, event_data: Dict):
+        """Handle merged pull/merge requests"""
+        data = event_data['data']
+        print(f"✅ Pull request #{data.get('pr_number')} merged into {data.get('base_branch')}")
+        
+        task = {
+            "type": "PATTERN_EXTRACTION",
+            "agent": "framework-architect",
+            "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": f"Extract patterns from merged PR #{data.get('pr_number')}",
+            "data": data
+        }
+        
+        await self.execute_task(task)
+    
+    async def handle_issue_created(self, event_data: Dict):
+        """Handle newly opened issues"""
+        data = event_data['data']
+        print(f"📝 Issue #{data.get('issue_number')} opened: {data.get('title', '')}")
+        
+        task = {
+            "type": "ISSUE_TRIAGE",
+            "agent": "strategic-advisor",
+            "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": f"Triage issue #{data.get('issue_number')}",
+            "data": data
+        }
+        
+        await self.execute_task(task)
+    
     async def handle_build_failure(self, event_data: Dict):
-        """Handle build failure events"""
-        print("🚨 Build failure detected - initiating emergency response")
+        """Handle build, test, lint and type check failure events"""
+        event_type = event_data['event_type']
+        if event_type == EventType.BUILD_FAILURE.value:
+            print("🚨 Build failure detected - initiating emergency response")
+            priority, description = "CRITICAL", "Diagnose and fix build failure"
+        elif event_type == EventType.TEST_FAILURE.value:
+            print("🚨 Test failure detected")
+            priority, description = "HIGH", "Diagnose and fix test failure"
+        else:
+            # Lint and type check findings wait their turn under budget pressure
+            kind = "lint" if event_type == EventType.LINT_ERROR.value else "type check"
+            print(f"🔧 {kind.capitalize()} errors reported")
+            priority, description = "MEDIUM", f"Fix {kind} errors"
         
-        # High priority diagnostic task
         task = {
             "type": "BUILD_DIAGNOSIS",
             "agent": "cto",
-            "priority": "CRITICAL",
-            "description": "Diagnose and fix build failure",
+            "priority": priority,
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": description,
             "data": event_data['data']
         }
         
@@ -216,35 +489,158 @@ class TaskOrchestrator:
         task = {
             "type": "SESSION_PLANNING",
             "agent": "strategic-advisor",
+            "pinned_agent": event_data['data'].get('agent'),
             "priority": "HIGH",
+            "estimated_complexity": event_data.get('estimated_complexity'),
             "description": "Plan objectives for development session",
             "data": {
                 "session_duration": 90,
-                "available_agents": ["cto", "framework-architect"]
+                "available_agents": ["cto", "framework-architect"],
+                **event_data['data']
+            }
+        }
+        
+        await self.execute_task(task)
+    
+    async def handle_session_end(self, event_data: Dict):
+        """Handle session end events"""
+        print("🏁 Closing autonomous development session")
+        
+        # The agent's dispatched work is done with its session
+        if event_data['data'].get('agent'):
+            self.agent_registry.release(event_data['data']['agent'])
+        
+        task = {
+            "type": "SESSION_REVIEW",
+            "agent": "strategic-advisor",
+            "pinned_agent": event_data['data'].get('agent'),
+            "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": "Summarize session outcomes and carry-over work",
+            "data": {
+                "automation_metrics": dict(self.automation_metrics),
+                **event_data['data']
             }
         }
         
         await self.execute_task(task)
     
+    async def handle_daily_standup(self, event_data: Dict):
+        """Handle scheduled daily standups"""
+        data = event_data['data']
+        print(f"☀️  Daily standup for {data.get('repository') or self.repo_path}")
+        
+        task = {
+            "type": "STANDUP_REPORT",
+            "agent": "strategic-advisor",
+            "pinned_agent": data.get('agent'),
+            "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": "Report progress, plans and blockers since the last standup",
+            "data": data
+        }
+        
+        await self.execute_task(task)
+    
+    async def handle_weekly_review(self, event_data: Dict):
+        """Handle scheduled weekly reviews"""
+        data = event_data['data']
+        print(f"📅 Weekly review for {data.get('repository') or self.repo_path}")
+        
+        task = {
+            "type": "WEEKLY_REVIEW",
+            "agent": "cto",
+            "pinned_agent": data.get('agent'),
+            "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
+            "description": "Review the week's architecture, velocity and pattern adoption",
+            "data": data
+        }
+        
+        await self.execute_task(task)
+    
     async def handle_pattern_discovered(self, event_data: Dict):
         """Handle pattern discovery events"""
         pattern_name = event_data['data'].get('pattern_name', '')
         print(f"💡 New pattern discovered: {pattern_name}")
         
+        # Point the agent at an existing record and its neighbours rather than a blank page
+        existing = self.pattern_store.get(pattern_name) if pattern_name else None
+        related = self.pattern_store.in_category(event_data['data'].get('pattern_category', ''))
+        data = dict(event_data['data'])
+        data["existing_pattern"] = existing.summary() if existing else None
+        data["related_patterns"] = [record.summary() for record in related if record is not existing][:10]
+        
         # Document pattern task
         task = {
             "type": "PATTERN_DOCUMENTATION",
             "agent": "framework-architect",
             "priority": "MEDIUM",
+            "estimated_complexity": event_data.get('estimated_complexity'),
             "description": f"Document and validate pattern: {pattern_name}",
-            "data": event_data['data']
+            "data": data
         }
         
         await self.execute_task(task)
     
-    async def execute_task(self, task: Dict):
+    @timed("orchestrator.execute_task")
+    async def execute_task(self, task: Dict, deferred_since: Optional[float] = None):
         """Execute a task by sending to appropriate AI agent"""
-        self.automation_metrics["tasks_created"] += 1
+        if deferred_since is None:
+            self.automation_metrics["tasks_created"] += 1
+        
+        # Identical change already handled (cherry-pick, rebase, merge); checked before
+        # routing, since load balancing may pick a different capable agent this time
+        patch_id = task.get('patch_id')
+        if patch_id:
+            cached = self.result_cache.get(patch_id, task['type'])
+            if cached:
+                self.automation_metrics["tasks_deduplicated"] += 1
+                print(f"   ♻️  {task['type']} already handled by {cached.get('agent')} for identical change "
+                      f"{cached['commit_hash'][:8]}, skipping dispatch")
+                return
+            # Or still waiting, unsent, in some agent's bundle
+            agent = self.batcher.absorb(task) if self.batcher else None
+            if agent:
+                self.automation_metrics["tasks_deduplicated"] += 1
+                print(f"   ♻️  {task['type']} for identical change already batched for {agent}")
+                for bundle in self.batcher.due():
+                    await self.dispatch(bundle)
+                return
+        
+        # Route to the least-loaded capable agent; the handler's choice is the fallback.
+        # Scheduled work bound to an agent is never rerouted.
+        task['agent'] = task.get('pinned_agent') or self.agent_registry.route(task['type'], default=task['agent'])
+        
+        # Budget check: LOW/MEDIUM work is deferred or shed first when budgets tighten
+        age = time.time() - deferred_since if deferred_since else 0.0
+        decision = self.budget.admit(task, age, retry=deferred_since is not None)
+        if decision == DEFER:
+            self.deferred_tasks.append((task, deferred_since or time.time()))
+            print(f"   ⏸️  Deferred {task['type']} for {task['agent']} (budget)")
+            return
+        if decision == SHED:
+            self.automation_metrics["tasks_shed"] += 1
+            print(f"   🗑️  Shed {task['priority']} {task['type']} for {task['agent']} (budget)")
+            return
+        
+        if self.batcher:
+            definition = self.agent_registry.agents.get(task['agent'])
+            bundles = self.batcher.add(task, definition)
+            if not bundles:
+                print(f"   📦 Batched {task['type']} for {task['agent']}")
+            for bundle in bundles:
+                await self.dispatch(bundle)
+            return
+        
+        await self.dispatch([task])
+    
+    async def dispatch(self, tasks: List[Dict]):
+        """Send one A2A message carrying one task, or a session bundle for one agent"""
+        task = tasks[0] if len(tasks) == 1 else self._bundle_task(tasks)
+        # Held until the agent's session ends or the estimate runs out, not just for this send
+        for member in tasks:
+            self.agent_registry.acquire(member['agent'], estimate_task_minutes(member, self.task_estimates))
         
         print(f"\n🤖 Executing task: {task['description']}")
         print(f"   Type: {task['type']}")
@@ -275,16 +671,48 @@ class TaskOrchestrator:
             
             # In real implementation, we would execute:
             # subprocess.run(a2a_command, cwd=self.repo_path)
+            if self.a2a_sink:
+                await self.a2a_sink(a2a_command, task)
             
             # For demo, just mark as completed
-            self.automation_metrics["tasks_completed"] += 1
+            self.automation_metrics["messages_sent"] += 1
+            for member in tasks:
+                self.automation_metrics["tasks_completed"] += 1
+                if member.get('patch_id'):
+                    self.result_cache.put(member['patch_id'], member['type'], member['agent'],
+                                          member['source_commit'])
             print(f"   ✅ Task queued for {task['agent']}")
             
         except Exception as e:
             print(f"   ❌ Failed to execute task: {e}")
+            self.agent_registry.release(task['agent'], len(tasks))
+    
+    @staticmethod
+    def _bundle_task(tasks: List[Dict]) -> Dict:
+        """Wrap several tasks for one agent into a single session task"""
+        priority = min((t['priority'] for t in tasks), key=lambda p: PRIORITY_ORDER.get(p, 2))
+        return {
+            "type": "SESSION_BUNDLE",
+            "agent": tasks[0]['agent'],
+            "priority": priority,
+            "description": f"Session bundle: {len(tasks)} tasks "
+                           f"({', '.join(sorted({t['type'] for t in tasks}))})",
+            "data": {"tasks": [
+                {key: t.get(key) for key in ("type", "priority", "description", "estimated_complexity", "data")}
+                for t in tasks
+            ]}
+        }
+    
+    async def retry_deferred(self):
+        """Re-offer deferred tasks to the budget controller, oldest first"""
+        pending, self.deferred_tasks = self.deferred_tasks, []
+        for task, deferred_since in pending:
+            await self.execute_task(task, deferred_since)
     
     def update_metrics(self):
         """Update automation metrics"""
+        self.automation_metrics["tasks_deferred"] = len(self.deferred_tasks)
+        self.automation_metrics["cost_estimate"] = self.budget.cost_today
         if self.automation_metrics["tasks_created"] > 0:
             self.automation_metrics["automation_rate"] = (
                 self.automation_metrics["tasks_completed"] / 
@@ -309,10 +737,85 @@ class TaskOrchestrator:
         print(f"   Tasks Completed: {self.automation_metrics['tasks_completed']}")
         print(f"   Automation Rate: {self.automation_metrics['automation_rate']:.1f}%")
         print(f"   Avg Response Time: {self.automation_metrics['average_response_time']:.2f}s")
+        print(f"   Tasks Deferred: {self.automation_metrics['tasks_deferred']}")
+        print(f"   Tasks Shed: {self.automation_metrics['tasks_shed']}")
+        print(f"   Tasks Deduplicated: {self.automation_metrics['tasks_deduplicated']}")
+        print(f"   A2A Messages Sent: {self.automation_metrics['messages_sent']}")
+        print(f"   Est. Cost Today: ${self.automation_metrics['cost_estimate']:.2f}")
     
-    async def stop(self):
-        """Stop the orchestrator"""
+    async def drain(self):
+        """Process every event still queued in-process or in the drop directory"""
+        for event in await self.check_for_events():
+            if not self._confirm(event):
+                continue
+            await self.process_event(event)
+            self._ack(event)
+        await self.flush_batches()
+    
+    async def flush_batches(self):
+        """Dispatch every task still waiting for a bundle to fill"""
+        if self.batcher:
+            for bundle in self.batcher.flush_all():
+                await self.dispatch(bundle)
+    
+    def _deferred_lock(self):
+        """Group members share one deferred file; take and append to it under the group lock"""
+        return self.consumer_group.locked() if self.consumer_group else contextlib.nullcontext()
+    
+    def _read_deferred(self) -> List:
+        with open(self.deferred_path, "r") as f:
+            return [(entry["task"], entry["deferred_since"]) for entry in json.load(f)]
+    
+    def _load_deferred(self):
+        """Take over tasks a previous run left deferred; they keep their original defer time"""
+        if not self.deferred_path or not self.deferred_path.exists():
+            return
+        with self._deferred_lock():
+            try:
+                restored = self._read_deferred()
+                self.deferred_path.unlink()
+            except FileNotFoundError:
+                return  # Another member took them first
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️  Ignoring unreadable deferred tasks {self.deferred_path}: {e}")
+                return
+        self.deferred_tasks.extend(restored)
+        print(f"⏸️  Restored {len(restored)} deferred tasks")
+    
+    def save_deferred(self):
+        """Persist tasks the budget still holds back, instead of dropping them at shutdown"""
+        if not self.deferred_path or not self.deferred_tasks:
+            return
+        self.deferred_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.deferred_path.with_name(f".{self.deferred_path.name}.{os.getpid()}.tmp")
+        with self._deferred_lock():
+            # Keep whatever other members saved and nobody has taken over yet
+            saved = []
+            if self.deferred_path.exists():
+                try:
+                    saved = self._read_deferred()
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    print(f"⚠️  Replacing unreadable deferred tasks {self.deferred_path}: {e}")
+            with open(tmp_path, "w") as f:
+                json.dump([{"task": task, "deferred_since": since}
+                           for task, since in saved + self.deferred_tasks], f)
+            os.replace(tmp_path, self.deferred_path)
+        print(f"⏸️  Saved {len(self.deferred_tasks)} deferred tasks to {self.deferred_path}")
+    
+    def request_stop(self):
+        """Let the loop exit after its current iteration, without flushing anything"""
         self.running = False
+        if self._wakeup:
+            self._wakeup.set()
+    
+    async def stop(self):
+        """Stop the orchestrator, sending batched work and persisting its state"""
+        self.request_stop()
+        await self.flush_batches()
+        self.save_deferred()
+        if self.profiler:
+            self.profiler.stop()
+        self.result_cache.flush()
         print("\n🛑 Orchestrator stopped")
         self.print_metrics()
 
@@ -327,18 +830,106 @@ async def main():
         default=".",
         help="Path to repository (default: current directory)"
     )
+    parser.add_argument(
+        "--watch",
+        action="append",
+        default=[],
+        help="Embed an async git watcher for this repository; repeat for several"
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=int,
+        default=10,
+        help="Polling interval for embedded watchers in seconds (default: 10)"
+    )
+    parser.add_argument(
+        "--result-cache",
+        default="/tmp/aadf-result-cache.json",
+        help="Persisted patch-id result cache (default: /tmp/aadf-result-cache.json)"
+    )
+    parser.add_argument(
+        "--result-cache-size",
+        type=int,
+        default=10000,
+        help="Maximum cached (patch, task) entries (default: 10000)"
+    )
+    parser.add_argument(
+        "--deferred-state",
+        default=DEFERRED_PATH,
+        help=f"Where budget-deferred tasks are kept across restarts (default: {DEFERRED_PATH})"
+    )
+    add_budget_arguments(parser)
+    add_group_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_recording_arguments(parser)
+    add_batching_arguments(parser)
+    add_churn_index_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_path_filter_arguments(parser)
+    add_poll_schedule_arguments(parser)
+    add_analysis_cache_arguments(parser)
+    add_profiling_arguments(parser)
     
     args = parser.parse_args()
     
+    # Group members share next-fire times, the result cache and deferred tasks
+    # through the group directory, merging their changes under the group lock
+    consumer_group = consumer_group_from_args(args)
+    result_cache_path, deferred_path, lock = args.result_cache, args.deferred_state, None
+    if consumer_group:
+        lock = consumer_group.locked
+        if result_cache_path == parser.get_default("result_cache"):
+            result_cache_path = str(consumer_group.dir / "result-cache.json")
+        if deferred_path == DEFERRED_PATH:
+            deferred_path = str(consumer_group.dir / "deferred-tasks.json")
+    
     # Create orchestrator
-    orchestrator = TaskOrchestrator(args.repo)
+    orchestrator = TaskOrchestrator(
+        args.repo,
+        budget_config_from_args(args),
+        PatchIdCache(result_cache_path, args.result_cache_size, lock=lock),
+        consumer_group,
+        scheduler_from_args(args, args.repo, consumer_group),
+        batch_config_from_args(args),
+        deferred_path
+    )
+    orchestrator.profiler = profiler_from_args("orchestrator", args)
+    orchestrator.recorder = recorder_from_args(args)
+    
+    # Single-process deployment: watchers share the orchestrator's event loop
+    poll_schedule = poll_schedule_from_args(args)
+    analysis_cache = analysis_cache_from_args(args)
+    watchers = [
+        AsyncGitWatcher(repo, args.watch_interval, event_sink=orchestrator.submit_event,
+                        churn_index=churn_index_for(repo, args.churn_index_dir, args.churn_backfill),
+                        checkpoint=checkpoint_for(repo, args.checkpoint_dir),
+                        catchup_batch=args.catchup_batch,
+                        path_filter=path_filter_for(repo, args),
+                        poll_schedule=poll_schedule,
+                        analysis_cache=analysis_cache)
+        for repo in args.watch
+    ]
     
-    try:
-        # Start autonomous loop
-        await orchestrator.autonomous_loop()
-    except KeyboardInterrupt:
+    stopping = []
+    
+    def shutdown():
         print("\n\nShutting down...")
-        await orchestrator.stop()
+        for watcher in watchers:
+            watcher.stop()
+        stopping.append(asyncio.ensure_future(orchestrator.stop()))
+    
+    # Stop cleanly so a consumer group member hands its partitions over at once
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, shutdown)
+    
+    # Start autonomous loop
+    await asyncio.gather(
+        orchestrator.autonomous_loop(),
+        *(watcher.start() for watcher in watchers)
+    )
+    # Let the shutdown finish persisting state before asyncio.run closes the loop
+    await asyncio.gather(*stopping)
 
 
 if __name__ == "__main__":
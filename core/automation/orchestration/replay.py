@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+AADF Event Replay
+Feeds a recorded event log (see event_log.py) back through a fresh
+TaskOrchestrator at the original pace, N times faster, or as fast as
+possible, with dispatches going to a stub A2A sink instead of agents.
+
+Reports throughput and latency percentiles, and diffs the tasks each
+event produced against an earlier run, so a handler change can be
+checked for correctness and performance in one pass.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import contextlib
+from typing import Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestration.orchestrator import TaskOrchestrator
+from orchestration.result_cache import PatchIdCache
+from orchestration.event_log import read_events
+from orchestration.budget import BudgetConfig, add_budget_arguments, budget_config_from_args
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def task_digest(task: Dict) -> Dict:
+    """Comparable summary of a dispatched task; the payload is reduced to a hash"""
+    payload = json.dumps(task.get("data"), sort_keys=True, default=str)
+    return {
+        "type": task["type"],
+        "agent": task["agent"],
+        "priority": task["priority"],
+        "description": task["description"],
+        "data": hashlib.sha1(payload.encode()).hexdigest()[:12]
+    }
+
+
+class StubA2ASink:
+    """Collects dispatched tasks per originating event instead of messaging agents"""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.current_event: Optional[str] = None
+        self.tasks: Dict[str, List[Dict]] = {}
+        self.dispatched = 0
+    
+    async def __call__(self, command: List[str], task: Dict):
+        if self.delay:
+            await asyncio.sleep(self.delay)  # Simulated A2A round trip
+        self.tasks.setdefault(self.current_event, []).append(task_digest(task))
+        self.dispatched += 1
+
+
+class Replayer:
+    """Replays one event log through a fresh orchestrator"""
+    
+    def __init__(self, log_path: str, repo_path: str = ".", speed: Optional[float] = 1.0,
+                 budget_config: Optional[BudgetConfig] = None, sink_delay: float = 0.0,
+                 limit: Optional[int] = None):
+        self.log_path = log_path
+        self.repo_path = repo_path
+        self.speed = speed  # None replays as fast as possible
+        self.budget_config = budget_config
+        self.limit = limit
+        self.sink = StubA2ASink(sink_delay)
+    
+    async def run(self) -> Dict:
+        """Replay the log and return the summary and per-event tasks"""
+        # In-memory result cache and deferred queue: a replay must not see or pollute production state
+        orchestrator = TaskOrchestrator(self.repo_path, self.budget_config, PatchIdCache(None),
+                                        deferred_path=None)
+        orchestrator.a2a_sink = self.sink
+        
+        latencies = []
+        failures = 0
+        first_recorded = last_recorded = None
+        start = time.perf_counter()
+        for recorded_at, event in read_events(self.log_path):
+            if self.limit is not None and len(latencies) >= self.limit:
+                break
+            if first_recorded is None:
+                first_recorded = recorded_at
+            last_recorded = recorded_at
+            
+            # Latency is measured from when the event was due, so falling behind shows up
+            due = time.perf_counter()
+            if self.speed:
+                due = start + (recorded_at - first_recorded) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            
+            self.sink.current_event = event.get("event_id")
+            try:
+                await orchestrator.process_event(event)
+            except Exception as e:
+                # One bad or foreign event must not end the replay of the rest
+                failures += 1
+                print(f"❌ Event {event.get('event_id')} failed: {type(e).__name__}: {e}")
+            latencies.append(time.perf_counter() - due)
+        
+        # Anything the budget held back is attributed to a single bucket
+        self.sink.current_event = "(deferred)"
+        await orchestrator.retry_deferred()
+        orchestrator.update_metrics()
+        elapsed = time.perf_counter() - start
+        
+        latencies.sort()
+        summary = {
+            "log": self.log_path,
+            "speed": self.speed or "max",
+            "events": len(latencies),
+            "recorded_span": round((last_recorded or 0) - (first_recorded or 0), 3),
+            "elapsed": round(elapsed, 3),
+            "throughput": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                name: round(percentile(latencies, fraction) * 1000, 3)
+                for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+            },
+            "dispatched": self.sink.dispatched,
+            "failed": failures,
+            "metrics": orchestrator.automation_metrics
+        }
+        return {"summary": summary, "tasks": self.sink.tasks}
+
+
+def diff_runs(baseline: Dict, current: Dict) -> List[Dict]:
+    """Events whose dispatched tasks differ between two replay results"""
+    changes = []
+    base_tasks, new_tasks = baseline["tasks"], current["tasks"]
+    for event_id in sorted(set(base_tasks) | set(new_tasks), key=str):
+        before = base_tasks.get(event_id, [])
+        after = new_tasks.get(event_id, [])
+        if before != after:
+            changes.append({"event_id": event_id, "baseline": before, "current": after})
+    return changes
+
+
+def print_report(result: Dict, baseline: Optional[Dict] = None):
+    """Print a replay summary, with deltas and task differences against a baseline"""
+    summary = result["summary"]
+    latency = summary["latency_ms"]
+    pace = "full speed" if summary["speed"] == "max" else f"{summary['speed']}x"
+    print(f"\n🔁 Replayed {summary['events']} events from {summary['log']} at {pace}")
+    print(f"   Recorded span: {summary['recorded_span']:.1f}s, replayed in {summary['elapsed']:.2f}s")
+    print(f"   Throughput: {summary['throughput']:.1f} events/s")
+    print(f"   Latency ms: p50 {latency['p50']:.2f}  p90 {latency['p90']:.2f}  "
+          f"p99 {latency['p99']:.2f}  max {latency['max']:.2f}")
+    print(f"   Tasks dispatched: {summary['dispatched']} "
+          f"(deferred {summary['metrics']['tasks_deferred']}, shed {summary['metrics']['tasks_shed']})")
+    if summary.get("failed"):
+        print(f"   ❌ Events failed: {summary['failed']} (rerun with --verbose for details)")
+    
+    if baseline is None:
+        return
+    
+    base = baseline["summary"]
+    if base["throughput"]:
+        change = (summary["throughput"] - base["throughput"]) / base["throughput"] * 100
+        print(f"\n📊 Throughput vs baseline: {base['throughput']:.1f} -> {summary['throughput']:.1f} "
+              f"events/s ({change:+.1f}%)")
+    print(f"   p99 latency vs baseline: {base['latency_ms']['p99']:.2f} -> {latency['p99']:.2f} ms")
+    
+    changes = diff_runs(baseline, result)
+    if not changes:
+        print("✅ Dispatched tasks identical to baseline")
+        return
+    print(f"⚠️  {len(changes)} events dispatched different tasks:")
+    for change in changes[:20]:
+        print(f"   {change['event_id']}")
+        for task in change["baseline"]:
+            if task not in change["current"]:
+                print(f"     - {task['type']} -> {task['agent']} ({task['priority']}) data {task['data']}")
+        for task in change["current"]:
+            if task not in change["baseline"]:
+                print(f"     + {task['type']} -> {task['agent']} ({task['priority']}) data {task['data']}")
+    if len(changes) > 20:
+        print(f"   ... and {len(changes) - 20} more")
+
+
+async def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Event Replay")
+    parser.add_argument("log", help="Event log recorded with --record")
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Repository the orchestrator runs against (default: current directory)"
+    )
+    parser.add_argument(
+        "--speed",
+        default="1",
+        help="Replay speed multiplier, or 'max' to ignore recorded timing (default: 1)"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Replay only the first N events"
+    )
+    parser.add_argument(
+        "--sink-delay",
+        type=float,
+        default=0.0,
+        help="Seconds the stub A2A sink takes per dispatch (default: 0)"
+    )
+    parser.add_argument(
+        "--no-budget",
+        action="store_true",
+        help="Lift rate and cost limits, which otherwise defer work in accelerated replays"
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Write the summary and per-event tasks to this JSON file"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Earlier --output file to diff tasks and performance against"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show orchestrator output during the replay"
+    )
+    add_budget_arguments(parser)
+    
+    args = parser.parse_args()
+    
+    speed = None if args.speed == "max" else float(args.speed)
+    budget_config = budget_config_from_args(args)
+    if args.no_budget:
+        unlimited = 1e12
+        budget_config = BudgetConfig(tasks_per_minute=unlimited, daily_budget=unlimited,
+                                     agent_tasks_per_minute=unlimited, agent_daily_budget=unlimited)
+    
+    replayer = Replayer(args.log, args.repo, speed, budget_config, args.sink_delay, args.limit)
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            result = await replayer.run()
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Replay result written to {args.output}")
+    
+    # Non-zero exit when tasks changed, for use as a regression check
+    if baseline is not None and diff_runs(baseline, result):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
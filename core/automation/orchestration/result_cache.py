@@ -0,0 +1,184 @@
+"""
+AADF Result Cache
+Content-addressed record of dispatched work keyed on `git patch-id`, so
+cherry-picks, rebases and multi-branch merges of an identical diff are
+not analysed twice, whichever capable agent they would be routed to
+"""
+
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Any, Tuple, Callable, ContextManager
+
+
+class PatchIdCache:
+    """Size-bounded LRU of (patch_id, task_type) -> dispatch record, persisted to disk"""
+    
+    def __init__(self, path: Optional[str] = "/tmp/aadf-result-cache.json",
+                 max_entries: int = 10000, max_patch_ids: int = 50000,
+                 lock: Optional[Callable[[], ContextManager]] = None):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.max_patch_ids = max_patch_ids
+        self.lock = lock  # Set when the file is shared by consumer-group members
+        
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.patch_ids: "OrderedDict[Tuple[str, str], str]" = OrderedDict()  # (repo, commit) -> patch id
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "patch_id_errors": 0}
+        self._dirty = False
+        self._unflushed: Dict[str, Dict[str, Any]] = {}  # Entries changed since the last flush
+        self._mtime: Optional[int] = None
+        
+        self._load()
+    
+    @staticmethod
+    def _key(patch_id: str, task_type: str) -> str:
+        return f"{patch_id}:{task_type}"
+    
+    def _load(self):
+        """Load persisted entries, oldest first so LRU order survives restarts"""
+        self.entries = self._read()
+        self._mtime = self._file_mtime()
+    
+    def _read(self) -> "OrderedDict[str, Dict[str, Any]]":
+        entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        if not self.path or not self.path.exists():
+            return entries
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            for key, entry in data.get("entries", []):
+                entries[key] = entry
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable result cache {self.path}: {e}")
+        return entries
+    
+    def _file_mtime(self) -> Optional[int]:
+        if not self.path:
+            return None
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": list(self.entries.items())}, f)
+        os.replace(tmp_path, self.path)
+    
+    def flush(self):
+        """Atomically persist the cache if it changed
+        
+        A shared cache merges this process's new entries into the file under
+        the lock and takes up the other members' in return, so an identical
+        change dispatched by any member is not dispatched again.
+        """
+        if not self.path:
+            return
+        if self.lock is None:
+            if self._dirty:
+                self._write()
+                self._dirty = False
+            return
+        
+        with self.lock():
+            if not self._dirty and self._file_mtime() == self._mtime:
+                return
+            entries = self._read()
+            for key, entry in self._unflushed.items():
+                entries[key] = entry
+                entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self.entries = entries
+            if self._dirty:
+                self._write()
+            self._mtime = self._file_mtime()
+        self._unflushed = {}
+        self._dirty = False
+    
+    async def patch_id(self, repo_path: str, commit_hash: str) -> Optional[str]:
+        """`git patch-id --stable` for a commit, memoized per commit; None if git fails"""
+        memo_key = (repo_path, commit_hash)
+        if memo_key in self.patch_ids:
+            self.patch_ids.move_to_end(memo_key)
+            return self.patch_ids[memo_key]
+        
+        # diff-tree | patch-id, connected by an OS pipe so the diff is never buffered here
+        read_fd, write_fd = os.pipe()
+        try:
+            diff = await asyncio.create_subprocess_exec(
+                "git", "diff-tree", "-p", "--root", "--no-color", commit_hash,
+                cwd=repo_path, stdout=write_fd, stderr=asyncio.subprocess.DEVNULL
+            )
+            os.close(write_fd)
+            write_fd = None
+            patch = await asyncio.create_subprocess_exec(
+                "git", "patch-id", "--stable",
+                cwd=repo_path, stdin=read_fd, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            os.close(read_fd)
+            read_fd = None
+            stdout, _ = await patch.communicate()
+            await diff.wait()
+        except OSError as e:
+            # Repository missing or moved; the task still goes out, just without dedup
+            self.stats["patch_id_errors"] += 1
+            print(f"⚠️  No patch id for {commit_hash[:8]} in {repo_path}: {e}")
+            return None
+        finally:
+            for fd in (read_fd, write_fd):
+                if fd is not None:
+                    os.close(fd)
+        
+        # Unknown commit or broken repository; not memoized so a later fetch can succeed
+        if diff.returncode or patch.returncode:
+            self.stats["patch_id_errors"] += 1
+            return None
+        
+        # Empty diffs (e.g. merge commits) have no patch id and are never cached
+        output = stdout.decode().split()
+        patch_id = output[0] if output else None
+        
+        self.patch_ids[memo_key] = patch_id
+        if len(self.patch_ids) > self.max_patch_ids:
+            self.patch_ids.popitem(last=False)
+        return patch_id
+    
+    def get(self, patch_id: str, task_type: str) -> Optional[Dict[str, Any]]:
+        """Dispatch record for this change and task type, whichever agent took it"""
+        key = self._key(patch_id, task_type)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry
+    
+    def put(self, patch_id: str, task_type: str, agent: str, commit_hash: str):
+        """Record that this change's task was dispatched to `agent`"""
+        key = self._key(patch_id, task_type)
+        self.entries[key] = {
+            "agent": agent,
+            "commit_hash": commit_hash,
+            "stored_at": time.time()
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        self._unflushed[key] = self.entries[key]
+        self._dirty = True
+    
+    def metrics(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current size"""
+        return {**self.stats, "entries": len(self.entries)}
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+AADF Scheduler
+Fires time-based events (SESSION_START, SESSION_END, DAILY_STANDUP,
+WEEKLY_REVIEW, ...) from cron-like or interval schedules, each optionally
+bound to an agent and a repository.
+
+Schedules sit in a min-heap keyed by next fire time, so the orchestrator
+only ever looks at the head of the heap and sleeps until it is due; cost
+per firing is O(log n) however many schedules are loaded. Next-fire times
+are persisted after every firing, so a restart neither repeats a firing
+nor silently skips one missed while the process was down (missed runs are
+coalesced into a single late firing).
+
+Consumer-group members share one state file in the group directory, merged
+under the group lock. A member only fires schedules whose repository
+partition it leases; the others keep a due run pending and look again every
+`recheck` seconds, so if the owner dies before firing, the partition's next
+owner fires it, once and late.
+
+Schedule file format (JSON list):
+
+    [
+      {"name": "standup", "event": "daily_standup", "cron": "0 9 * * 1-5",
+       "agent": "strategic-advisor", "repositories": ["/src/app", "/src/api"]},
+      {"name": "session", "event": "session_start", "every": 5400}
+    ]
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Callable, ContextManager, Any
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_detection.event_types import EventType, create_event
+
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *"
+}
+
+DEFAULT_STATE_PATH = "/tmp/aadf-scheduler-state.json"
+
+# (low, high) for minute, hour, day of month, month, day of week (0 = Sunday)
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+class CronExpression:
+    """Five-field cron expression: minute hour day-of-month month day-of-week
+    
+    Supports *, lists, ranges and steps (e.g. "*/15", "1-5", "0,30").
+    As in cron, when both day fields are restricted a day matching either
+    one fires.
+    """
+    
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(text, low, high) for text, (low, high) in zip(fields, CRON_RANGES)
+        )
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+    
+    @staticmethod
+    def _parse(text: str, low: int, high: int) -> frozenset:
+        values = set()
+        for part in text.split(","):
+            span, _, step = part.partition("/")
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start, end = (int(v) for v in span.split("-", 1))
+            else:
+                start = end = int(span)
+                if step:
+                    end = high
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron field {text!r} outside {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return frozenset(values)
+    
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+    
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment`"""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skip whole months, days and hours rather than stepping minute by minute
+        for _ in range(5 * 366 * 24):
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"cron expression never fires: {self.expression!r}")
+
+
+@dataclass
+class Schedule:
+    """One recurring event, optionally bound to an agent and repository"""
+    name: str
+    event_type: EventType
+    cron: Optional[CronExpression] = None
+    interval: Optional[float] = None
+    agent: Optional[str] = None
+    repository: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    next_fire: float = 0.0
+    pending_since: Optional[float] = None  # Due run another member has yet to fire
+    
+    @property
+    def definition_hash(self) -> str:
+        """Changes whenever the timing or binding of the schedule changes"""
+        definition = [self.event_type.value, self.cron.expression if self.cron else None,
+                      self.interval, self.agent, self.repository]
+        return hashlib.sha1(json.dumps(definition).encode()).hexdigest()[:12]
+    
+    def following(self, fired_at: float, now: float) -> float:
+        """Next fire time after a firing scheduled for `fired_at`, never in the past"""
+        if self.cron:
+            return self.cron.next_after(datetime.fromtimestamp(max(fired_at, now))).timestamp()
+        # Stay aligned to the original cadence, skipping missed slots
+        missed = max(0, int((now - fired_at) // self.interval))
+        return fired_at + (missed + 1) * self.interval
+
+
+def schedules_from_definitions(definitions: List[Dict]) -> List[Schedule]:
+    """Build schedules from the JSON file format, expanding `repositories` lists"""
+    schedules = []
+    for definition in definitions:
+        cron = CronExpression(definition["cron"]) if definition.get("cron") else None
+        interval = float(definition["every"]) if definition.get("every") else None
+        if (cron is None) == (interval is None):
+            raise ValueError(f"schedule {definition.get('name')!r} needs exactly one of cron/every")
+        
+        repositories = definition.get("repositories") or [definition.get("repository")]
+        for repository in repositories:
+            name = definition["name"] if len(repositories) == 1 else f"{definition['name']}@{repository}"
+            schedules.append(Schedule(
+                name=name,
+                event_type=EventType(definition["event"]),
+                cron=cron,
+                interval=interval,
+                agent=definition.get("agent"),
+                repository=repository,
+                data=definition.get("data", {})
+            ))
+    return schedules
+
+
+class Scheduler:
+    """Min-heap of schedules with persisted next-fire times"""
+    
+    def __init__(self, state_path: Optional[str] = DEFAULT_STATE_PATH,
+                 lock: Optional[Callable[[], ContextManager]] = None, recheck: float = 60.0):
+        self.state_path = Path(state_path) if state_path else None
+        self.lock = lock  # Set when the state file is shared by consumer-group members
+        self.recheck = recheck
+        self.schedules: Dict[str, Schedule] = {}
+        self._heap: List = []  # (next_fire, seq, name); stale entries skipped lazily
+        self._seq = 0
+        self._state = self._load_state()
+        self.stats = {"fired": 0, "late": 0, "skipped": 0}
+    
+    def _load_state(self) -> Dict[str, Dict]:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable scheduler state {self.state_path}: {e}")
+            return {}
+    
+    def flush(self):
+        """Atomically persist next-fire times, merged with other members' when shared"""
+        if not self.state_path:
+            return
+        state = {
+            name: {
+                "next_fire": schedule.next_fire if schedule.pending_since is None else schedule.pending_since,
+                "definition": schedule.definition_hash
+            }
+            for name, schedule in self.schedules.items()
+        }
+        if self.lock is None:
+            self._write_state(state)
+            return
+        
+        with self.lock():
+            merged = self._load_state()
+            for name, entry in state.items():
+                # The later next-fire time has seen more firings
+                theirs = merged.get(name)
+                if (not theirs or theirs.get("definition") != entry["definition"]
+                        or theirs.get("next_fire", 0) < entry["next_fire"]):
+                    merged[name] = entry
+            self._write_state(merged)
+    
+    def _write_state(self, state: Dict[str, Dict]):
+        self._state = state
+        tmp_path = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+    
+    def _fired_elsewhere(self, schedule: Schedule, due_at: float) -> Optional[float]:
+        """Next-fire time another member saved after firing the run due at `due_at`"""
+        saved = self._state.get(schedule.name)
+        if saved and saved.get("definition") == schedule.definition_hash and saved["next_fire"] > due_at:
+            return saved["next_fire"]
+        return None
+    
+    def _push(self, schedule: Schedule):
+        self._seq += 1
+        heapq.heappush(self._heap, (schedule.next_fire, self._seq, schedule.name))
+    
+    def add(self, schedule: Schedule, now: Optional[float] = None):
+        """Add or replace a schedule, resuming its persisted next-fire time"""
+        now = now or time.time()
+        saved = self._state.get(schedule.name)
+        if saved and saved.get("definition") == schedule.definition_hash:
+            # May be in the past: a run missed while we were down fires once, late
+            schedule.next_fire = saved["next_fire"]
+        elif schedule.cron:
+            schedule.next_fire = schedule.following(now, now)
+        else:
+            schedule.next_fire = now + schedule.interval
+        self.schedules[schedule.name] = schedule
+        self._push(schedule)
+    
+    def remove(self, name: str):
+        """Drop a schedule; its heap entry is discarded when it reaches the top"""
+        self.schedules.pop(name, None)
+    
+    def load(self, path: str) -> int:
+        """Add every schedule defined in a JSON schedule file"""
+        with open(path, "r") as f:
+            schedules = schedules_from_definitions(json.load(f))
+        now = time.time()
+        for schedule in schedules:
+            self.add(schedule, now)
+        self.flush()
+        return len(schedules)
+    
+    def seconds_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        """Time until the earliest live schedule is due, or None if there are none"""
+        while self._heap:
+            next_fire, _, name = self._heap[0]
+            schedule = self.schedules.get(name)
+            if schedule is not None and schedule.next_fire == next_fire:
+                return max(0.0, next_fire - (now or time.time()))
+            heapq.heappop(self._heap)
+        return None
+    
+    def due(self, accept: Optional[Callable[[Schedule], bool]] = None) -> List[Dict]:
+        """Pop every due schedule, advance it, and return the events to process
+        
+        `accept` lets a consumer-group member fire only the schedules whose
+        repository partition it owns; the others advance without firing.
+        """
+        now = time.time()
+        events = []
+        advanced = False
+        if self.lock and self.seconds_until_next(now) == 0.0:
+            with self.lock():
+                self._state = self._load_state()
+        
+        while self.seconds_until_next(now) == 0.0:
+            _, _, name = heapq.heappop(self._heap)
+            schedule = self.schedules[name]
+            fired_at = schedule.next_fire if schedule.pending_since is None else schedule.pending_since
+            
+            if self.lock:
+                fired_elsewhere = self._fired_elsewhere(schedule, fired_at)
+                if fired_elsewhere is not None:
+                    schedule.next_fire, schedule.pending_since = fired_elsewhere, None
+                    self._push(schedule)
+                    continue
+            
+            if accept and not accept(schedule):
+                if schedule.pending_since is None:
+                    self.stats["skipped"] += 1
+                if self.lock:
+                    # Not ours: look again until the owner (or its successor) has fired it
+                    schedule.pending_since = fired_at
+                    schedule.next_fire = now + self.recheck
+                else:
+                    schedule.next_fire = schedule.following(fired_at, now)
+                    advanced = True
+                self._push(schedule)
+                continue
+            
+            schedule.pending_since = None
+            schedule.next_fire = schedule.following(fired_at, now)
+            self._push(schedule)
+            advanced = True
+            
+            late_by = now - fired_at
+            # Less than one polling period late is on time
+            if late_by > 60:
+                self.stats["late"] += 1
+            self.stats["fired"] += 1
+            data = dict(schedule.data)
+            data.update({
+                "schedule": schedule.name,
+                "scheduled_for": datetime.fromtimestamp(fired_at).isoformat(),
+                "late_by": round(late_by, 1),
+                "repository": schedule.repository,
+                "agent": schedule.agent
+            })
+            events.append(create_event(schedule.event_type, data, source="scheduler").to_dict())
+        
+        if advanced:
+            # Persist before dispatch: a crash now may lose a firing, never repeat one
+            self.flush()
+        return events
+    
+    def upcoming(self, limit: int = 10) -> List[Dict]:
+        """Next `limit` firings, soonest first"""
+        soonest = heapq.nsmallest(limit, self.schedules.values(), key=lambda s: s.next_fire)
+        return [
+            {
+                "name": s.name,
+                "event": s.event_type.value,
+                "next_fire": datetime.fromtimestamp(s.next_fire).isoformat(timespec="seconds"),
+                "agent": s.agent,
+                "repository": s.repository
+            }
+            for s in soonest
+        ]
+    
+    def metrics(self) -> Dict:
+        """Counters for /metrics"""
+        return {"schedules": len(self.schedules), **self.stats}
+
+
+def add_scheduler_arguments(parser):
+    """Register scheduler command-line flags"""
+    parser.add_argument("--schedules", default=None,
+                        help="JSON schedule file (default: <repo>/.ai/schedules.json if present)")
+    parser.add_argument("--schedule-state", default=DEFAULT_STATE_PATH,
+                        help=f"Persisted next-fire times (default: {DEFAULT_STATE_PATH}; "
+                             f"consumer-group members share one in the group directory)")
+
+
+def scheduler_from_args(args, repo_path: str, consumer_group=None) -> Optional[Scheduler]:
+    """Build a Scheduler when a schedule file is given or found in the repository
+    
+    Consumer-group members keep the default state in the group directory,
+    shared with the other members, unless --schedule-state says otherwise.
+    """
+    path = args.schedules or str(Path(repo_path) / ".ai" / "schedules.json")
+    if not os.path.exists(path):
+        if args.schedules:
+            print(f"⚠️  Schedule file not found: {path}")
+        return None
+    if consumer_group and args.schedule_state == DEFAULT_STATE_PATH:
+        scheduler = Scheduler(str(consumer_group.dir / "scheduler-state.json"),
+                              lock=consumer_group.locked, recheck=consumer_group.lease_ttl)
+    else:
+        scheduler = Scheduler(args.schedule_state)
+    count = scheduler.load(path)
+    print(f"⏰ Loaded {count} schedules from {path}")
+    return scheduler
+
+
+def main():
+    """Print the next firings of a schedule file"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Scheduler")
+    parser.add_argument("schedules", help="JSON schedule file")
+    parser.add_argument("--state", default=None,
+                        help="Scheduler state to resume from (default: none, compute from now)")
+    parser.add_argument("--next", type=int, default=10, help="Number of firings to show (default: 10)")
+    
+    args = parser.parse_args()
+    
+    scheduler = Scheduler(args.state)
+    scheduler.state_path = None  # Read-only view
+    scheduler.load(args.schedules)
+    print(json.dumps(scheduler.upcoming(args.next), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+AADF Automation Supervisor
+Runs git watchers, the orchestrator and the metrics server in one process
+with readiness signalling, health checks, restart backoff and graceful drain
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_detection.async_git_watcher import AsyncGitWatcher
+from event_detection.churn_index import DEFAULT_INDEX_DIR, add_churn_index_arguments, churn_index_for
+from event_detection.watcher_checkpoint import DEFAULT_CHECKPOINT_DIR, add_checkpoint_arguments, checkpoint_for
+from event_detection.path_filter import load_path_filter, add_path_filter_arguments
+from event_detection.poll_schedule import PollSchedule, add_poll_schedule_arguments, poll_schedule_from_args
+from event_detection.analysis_cache import AnalysisCache, add_analysis_cache_arguments, analysis_cache_from_args
+from event_detection.webhook_ingest import WebhookIngest, PROVIDERS, SECRET_ENV
+from event_detection.build_watcher import BuildArtifactWatcher, FailureTracker
+from orchestration.scheduler import Scheduler, add_scheduler_arguments, scheduler_from_args
+from orchestration.event_log import EventRecorder, add_recording_arguments, recorder_from_args
+from orchestration.batcher import BatchConfig, add_batching_arguments, batch_config_from_args
+from orchestration.orchestrator import TaskOrchestrator
+from orchestration.budget import BudgetConfig, add_budget_arguments, budget_config_from_args
+from monitoring.metrics_server import MetricsServer
+from monitoring.timeseries import TimeSeriesStore
+from monitoring.status import (
+    AgentStateIndex, repository_status, orchestrator_status, agent_status, pattern_totals, status_document
+)
+from monitoring.dashboard import TREND_METRICS, acceleration
+from monitoring.profiler import TIMERS
+
+
+class ManagedComponent:
+    """A long-running coroutine the supervisor keeps alive"""
+    
+    def __init__(self, name: str, factory: Callable[[], Any],
+                 run: Callable[[Any], Awaitable], stop: Callable[[Any], Awaitable],
+                 stale_after: float):
+        self.name = name
+        self.factory = factory
+        self.run = run
+        self.stop = stop
+        self.stale_after = stale_after
+        
+        self.instance: Any = None
+        self.task: Optional[asyncio.Task] = None
+        self.state = "stopped"
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = 0.0
+        self.restart_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+    
+    @property
+    def ready(self) -> bool:
+        """Component has finished starting and entered its main loop"""
+        return self.instance is not None and getattr(self.instance, "running", False)
+    
+    @property
+    def heartbeat_age(self) -> float:
+        """Seconds since the component's loop last ticked"""
+        heartbeat = getattr(self.instance, "last_heartbeat", 0.0) if self.instance else 0.0
+        return time.time() - heartbeat if heartbeat else float("inf")
+    
+    def launch(self):
+        """Create a fresh instance and schedule its main coroutine"""
+        self.instance = self.factory()
+        self.task = asyncio.ensure_future(self.run(self.instance))
+        self.state = "starting"
+        self.started_at = time.time()
+        self.restart_at = None
+    
+    def status(self) -> Dict[str, Any]:
+        """Health summary for this component"""
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "restarts": self.restarts,
+            "uptime": round(time.time() - self.started_at, 1) if self.task else 0.0,
+            "heartbeat_age": round(self.heartbeat_age, 1) if self.ready else None,
+            "last_error": self.last_error
+        }
+
+
+class Supervisor:
+    """Single-process supervisor for the automation components"""
+    
+    MIN_BACKOFF = 1.0
+    MAX_BACKOFF = 60.0
+    STABLE_AFTER = 60.0  # Seconds of uptime that reset the restart backoff
+    
+    def __init__(self, repos: List[str], repo_path: str = ".", poll_interval: int = 10,
+                 host: str = "127.0.0.1", port: int = 8080,
+                 ready_file: Optional[str] = None, pid_file: Optional[str] = None,
+                 ready_timeout: float = 30.0, health_interval: float = 1.0,
+                 drain_timeout: float = 30.0, analysis_workers: int = 0,
+                 budget_config: Optional[BudgetConfig] = None,
+                 churn_index_dir: Optional[str] = DEFAULT_INDEX_DIR, churn_backfill: int = 5000,
+                 checkpoint_dir: Optional[str] = DEFAULT_CHECKPOINT_DIR, catchup_batch: int = 200,
+                 webhooks: bool = False, allow_unsigned_webhooks: bool = False,
+                 build_dirs: Optional[List[str]] = None, scheduler: Optional[Scheduler] = None,
+                 recorder: Optional[EventRecorder] = None, batch_config: Optional[BatchConfig] = None,
+                 include_paths: Optional[List[str]] = None, exclude_paths: Optional[List[str]] = None,
+                 poll_schedule: Optional[PollSchedule] = None,
+                 metrics_store: Optional[TimeSeriesStore] = None,
+                 analysis_cache: Optional[AnalysisCache] = None):
+        self.repos = repos
+        self.repo_path = repo_path
+        self.poll_interval = poll_interval
+        self.ready_file = Path(ready_file) if ready_file else None
+        self.pid_file = Path(pid_file) if pid_file else None
+        self.ready_timeout = ready_timeout
+        self.health_interval = health_interval
+        self.drain_timeout = drain_timeout
+        self.budget_config = budget_config
+        self.churn_index_dir = churn_index_dir
+        self.churn_backfill = churn_backfill
+        self.checkpoint_dir = checkpoint_dir
+        self.catchup_batch = catchup_batch
+        self.include_paths = include_paths or []
+        self.exclude_paths = exclude_paths or []
+        self.poll_schedule = poll_schedule  # Shared by every watcher; outlives restarts
+        self.metrics_store = metrics_store  # mmap-shared trends for the dashboard
+        self.analysis_cache = analysis_cache  # Shared by every watcher; outlives restarts
+        self.allow_unsigned_webhooks = allow_unsigned_webhooks
+        self.build_dirs = build_dirs or []
+        self.scheduler = scheduler  # Owned here so restarts keep next-fire times in memory
+        self.recorder = recorder
+        self.batch_config = batch_config
+        
+        # One analysis pool shared by every watcher, so a huge commit in one
+        # repository occupies a worker instead of the event loop
+        self.analysis_pool = ProcessPoolExecutor(max_workers=analysis_workers) if analysis_workers > 0 else None
+        
+        self.metrics_server = MetricsServer(host, port)
+        self.metrics_server.add_route("/health", self.health)
+        self.metrics_server.add_route("/metrics", self.metrics)
+        self.metrics_server.add_route("/status", self.status)
+        
+        # Session state written by agents; re-read only when a file changes
+        self.agent_states = AgentStateIndex(Path(repo_path) / ".ai" / "agents")
+        
+        self.orchestrator = ManagedComponent(
+            "orchestrator",
+            factory=self._build_orchestrator,
+            run=lambda orchestrator: orchestrator.autonomous_loop(),
+            stop=lambda orchestrator: orchestrator.stop(),
+            stale_after=30.0
+        )
+        self.watchers = [
+            ManagedComponent(
+                f"git-watcher:{repo}",
+                factory=lambda repo=repo: self._build_watcher(repo),
+                run=lambda watcher: watcher.start(),
+                stop=self._stop_watcher,
+                stale_after=max(poll_interval * 3, 30.0)
+            )
+            for repo in repos
+        ]
+        
+        # Optional push ingest, served on the metrics port under /webhooks/<provider>
+        self.webhooks = None
+        if webhooks:
+            self.webhooks = ManagedComponent(
+                "webhook-ingest",
+                factory=self._build_ingest,
+                run=lambda ingest: ingest.run(),
+                stop=self._stop_ingest,
+                stale_after=30.0
+            )
+            for provider in PROVIDERS:
+                self.metrics_server.add_route(
+                    f"/webhooks/{provider}",
+                    lambda headers, body, provider=provider: self._receive_webhook(provider, headers, body),
+                    method="POST"
+                )
+        
+        # Optional CI artifact watcher; the failure history outlives restarts
+        self.build_watcher = None
+        if self.build_dirs:
+            self.failure_tracker = FailureTracker()
+            self.build_watcher = ManagedComponent(
+                "build-watcher",
+                factory=lambda: BuildArtifactWatcher(self.build_dirs, repo_path, poll_interval,
+                                                     event_sink=self._route_event,
+                                                     tracker=self.failure_tracker),
+                run=lambda watcher: watcher.start(),
+                stop=self._stop_build_watcher,
+                stale_after=max(poll_interval * 3, 120.0)
+            )
+        
+        # Producers are stopped (and flushed) before the orchestrator drains
+        self.producers = self.watchers + [c for c in (self.webhooks, self.build_watcher) if c]
+        self.components = [self.orchestrator] + self.producers
+        
+        self._shutdown: Optional[asyncio.Event] = None
+    
+    def _build_orchestrator(self) -> TaskOrchestrator:
+        """Create an orchestrator, carrying over events queued in a crashed instance"""
+        orchestrator = TaskOrchestrator(self.repo_path, self.budget_config, scheduler=self.scheduler,
+                                        batch_config=self.batch_config)
+        orchestrator.recorder = self.recorder
+        previous = self.orchestrator.instance
+        if previous is not None:
+            orchestrator.event_queue = previous.event_queue
+            orchestrator.automation_metrics = previous.automation_metrics
+            orchestrator.budget = previous.budget
+            orchestrator.deferred_tasks = previous.deferred_tasks
+            orchestrator.batcher = previous.batcher
+            orchestrator.result_cache = previous.result_cache
+        return orchestrator
+    
+    def _build_watcher(self, repo: str) -> AsyncGitWatcher:
+        """Create a watcher; its churn index and checkpoint are reloaded from disk on restart"""
+        return AsyncGitWatcher(
+            repo, self.poll_interval, event_sink=self._route_event,
+            analysis_pool=self.analysis_pool,
+            churn_index=churn_index_for(repo, self.churn_index_dir, self.churn_backfill),
+            checkpoint=checkpoint_for(repo, self.checkpoint_dir),
+            catchup_batch=self.catchup_batch,
+            path_filter=load_path_filter(repo, self.include_paths, self.exclude_paths),
+            poll_schedule=self.poll_schedule,
+            analysis_cache=self.analysis_cache
+        )
+    
+    def _build_ingest(self) -> WebhookIngest:
+        """Create the webhook ingest, carrying over events queued in a crashed instance"""
+        ingest = WebhookIngest(self._route_event, allow_unsigned=self.allow_unsigned_webhooks)
+        previous = self.webhooks.instance
+        if previous is not None:
+            ingest.queue = previous.queue
+            ingest.stats = previous.stats
+            ingest.recent_deliveries = previous.recent_deliveries
+        return ingest
+    
+    async def _receive_webhook(self, provider: str, headers: Dict, body: bytes):
+        """POST /webhooks/<provider>; survives ingest restarts"""
+        ingest = self.webhooks.instance
+        if ingest is None:
+            return 503, {"error": "webhook ingest not started"}
+        return await ingest.receive(provider, headers, body)
+    
+    async def _stop_ingest(self, ingest: WebhookIngest):
+        """Stop accepting webhooks and deliver what is already queued"""
+        ingest.stop()
+        await ingest.flush()
+    
+    async def _stop_build_watcher(self, watcher: BuildArtifactWatcher):
+        """Stop the build watcher, deliver its queued events and save failure history"""
+        watcher.stop()
+        await watcher.process_events()
+        watcher.tracker.flush()
+    
+    async def _route_event(self, event_data: Dict):
+        """Event sink shared by all watchers; survives orchestrator restarts"""
+        await self.orchestrator.instance.submit_event(event_data)
+    
+    async def _stop_watcher(self, watcher: AsyncGitWatcher):
+        """Stop a watcher and flush events it has already detected"""
+        watcher.stop()
+        await watcher.process_events()
+        if watcher.churn_index is not None:
+            watcher.churn_index.flush()
+        watcher.save_checkpoint()
+    
+    def health(self):
+        """(status, body) for GET /health"""
+        components = {c.name: c.status() for c in self.components}
+        healthy = all(c.state == "running" for c in self.components)
+        return (200 if healthy else 503), {
+            "status": "ok" if healthy else "degraded",
+            "pid": os.getpid(),
+            "components": components
+        }
+    
+    def metrics(self):
+        """(status, body) for GET /metrics"""
+        orchestrator = self.orchestrator.instance
+        return 200, {
+            "automation": orchestrator.automation_metrics if orchestrator else {},
+            "queued_events": len(orchestrator.event_queue) if orchestrator else 0,
+            "agents": orchestrator.agent_registry.load() if orchestrator else {},
+            "budget": orchestrator.budget.metrics() if orchestrator else {},
+            "result_cache": orchestrator.result_cache.metrics() if orchestrator else {},
+            "scheduler": self.scheduler.metrics() if self.scheduler else {},
+            "batching": orchestrator.batcher.metrics() if orchestrator and orchestrator.batcher else {},
+            "webhooks": self.webhooks.instance.metrics() if self.webhooks and self.webhooks.instance else {},
+            "path_filter": {
+                str(c.instance.repo_path): c.instance.filter_stats for c in self.watchers if c.instance
+            },
+            "poll_schedule": self.poll_schedule.snapshot() if self.poll_schedule else {},
+            "analysis_cache": self.analysis_cache.metrics() if self.analysis_cache else {},
+            "builds": self.build_watcher.instance.stats if self.build_watcher and self.build_watcher.instance else {},
+            "restarts": {c.name: c.restarts for c in self.components},
+            "timers": TIMERS.snapshot()
+        }
+    
+    def status(self):
+        """(status, body) for GET /status: the whole fleet from in-memory state"""
+        started = time.perf_counter()
+        now = time.time()
+        orchestrator = self.orchestrator.instance
+        
+        repositories = {}
+        for component in self.watchers:
+            entry = {"state": component.state, "restarts": component.restarts}
+            if component.instance is not None:
+                entry.update(repository_status(component.instance, now))
+            repositories[component.name.split(":", 1)[1]] = entry
+        
+        pattern_stores = [c.instance.pattern_store for c in self.watchers if c.instance]
+        if orchestrator:
+            pattern_stores.append(orchestrator.pattern_store)
+        
+        return 200, status_document(
+            repositories,
+            orchestrator_status(orchestrator, now) if orchestrator else None,
+            agent_status(orchestrator.agent_registry if orchestrator else None, self.agent_states),
+            pattern_totals(pattern_stores),
+            started
+        )
+    
+    async def _wait_until_ready(self) -> bool:
+        """Wait for every component to report ready, or time out"""
+        deadline = time.time() + self.ready_timeout
+        while time.time() < deadline:
+            for component in self.components:
+                if component.state == "starting" and component.ready:
+                    component.state = "running"
+            if all(c.state == "running" for c in self.components):
+                return True
+            if any(c.task.done() for c in self.components):
+                return False
+            await asyncio.sleep(0.05)
+        return False
+    
+    def _schedule_restart(self, component: ManagedComponent, reason: str):
+        """Mark a component failed and schedule a restart with exponential backoff"""
+        if time.time() - component.started_at >= self.STABLE_AFTER:
+            component.backoff = 0.0
+        component.backoff = min(max(component.backoff * 2, self.MIN_BACKOFF), self.MAX_BACKOFF)
+        component.state = "backoff"
+        component.last_error = reason
+        component.restart_at = time.time() + component.backoff
+        print(f"⚠️  {component.name} failed ({reason}); restarting in {component.backoff:.0f}s")
+    
+    def _check_health(self):
+        """Detect crashed or hung components and restart them when due"""
+        now = time.time()
+        for component in self.components:
+            if component.state == "backoff":
+                if now >= component.restart_at:
+                    component.restarts += 1
+                    component.launch()
+                continue
+            
+            if component.state == "starting" and component.ready:
+                component.state = "running"
+            
+            if component.task.done():
+                error = None if component.task.cancelled() else component.task.exception()
+                self._schedule_restart(component, repr(error) if error else "exited")
+            elif component.state == "running" and component.heartbeat_age > component.stale_after:
+                component.task.cancel()
+                self._schedule_restart(component, f"no heartbeat for {component.heartbeat_age:.0f}s")
+    
+    def _record_metrics(self):
+        """Sample orchestrator metrics into the shared time series store"""
+        orchestrator = self.orchestrator.instance
+        if self.metrics_store is None or orchestrator is None:
+            return
+        metrics = orchestrator.automation_metrics
+        for name in TREND_METRICS:
+            self.metrics_store.record(name, metrics.get(name, 0))
+        self.metrics_store.record("acceleration", acceleration(metrics["average_response_time"]))
+        self.metrics_store.record("queued_events", len(orchestrator.event_queue))
+    
+    def _request_shutdown(self):
+        """Signal handler: begin graceful drain"""
+        if not self._shutdown.is_set():
+            print("\n🛑 Shutdown requested, draining...")
+            self._shutdown.set()
+    
+    async def run(self):
+        """Start all components, supervise them, then drain on shutdown"""
+        self._shutdown = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self._request_shutdown)
+        
+        if self.pid_file:
+            self.pid_file.write_text(str(os.getpid()))
+        
+        start = time.time()
+        await self.metrics_server.start()
+        for component in self.components:
+            component.launch()
+        
+        if await self._wait_until_ready():
+            print(f"✅ All components ready in {time.time() - start:.2f}s")
+            if self.ready_file:
+                self.ready_file.write_text(str(os.getpid()))
+        else:
+            print("⚠️  Not all components became ready; continuing under supervision")
+        
+        try:
+            while not self._shutdown.is_set():
+                self._check_health()
+                self._record_metrics()
+                try:
+                    await asyncio.wait_for(self._shutdown.wait(), timeout=self.health_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.drain()
+    
+    async def drain(self):
+        """Stop producers first, then let the orchestrator finish queued work"""
+        if self.ready_file and self.ready_file.exists():
+            self.ready_file.unlink()
+        
+        for producer in self.producers:
+            if producer.instance is not None:
+                await producer.stop(producer.instance)
+            if producer.task and not producer.task.done():
+                producer.task.cancel()
+            producer.state = "stopped"
+        
+        orchestrator = self.orchestrator.instance
+        if orchestrator is not None:
+            orchestrator.request_stop()
+            try:
+                if self.orchestrator.task and not self.orchestrator.task.done():
+                    await asyncio.wait_for(self.orchestrator.task, timeout=self.drain_timeout)
+                await asyncio.wait_for(orchestrator.drain(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️  Drain timed out with {len(orchestrator.event_queue)} events queued")
+            # Only now flush: dispatches made while draining reach the result cache
+            # and still-deferred tasks are saved for the next run
+            await orchestrator.stop()
+            self.orchestrator.state = "stopped"
+        
+        await self.metrics_server.stop()
+        if self.metrics_store:
+            self._record_metrics()
+            self.metrics_store.close()
+        if self.analysis_pool:
+            self.analysis_pool.shutdown()
+        if self.pid_file and self.pid_file.exists():
+            self.pid_file.unlink()
+        print("✅ Supervisor stopped")
+
+
+async def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AADF Automation Supervisor")
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Path to repository for the orchestrator (default: current directory)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="append",
+        default=None,
+        help="Repository to watch; repeat for several (default: --repo)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=10,
+        help="Git polling interval in seconds (default: 10)"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Metrics server bind address (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Metrics server port (default: 8080)"
+    )
+    parser.add_argument(
+        "--ready-file",
+        default=None,
+        help="Written once every component is ready, removed on shutdown"
+    )
+    parser.add_argument(
+        "--pid-file",
+        default=None,
+        help="Write the supervisor PID here for the stop script"
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for every component to become ready (default: 30)"
+    )
+    parser.add_argument(
+        "--analysis-workers",
+        type=int,
+        default=0,
+        help="Process pool size for commit analysis (default: 0, inline)"
+    )
+    parser.add_argument(
+        "--webhooks",
+        action="store_true",
+        help="Accept PR, issue and CI webhooks on POST /webhooks/{github,gitlab,ci} "
+             f"(secrets from {', '.join(SECRET_ENV.values())})"
+    )
+    parser.add_argument(
+        "--allow-unsigned-webhooks",
+        action="store_true",
+        help="Accept webhooks for providers without a configured secret"
+    )
+    parser.add_argument(
+        "--metrics-store",
+        default=None,
+        help="Record metric trends to this mmap file for `dashboard.py --attach`"
+    )
+    parser.add_argument(
+        "--build-dir",
+        action="append",
+        help="Watch this directory for CI logs and JUnit XML reports (repeatable)"
+    )
+    add_budget_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_recording_arguments(parser)
+    add_batching_arguments(parser)
+    add_churn_index_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_path_filter_arguments(parser)
+    add_poll_schedule_arguments(parser)
+    add_analysis_cache_arguments(parser)
+    
+    args = parser.parse_args()
+    
+    supervisor = Supervisor(
+        repos=args.watch or [args.repo],
+        repo_path=args.repo,
+        poll_interval=args.interval,
+        host=args.host,
+        port=args.port,
+        ready_file=args.ready_file,
+        pid_file=args.pid_file,
+        ready_timeout=args.ready_timeout,
+        analysis_workers=args.analysis_workers,
+        budget_config=budget_config_from_args(args),
+        churn_index_dir=args.churn_index_dir,
+        churn_backfill=args.churn_backfill,
+        checkpoint_dir=args.checkpoint_dir,
+        catchup_batch=args.catchup_batch,
+        webhooks=args.webhooks,
+        allow_unsigned_webhooks=args.allow_unsigned_webhooks,
+        build_dirs=args.build_dir,
+        scheduler=scheduler_from_args(args, args.repo),
+        recorder=recorder_from_args(args),
+        batch_config=batch_config_from_args(args),
+        include_paths=args.include_path,
+        exclude_paths=args.exclude_path,
+        poll_schedule=poll_schedule_from_args(args),
+        metrics_store=TimeSeriesStore(args.metrics_store) if args.metrics_store else None,
+        analysis_cache=analysis_cache_from_args(args)
+    )
+    await supervisor.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
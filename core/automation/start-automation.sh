@@ -11,48 +11,64 @@ echo "✓ Python version: $python_version"
 # Set up environment
 export PYTHONPATH="${PYTHONPATH}:$(pwd)"
 
-# Create necessary directories
-mkdir -p /tmp/aadf-events
-echo "✓ Event directory created"
-
-# Function to start component in background
-start_component() {
-    local name=$1
-    local script=$2
-    
-    echo -n "Starting $name... "
-    python3 $script > /tmp/aadf-$name.log 2>&1 &
-    echo $! > /tmp/aadf-$name.pid
-    echo "✓ (PID: $(cat /tmp/aadf-$name.pid))"
-}
-
-# Start components
-echo ""
-echo "Starting automation components:"
-echo "------------------------------"
+PID_FILE=/tmp/aadf-supervisor.pid
+READY_FILE=/tmp/aadf-supervisor.ready
+LOG_FILE=/tmp/aadf-supervisor.log
+READY_TIMEOUT=${AADF_READY_TIMEOUT:-30}
 
-# Start Git Watcher
-start_component "git-watcher" "event_detection/git_watcher.py"
+if [ -f "$PID_FILE" ] && kill -0 "$(cat "$PID_FILE")" 2>/dev/null; then
+    echo "Supervisor already running (PID: $(cat "$PID_FILE"))"
+    exit 0
+fi
+rm -f "$READY_FILE"
 
-# Wait a moment
-sleep 2
+# Watcher, orchestrator and metrics server run in one supervised process
+echo ""
+echo -n "Starting supervisor... "
+python3 orchestration/supervisor.py \
+    --ready-file "$READY_FILE" \
+    --pid-file "$PID_FILE" \
+    --ready-timeout "$READY_TIMEOUT" \
+    "$@" > "$LOG_FILE" 2>&1 &
+supervisor_pid=$!
 
-# Start Orchestrator
-start_component "orchestrator" "orchestration/orchestrator.py"
+# Wait for readiness instead of fixed sleeps, a little longer than the
+# supervisor's own readiness timeout
+for _ in $(seq 1 $(( (READY_TIMEOUT + 5) * 10 ))); do
+    if [ -f "$READY_FILE" ]; then
+        break
+    fi
+    if ! kill -0 "$supervisor_pid" 2>/dev/null; then
+        echo "✗ supervisor exited during startup, see $LOG_FILE"
+        exit 1
+    fi
+    sleep 0.1
+done
 
-# Wait for components to initialize
-sleep 2
+if [ ! -f "$READY_FILE" ]; then
+    echo "✗ not ready after ${READY_TIMEOUT}s, stopping it; see $LOG_FILE"
+    kill -TERM "$supervisor_pid" 2>/dev/null
+    for _ in $(seq 1 100); do
+        kill -0 "$supervisor_pid" 2>/dev/null || break
+        sleep 0.1
+    done
+    kill -KILL "$supervisor_pid" 2>/dev/null
+    rm -f "$PID_FILE"
+    exit 1
+fi
+echo "✓ (PID: $supervisor_pid)"
 
 echo ""
 echo "✅ All components started!"
 echo ""
 echo "To monitor the system:"
 echo "  python3 monitoring/dashboard.py"
+echo "  curl http://127.0.0.1:8080/health"
+echo "  python3 monitoring/status.py    # JSON status for monitoring"
 echo ""
 echo "To stop all components:"
 echo "  ./stop-automation.sh"
 echo ""
-echo "Component logs:"
-echo "  tail -f /tmp/aadf-git-watcher.log"
-echo "  tail -f /tmp/aadf-orchestrator.log"
-echo ""
\ No newline at end of file
+echo "Supervisor log:"
+echo "  tail -f $LOG_FILE"
+echo ""
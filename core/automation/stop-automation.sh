@@ -4,25 +4,29 @@
 echo "🛑 Stopping AADF Automation System"
 echo "=================================="
 
-# Function to stop component
-stop_component() {
-    local name=$1
-    local pidfile="/tmp/aadf-$name.pid"
-    
-    if [ -f "$pidfile" ]; then
-        pid=$(cat "$pidfile")
-        echo -n "Stopping $name (PID: $pid)... "
-        kill $pid 2>/dev/null
-        rm -f "$pidfile"
-        echo "✓"
+PID_FILE=/tmp/aadf-supervisor.pid
+
+if [ -f "$PID_FILE" ]; then
+    pid=$(cat "$PID_FILE")
+    echo -n "Draining supervisor (PID: $pid)... "
+    kill -TERM "$pid" 2>/dev/null
+
+    # The supervisor removes its PID file once queued events are drained
+    for _ in $(seq 1 350); do
+        kill -0 "$pid" 2>/dev/null || break
+        sleep 0.1
+    done
+
+    if kill -0 "$pid" 2>/dev/null; then
+        echo "timed out, killing"
+        kill -KILL "$pid" 2>/dev/null
     else
-        echo "$name: Not running"
+        echo "✓"
     fi
-}
-
-# Stop components
-stop_component "git-watcher"
-stop_component "orchestrator"
+    rm -f "$PID_FILE"
+else
+    echo "supervisor: Not running"
+fi
 
 # Clean up event files
 echo -n "Cleaning up event files... "
@@ -30,4 +34,4 @@ rm -f /tmp/aadf-event-*.json
 echo "✓"
 
 echo ""
-echo "✅ Automation system stopped"
\ No newline at end of file
+echo "✅ Automation system stopped"
@@ -0,0 +1,105 @@
+"""Streaming diff statistics, git failures and spill file retention"""
+
+import os
+import time
+import asyncio
+import subprocess
+
+import pytest
+
+from event_detection.async_git_watcher import AsyncGitWatcher
+from event_detection.commit_analysis import (
+    DiffStatAggregator, PayloadPolicy, prune_spill_dir, stream_diff_summary
+)
+
+MISSING_COMMIT = "0123456789" * 4
+
+
+def git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    for variable in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(variable, "Test")
+    for variable in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(variable, "test@example.test")
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    # diff-tree shows nothing for a root commit
+    (path / "README.md").write_text("test\n")
+    git(path, "add", ".")
+    git(path, "commit", "-q", "-m", "initial")
+    return path
+
+
+def commit_files(repo, count, message="change"):
+    for i in range(count):
+        (repo / f"file{i}.txt").write_text(f"{message} {i}\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+def test_summary_counts_files(repo):
+    head = commit_files(repo, 3)
+    summary = stream_diff_summary(str(repo), head, PayloadPolicy())
+    assert summary["total_files"] == 3
+    assert not summary["truncated"]
+
+
+def test_git_failure_raises_instead_of_empty_summary(repo):
+    commit_files(repo, 1)
+    with pytest.raises(RuntimeError, match="bad object"):
+        stream_diff_summary(str(repo), MISSING_COMMIT, PayloadPolicy())
+
+
+def test_async_git_failure_raises(repo):
+    commit_files(repo, 1)
+    watcher = AsyncGitWatcher(str(repo), 1)
+    
+    async def run():
+        watcher._semaphore = asyncio.Semaphore(1)
+        await watcher._stream_diff_summary(MISSING_COMMIT)
+    
+    with pytest.raises(RuntimeError, match="bad object"):
+        asyncio.run(run())
+
+
+def test_truncated_commit_spills_full_list(repo, tmp_path):
+    head = commit_files(repo, 5)
+    policy = PayloadPolicy(max_files=2, spill_dir=str(tmp_path / "spill"))
+    summary = stream_diff_summary(str(repo), head, policy)
+    
+    assert summary["truncated"]
+    assert len(summary["files_changed"]) == 2
+    with open(summary["full_file_list"]) as f:
+        assert len(f.readlines()) == 5
+
+
+def test_spill_files_are_expired_by_age_and_size(tmp_path):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    now = time.time()
+    for name, age in (("stale", 10 * 86400), ("old", 300), ("new", 0)):
+        path = spill_dir / f"{name}.numstat"
+        path.write_bytes(b"x" * 1024)
+        os.utime(path, (now - age, now - age))
+    
+    policy = PayloadPolicy(spill_dir=str(spill_dir), spill_max_age=86400, spill_max_mb=1.5 / 1024)
+    assert prune_spill_dir(policy) == 2
+    assert [path.name for path in spill_dir.iterdir()] == ["new.numstat"]
+
+
+def test_failed_diff_leaves_no_spill_file(tmp_path):
+    policy = PayloadPolicy(max_files=1, spill_dir=str(tmp_path / "spill"))
+    aggregator = DiffStatAggregator(policy, "abc")
+    for i in range(3):
+        aggregator.feed(f"1\t1\tfile{i}.txt")
+    assert aggregator.spill_path.exists()
+    
+    spill_path = aggregator.spill_path
+    aggregator.discard()
+    assert not spill_path.exists()
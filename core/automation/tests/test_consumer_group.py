@@ -0,0 +1,178 @@
+"""Consumer group members sharing one drop directory"""
+
+import json
+import time
+from collections import Counter
+
+import pytest
+
+from orchestration.consumer_group import ConsumerGroup
+from orchestration.orchestrator import TaskOrchestrator
+from orchestration.result_cache import PatchIdCache
+
+LEASE_TTL = 0.6
+
+
+@pytest.fixture
+def drop_dir(tmp_path):
+    path = tmp_path / "drop"
+    path.mkdir()
+    return path
+
+
+def make_member(tmp_path, drop_dir, member_id):
+    return ConsumerGroup("test", str(tmp_path / "group"), member_id=member_id,
+                         partitions=8, lease_ttl=LEASE_TTL, drop_dir=str(drop_dir))
+
+
+def drop_events(drop_dir, count):
+    for i in range(count):
+        with open(drop_dir / f"aadf-event-{i:03d}.json", "w") as f:
+            json.dump({"event_id": f"event-{i}", "data": {"repository": f"/repos/project-{i}"}}, f)
+
+
+def settle(members):
+    """Tick every member until leases have been handed over and taken up"""
+    for _ in range(2):
+        for member in members:
+            member.tick(force=True)
+
+
+def process(member, dispatched):
+    """One orchestrator loop iteration: claim, confirm, dispatch and ack"""
+    for event in member.claim_events():
+        if member.confirm(event):
+            dispatched[event["event_id"]] += 1
+            member.ack(event)
+
+
+def test_partitions_are_split_between_members(tmp_path, drop_dir):
+    members = [make_member(tmp_path, drop_dir, name) for name in ("a", "b", "c")]
+    settle(members)
+    
+    owned = [set(member.owned) for member in members]
+    assert all(owned)
+    assert set().union(*owned) == set(range(8))
+    assert sum(len(partitions) for partitions in owned) == 8
+
+
+def test_every_event_dispatched_once(tmp_path, drop_dir):
+    members = [make_member(tmp_path, drop_dir, name) for name in ("a", "b", "c")]
+    settle(members)
+    drop_events(drop_dir, 40)
+    
+    dispatched = Counter()
+    for member in members:
+        process(member, dispatched)
+    
+    assert dispatched == Counter({f"event-{i}": 1 for i in range(40)})
+    assert not list(drop_dir.glob("aadf-event-*.json"))
+
+
+def test_dead_member_events_are_recovered_without_double_dispatch(tmp_path, drop_dir):
+    a, b, c = (make_member(tmp_path, drop_dir, name) for name in ("a", "b", "c"))
+    settle([a, b, c])
+    drop_events(drop_dir, 40)
+    
+    # a dispatches half of its claims, then dies without leaving the group
+    dispatched = Counter()
+    claimed = a.claim_events()
+    assert claimed
+    for event in claimed[:len(claimed) // 2]:
+        assert a.confirm(event)
+        dispatched[event["event_id"]] += 1
+        a.ack(event)
+    unacked = claimed[len(claimed) // 2:]
+    
+    # Once a's heartbeat and leases expire, b and c rebalance and recover its claims
+    time.sleep(LEASE_TTL + 0.1)
+    settle([b, c])
+    assert set(b.owned) | set(c.owned) == set(range(8))
+    assert b.stats["recovered"] + c.stats["recovered"] == len(unacked)
+    for member in (b, c):
+        process(member, dispatched)
+    
+    # a comes back: its stale claims must not be dispatched a second time
+    for event in unacked:
+        assert not a.confirm(event)
+    
+    assert dispatched == Counter({f"event-{i}": 1 for i in range(40)})
+
+
+def test_claim_returned_when_partition_moves(tmp_path, drop_dir):
+    a = make_member(tmp_path, drop_dir, "a")
+    settle([a])
+    drop_events(drop_dir, 10)
+    claimed = a.claim_events()
+    assert len(claimed) == 10
+    
+    # b joins while a is busy; a hands over half its partitions on the next tick
+    b = make_member(tmp_path, drop_dir, "b")
+    settle([b, a, b])
+    
+    dispatched = Counter()
+    for event in claimed:
+        if a.confirm(event):
+            dispatched[event["event_id"]] += 1
+            a.ack(event)
+    assert a.stats["returned"] == 10 - len(dispatched)
+    assert a.stats["returned"] > 0
+    
+    process(b, dispatched)
+    assert dispatched == Counter({f"event-{i}": 1 for i in range(10)})
+
+
+def test_leave_hands_over_at_once(tmp_path, drop_dir):
+    a, b = make_member(tmp_path, drop_dir, "a"), make_member(tmp_path, drop_dir, "b")
+    settle([a, b])
+    drop_events(drop_dir, 20)
+    claimed = a.claim_events()
+    assert claimed
+    
+    a.leave()
+    assert len(list(drop_dir.glob("aadf-event-*.json"))) == 20
+    
+    # No lease expiry to wait for: b takes every partition on its next tick
+    settle([b])
+    assert set(b.owned) == set(range(8))
+    dispatched = Counter()
+    process(b, dispatched)
+    assert dispatched == Counter({f"event-{i}": 1 for i in range(20)})
+
+
+def test_result_cache_is_merged_across_members(tmp_path, drop_dir):
+    a, b = make_member(tmp_path, drop_dir, "a"), make_member(tmp_path, drop_dir, "b")
+    cache_a = PatchIdCache(str(a.dir / "result-cache.json"), lock=a.locked)
+    cache_b = PatchIdCache(str(b.dir / "result-cache.json"), lock=b.locked)
+    
+    cache_a.put("patch-1", "CODE_REVIEW", "cto", "c1")
+    cache_b.put("patch-2", "CODE_REVIEW", "cto", "c2")
+    cache_a.flush()
+    cache_b.flush()
+    cache_a.flush()
+    
+    # Neither flush overwrote the other, and each member sees both dispatches
+    for cache in (cache_a, cache_b):
+        assert cache.get("patch-1", "CODE_REVIEW") is not None
+        assert cache.get("patch-2", "CODE_REVIEW") is not None
+    assert PatchIdCache(str(a.dir / "result-cache.json")).get("patch-2", "CODE_REVIEW")
+
+
+def test_deferred_tasks_are_taken_over_once(tmp_path, drop_dir):
+    a, b = make_member(tmp_path, drop_dir, "a"), make_member(tmp_path, drop_dir, "b")
+    deferred_path = str(a.dir / "deferred-tasks.json")
+    
+    def orchestrator(member):
+        return TaskOrchestrator(str(tmp_path), result_cache=PatchIdCache(None),
+                                consumer_group=member, deferred_path=deferred_path)
+    
+    stopping_a, stopping_b = orchestrator(a), orchestrator(b)
+    stopping_a.deferred_tasks = [({"id": "task-a"}, 1.0)]
+    stopping_b.deferred_tasks = [({"id": "task-b"}, 2.0)]
+    stopping_a.save_deferred()
+    stopping_b.save_deferred()
+    
+    first, second = orchestrator(a), orchestrator(b)
+    second._load_deferred()
+    assert sorted(task["id"] for task, _ in first.deferred_tasks) == ["task-a", "task-b"]
+    assert second.deferred_tasks == []
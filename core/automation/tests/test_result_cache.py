@@ -0,0 +1,59 @@
+"""Patch-id dedup of identical changes across capable agents"""
+
+import asyncio
+
+from orchestration.batcher import TaskBatcher
+from orchestration.orchestrator import TaskOrchestrator
+from orchestration.result_cache import PatchIdCache
+
+
+def review_task(agent, commit, priority="MEDIUM"):
+    return {
+        "type": "CODE_REVIEW",
+        "agent": agent,
+        "priority": priority,
+        "patch_id": "patch-1",
+        "source_commit": commit,
+        "description": f"Review commit {commit}",
+        "data": {"commit_hash": commit}
+    }
+
+
+def test_entries_are_keyed_on_change_and_task_type(tmp_path):
+    path = str(tmp_path / "result-cache.json")
+    cache = PatchIdCache(path)
+    cache.put("patch-1", "CODE_REVIEW", "cto", "c1")
+    cache.flush()
+    
+    restored = PatchIdCache(path)
+    assert restored.get("patch-1", "CODE_REVIEW")["agent"] == "cto"
+    assert restored.get("patch-1", "PATTERN_EXTRACTION") is None
+    assert restored.get("patch-2", "CODE_REVIEW") is None
+
+
+def test_cherry_pick_routed_to_another_agent_is_not_dispatched_again(tmp_path):
+    orchestrator = TaskOrchestrator(str(tmp_path), result_cache=PatchIdCache(None), deferred_path=None)
+    orchestrator.result_cache.put("patch-1", "CODE_REVIEW", "cto", "c1")
+    
+    asyncio.run(orchestrator.execute_task(review_task("framework-architect", "c2")))
+    assert orchestrator.automation_metrics["tasks_deduplicated"] == 1
+    assert orchestrator.automation_metrics["messages_sent"] == 0
+
+
+def test_dispatch_records_the_change(tmp_path):
+    orchestrator = TaskOrchestrator(str(tmp_path), result_cache=PatchIdCache(None), deferred_path=None)
+    asyncio.run(orchestrator.execute_task(review_task("cto", "c1", priority="HIGH")))
+    assert orchestrator.result_cache.get("patch-1", "CODE_REVIEW")["commit_hash"] == "c1"
+
+
+def test_batched_task_absorbs_identical_change_for_another_agent():
+    batcher = TaskBatcher()
+    assert batcher.add(review_task("cto", "c1"), now=100.0) == []
+    
+    assert batcher.absorb(review_task("framework-architect", "c2", priority="HIGH"), now=100.0) == "cto"
+    [pending] = batcher.pending["cto"]
+    assert pending.task["priority"] == "HIGH"
+    assert "framework-architect" not in batcher.pending
+    
+    other = dict(review_task("cto", "c3"), patch_id="patch-2")
+    assert batcher.absorb(other) is None
@@ -0,0 +1,266 @@
+"""Webhook signature checks, dedup, back-pressure and provider mapping"""
+
+import hmac
+import json
+import asyncio
+import hashlib
+
+import pytest
+
+from event_detection.event_types import EventType, GitEvent, BuildEvent
+from event_detection.webhook_ingest import WebhookIngest
+from monitoring.metrics_server import MetricsServer
+
+SECRETS = {"github": "gh-secret", "gitlab": "gl-token", "ci": "ci-secret"}
+
+
+def sign(secret, body):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def receive(ingest, provider, headers, payload):
+    """Run one request through a started ingest; returns (status, response, queued events)"""
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    
+    async def run():
+        ingest.start_queue()
+        status, response = await ingest.receive(provider, headers, body)
+        queued = []
+        while not ingest.queue.empty():
+            queued.append(ingest.queue.get_nowait())
+        return status, response, queued
+    
+    return asyncio.run(run())
+
+
+def github(kind, payload, delivery=None, secret=SECRETS["github"]):
+    body = json.dumps(payload).encode()
+    headers = {"x-github-event": kind, "x-hub-signature-256": sign(secret, body)}
+    if delivery:
+        headers["x-github-delivery"] = delivery
+    return headers, body
+
+
+def gitlab(kind, payload, token=SECRETS["gitlab"]):
+    return {"x-gitlab-event": kind, "x-gitlab-token": token}, payload
+
+
+def ci(payload, secret=SECRETS["ci"]):
+    body = json.dumps(payload).encode()
+    return {"x-aadf-signature": sign(secret, body)}, body
+
+
+PULL_REQUEST = {
+    "head": {"ref": "feature", "sha": "abc123"},
+    "base": {"ref": "main"},
+    "user": {"login": "dev"},
+    "number": 7,
+    "title": "Add feature",
+    "html_url": "https://example.test/pr/7",
+    "merge_commit_sha": "def456"
+}
+
+
+@pytest.fixture
+def ingest():
+    return WebhookIngest(secrets=dict(SECRETS))
+
+
+# Signatures
+
+def test_valid_github_signature_is_accepted(ingest):
+    status, response, queued = receive(ingest, "github", *github(
+        "pull_request", {"action": "opened", "pull_request": PULL_REQUEST}))
+    assert status == 202
+    assert response["accepted"] == 1
+    assert len(queued) == 1
+
+
+@pytest.mark.parametrize("provider, request_parts", [
+    ("github", github("pull_request", {"action": "opened", "pull_request": PULL_REQUEST}, secret="wrong")),
+    ("gitlab", gitlab("Issue Hook", {"object_attributes": {"action": "open", "iid": 1}}, token="wrong")),
+    ("ci", ci({"status": "failed"}, secret="wrong")),
+    ("ci", ({}, json.dumps({"status": "failed"}).encode())),
+])
+def test_bad_or_missing_signature_is_rejected(ingest, provider, request_parts):
+    status, _, queued = receive(ingest, provider, *request_parts)
+    assert status == 401
+    assert queued == []
+    assert ingest.stats["rejected"] == 1
+
+
+def test_body_tampered_after_signing_is_rejected(ingest):
+    headers, body = ci({"status": "failed", "build_id": 1})
+    status, _, _ = receive(ingest, "ci", headers, body.replace(b"1", b"2"))
+    assert status == 401
+
+
+def test_unsigned_provider_needs_opt_in():
+    payload = {"status": "failed"}
+    assert receive(WebhookIngest(secrets={}), "ci", {}, payload)[0] == 401
+    assert receive(WebhookIngest(secrets={}, allow_unsigned=True), "ci", {}, payload)[0] == 202
+
+
+# Dedup and back-pressure
+
+def test_redelivery_is_dropped(ingest):
+    request = github("pull_request", {"action": "opened", "pull_request": PULL_REQUEST}, delivery="d-1")
+    
+    async def run():
+        ingest.start_queue()
+        first = await ingest.receive("github", *request)
+        second = await ingest.receive("github", *request)
+        return first, second
+    
+    first, second = asyncio.run(run())
+    assert first[0] == 202
+    assert second == (200, {"duplicate": "d-1"})
+    assert ingest.queue.qsize() == 1
+    assert ingest.stats["duplicates"] == 1
+
+
+def test_full_queue_returns_429(ingest):
+    ingest.max_queue = 2
+    failures = [{"kind": "build", "status": "failed", "build_id": i} for i in range(3)]
+    status, response, queued = receive(ingest, "ci", *ci(failures))
+    assert status == 429
+    assert response["error"] == "ingest queue full"
+    assert queued == []
+    assert ingest.stats["dropped"] == 3
+
+
+def test_rejected_request_is_not_remembered_as_delivered(ingest):
+    """A 429'd delivery must be accepted when the sender retries it"""
+    ingest.max_queue = 0
+    request = github("pull_request", {"action": "opened", "pull_request": PULL_REQUEST}, delivery="d-2")
+    assert receive(ingest, "github", *request)[0] == 429
+    ingest.max_queue = 10
+    assert receive(ingest, "github", *request)[0] == 202
+
+
+def test_unstarted_ingest_returns_503(ingest):
+    status, _ = asyncio.run(ingest.receive("ci", *ci({"status": "failed"})))
+    assert status == 503
+
+
+# Provider mapping through create_event
+
+def test_github_pull_request_opened_and_merged(ingest):
+    _, _, [event] = receive(ingest, "github", *github(
+        "pull_request", {"action": "opened", "pull_request": PULL_REQUEST,
+                         "repository": {"full_name": "org/repo"}}))
+    assert event.event_type == EventType.PR_CREATED
+    assert isinstance(event, GitEvent)
+    assert (event.repository, event.branch, event.commit_hash, event.author) == \
+        ("org/repo", "feature", "abc123", "dev")
+    assert event.data["pr_number"] == 7
+    assert event.source == "webhook:github"
+    
+    merged = dict(PULL_REQUEST, merged=True)
+    _, _, [event] = receive(ingest, "github", *github(
+        "pull_request", {"action": "closed", "pull_request": merged}))
+    assert event.event_type == EventType.PR_MERGED
+    assert event.commit_hash == "def456"
+
+
+def test_github_closed_without_merge_is_ignored(ingest):
+    status, response, queued = receive(ingest, "github", *github(
+        "pull_request", {"action": "closed", "pull_request": PULL_REQUEST}))
+    assert (status, response["accepted"], queued) == (200, 0, [])
+
+
+def test_github_issue_and_failed_workflow(ingest):
+    issue = {"number": 3, "title": "Bug", "user": {"login": "dev"},
+             "labels": [{"name": "bug"}], "html_url": "https://example.test/issues/3"}
+    _, _, [event] = receive(ingest, "github", *github("issues", {"action": "opened", "issue": issue}))
+    assert event.event_type == EventType.ISSUE_CREATED
+    assert event.data["labels"] == ["bug"]
+    
+    run = {"id": 99, "name": "CI", "conclusion": "failure", "head_branch": "main", "head_sha": "abc"}
+    _, _, [event] = receive(ingest, "github", *github("workflow_run", {"action": "completed", "workflow_run": run}))
+    assert event.event_type == EventType.BUILD_FAILURE
+    assert isinstance(event, BuildEvent)
+    assert (event.build_id, event.error_message) == ("99", "CI failure")
+
+
+def test_github_ping(ingest):
+    assert receive(ingest, "github", *github("ping", {"zen": "hi"}))[:2] == (200, {"pong": True})
+
+
+def test_gitlab_merge_request_issue_and_pipeline(ingest):
+    project = {"path_with_namespace": "group/repo", "web_url": "https://gitlab.test/group/repo"}
+    attributes = {"source_branch": "feature", "target_branch": "main", "iid": 5,
+                  "last_commit": {"id": "abc"}, "merge_commit_sha": "def"}
+    
+    _, _, [event] = receive(ingest, "gitlab", *gitlab("Merge Request Hook", {
+        "project": project, "user": {"username": "dev"},
+        "object_attributes": dict(attributes, action="open")}))
+    assert event.event_type == EventType.PR_CREATED
+    assert (event.repository, event.commit_hash, event.author) == ("group/repo", "abc", "dev")
+    
+    _, _, [event] = receive(ingest, "gitlab", *gitlab("Merge Request Hook", {
+        "project": project, "object_attributes": dict(attributes, action="merge")}))
+    assert event.event_type == EventType.PR_MERGED
+    assert event.commit_hash == "def"
+    
+    _, _, [event] = receive(ingest, "gitlab", *gitlab("Issue Hook", {
+        "project": project, "labels": [{"title": "bug"}],
+        "object_attributes": {"action": "open", "iid": 2, "title": "Bug"}}))
+    assert event.event_type == EventType.ISSUE_CREATED
+    assert event.data["labels"] == ["bug"]
+    
+    _, _, [event] = receive(ingest, "gitlab", *gitlab("Pipeline Hook", {
+        "project": project,
+        "object_attributes": {"status": "failed", "id": 42, "ref": "main", "sha": "abc"},
+        "builds": [{"name": "test", "status": "failed"}, {"name": "lint", "status": "success"}]}))
+    assert event.event_type == EventType.BUILD_FAILURE
+    assert event.build_url == "https://gitlab.test/group/repo/-/pipelines/42"
+    assert event.data["failed_jobs"] == ["test"]
+
+
+@pytest.mark.parametrize("kind, event_type", [
+    ("build", EventType.BUILD_FAILURE),
+    ("test", EventType.TEST_FAILURE),
+    ("lint", EventType.LINT_ERROR),
+    ("type", EventType.TYPE_ERROR),
+])
+def test_ci_result_kinds(ingest, kind, event_type):
+    _, _, [event] = receive(ingest, "ci", *ci({
+        "kind": kind, "status": "failed", "build_id": 12, "failed_tests": ["test_a"],
+        "error_message": "boom", "repository": "/repo"}))
+    assert event.event_type == event_type
+    assert (event.build_id, event.error_message, event.failed_tests) == ("12", "boom", ["test_a"])
+    assert "status" not in event.data
+
+
+def test_ci_passing_results_are_ignored(ingest):
+    status, response, queued = receive(ingest, "ci", *ci([
+        {"status": "passed"}, {"status": "FAILED", "kind": "lint"}]))
+    assert status == 202
+    assert [event.event_type for event in queued] == [EventType.LINT_ERROR]
+
+
+def test_malformed_payload_returns_400(ingest):
+    status, _, _ = receive(ingest, "github", *github("pull_request", {"action": "opened"}))
+    assert status == 400
+
+
+# HTTP framing
+
+@pytest.mark.parametrize("content_length, expected", [("-5", 400), ("abc", 400), (str(2 * 1024 * 1024), 413)])
+def test_bad_content_length_is_refused(content_length, expected):
+    async def run():
+        server = MetricsServer(port=0)
+        WebhookIngest(secrets={}, allow_unsigned=True).register(server)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(f"POST /webhooks/ci HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode())
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            writer.close()
+            return int(status_line.split()[1])
+        finally:
+            await server.stop()
+    
+    assert asyncio.run(run()) == expected
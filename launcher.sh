@@ -570,6 +570,15 @@ echo "📊 AADF Metrics Dashboard"
 echo "========================"
 echo ""
 
+# Agent and pattern counts come from the running supervisor when there is one
+status_json=""
+if [ -f scripts/automation/monitoring/status.py ]; then
+    status_json=$(python3 scripts/automation/monitoring/status.py --compact 2>/dev/null)
+    if [ "$(echo "$status_json" | jq -r '.status' 2>/dev/null)" = "unreachable" ]; then
+        status_json=""
+    fi
+fi
+
 # Git metrics
 echo "📈 Git Activity:"
 echo "- Commits today: $(git log --since=midnight --oneline 2>/dev/null | wc -l)"
@@ -579,15 +588,19 @@ echo ""
 
 # Agent metrics
 echo "🤖 Agent Activity:"
-for agent in .ai/agents/*; do
-    if [ -d "$agent" ]; then
-        agent_name=$(basename "$agent")
-        if [ -f "$agent/state.json" ]; then
-            sessions=$(jq -r '.total_sessions // 0' "$agent/state.json")
-            echo "- $agent_name: $sessions sessions"
+if [ -n "$status_json" ]; then
+    echo "$status_json" | jq -r '.agents | to_entries[] | "- \(.key): \(.value.sessions) sessions"'
+else
+    for agent in .ai/agents/*; do
+        if [ -d "$agent" ]; then
+            agent_name=$(basename "$agent")
+            if [ -f "$agent/state.json" ]; then
+                sessions=$(jq -r '.total_sessions // 0' "$agent/state.json")
+                echo "- $agent_name: $sessions sessions"
+            fi
         fi
-    fi
-done
+    done
+fi
 echo ""
 
 # File metrics
@@ -598,7 +611,11 @@ echo ""
 
 # Pattern discoveries
 echo "💡 Pattern Discoveries:"
-pattern_count=$(find .ai/patterns -name "*.json" 2>/dev/null | wc -l)
+if [ -n "$status_json" ]; then
+    pattern_count=$(echo "$status_json" | jq -r '.patterns.total')
+else
+    pattern_count=$(find .ai/patterns -name "*.json" 2>/dev/null | wc -l)
+fi
 echo "- Total patterns: $pattern_count"
 EOFMETRICS
 chmod +x scripts/metrics-dashboard.sh